@@ -1,4 +1,5 @@
 from datetime import timedelta
+from celery.schedules import crontab
 from pathlib import Path
 
 # Celery 설정
@@ -11,6 +12,30 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Seoul'  # 시간대 설정
 
+# 금융 데이터(financedata) 수집 설정
+OHLCV_UPSERT_BATCH_SIZE = 2000  # OHLCV 배치 upsert 한 번에 담을 행 수
+OHLCV_LOOKBACK_DAYS = 365  # 신규 자산 / 전체 재동기화 시 수집 기간
+OHLCV_OVERLAP_DAYS = 5  # 증분 수집 시 마지막 저장일 이전으로 다시 가져올 기간
+OHLCV_CHUNK_SIZE = 200  # Celery 청크 태스크 하나가 처리할 자산 수
+OHLCV_FETCH_CONCURRENCY = {  # asset_type 별 FDR 동시 요청 수
+    'stock_kr': 8,
+    'stock_us': 4,
+    'crypto': 2,
+    'forex': 2,
+}
+
+# 야간 배치: 미국장 마감 이후 증분 수집 → 끝나면 전체 자산 예측을 미리 계산 (financedata.ForecastResult)
+CELERY_BEAT_SCHEDULE = {
+    'fetch-ohlcv-and-precompute-forecasts': {
+        'task': 'financedata.tasks.fetch_ohlcv_data',
+        'schedule': crontab(hour=6, minute=30),
+        'kwargs': {'precompute': True},
+    },
+}
+FORECAST_PRECOMPUTE_CHUNK_SIZE = 1000  # 예측 배치 청크 태스크 하나가 처리할 자산 수
+FORECAST_PRECOMPUTE_BATCH_SIZE = 256  # 한 번의 추론에 묶을 자산 수
+BACKTEST_BATCH_SIZE = 1024  # 백테스트에서 한 번의 추론에 묶을 예측 수 (자산 × 예측 시점)
+
 SECRET_KEY = 'imsuperior'
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -22,10 +47,12 @@ ALLOWED_HOSTS = ['127.0.0.1', 'localhost','0.0.0.0','192.168.0.6']
 
 STATIC_ROOT = "/app/staticfiles"  # 컨테이너 내의 경로로 설정
 FRONTEND_URL = "http://192.168.0.6:3000"
+# 웹 워커와 Celery 워커가 같은 캐시를 봐야 하므로 (종목 목록 버전, 예측 캐시/잠금, 지표 상태 등)
+# 프로세스별 LocMemCache 대신 Celery 와 같은 Redis 의 별도 DB 를 사용합니다.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://192.168.0.6:6379/1',
     }
 }
 
@@ -284,6 +311,41 @@ import os
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+OHLCV_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'ohlcv')  # 자산별 컬럼형 OHLCV 캐시 (memmap)
+OHLCV_CACHE_CHECK_INTERVAL = 60  # 캐시 파일을 DB (봉 개수, 마지막 날짜) 와 대조하는 최소 간격 (초)
+SCREENER_FEATURES_PATH = os.path.join(BASE_DIR, 'cache', 'screener', 'features.npy')  # 스크리너 피처 행렬 (자산 1행)
+
+# 예측 모델 로딩 설정 (financedata.forecast)
+FORECAST_MODEL_PATH = os.path.join(BASE_DIR, 'checkpoints', 'awesome_transformer_forecaster.pth')
+FORECAST_MODEL_QUANTIZE = False  # Linear 레이어 동적 int8 양자화
+FORECAST_MODEL_COMPILE = None  # None / 'torchscript' / 'compile'
+FORECAST_TORCH_THREADS = None  # 워커당 torch 스레드 수 (예: 코어 8개, 워커 4개 → 2)
+FORECAST_CACHE_TIMEOUT = 60 * 60 * 24 * 2  # 예측 결과 캐시 유지 시간 (새 봉/모델 변경 시 자동 무효)
+FORECAST_LOCK_TIMEOUT = 30  # 같은 예측의 동시 계산을 막는 잠금 유지 시간 (초)
+FORECAST_BAND_PATHS = 1000  # 예측 밴드(p10/p50/p90) 계산용 Monte Carlo 경로 수
+
+# 실시간 차트 (graphs) - 프로세스당 하나의 Upbit 업스트림 WebSocket 허브
+UPBIT_WS_URL = "wss://api.upbit.com/websocket/v1"
+UPBIT_HUB_RESUBSCRIBE_DELAY = 0.2  # 구독/해제를 모아서 구독 메시지를 다시 보내기까지 대기 시간 (초)
+UPBIT_HUB_RETRY_DELAY = 5  # 업스트림 재연결 대기 시간 (초, 실패할 때마다 두 배)
+UPBIT_HUB_MAX_RETRY_DELAY = 60
+
+# Upbit 캔들 API 프록시 (graphs.candles)
+UPBIT_API_URL = "https://api.upbit.com/v1"
+UPBIT_CANDLE_RATE_LIMIT = 10  # 워커 프로세스당 초당 최대 업스트림 요청 수
+UPBIT_REQUEST_TIMEOUT = 10
+CANDLE_CACHE_MAX_ENTRIES = 4096  # 캔들 응답 캐시 최대 항목 수 (LRU)
+CANDLE_HISTORY_TTL = None  # 과거 구간 응답 캐시 유지 시간 (None: LRU 에서 밀려날 때까지)
+CANDLE_LIVE_TTL_MAX = 30  # 최신 구간 응답 캐시 최대 유지 시간 (초)
+CANDLE_MAX_COUNT = 2000  # 로컬 캔들 저장소(초/분/일/주봉) 요청당 최대 캔들 수
+CANDLE_SETTLE_SECONDS = 5  # 캔들 마감 후 저장하기까지 대기 시간 (초)
+BAR_HISTORY = 500  # 실시간 봉(1s/1m/5m/15m) 간격별로 메모리에 보관하는 마감 봉 수
+TICK_FLUSH_ROWS = 500  # 틱 버퍼가 이 행 수에 도달하면 바로 배치 저장
+TICK_FLUSH_INTERVAL_MS = 200  # 틱 버퍼 최대 저장 지연 (ms)
+TICK_BUFFER_MAX = 50000  # 틱 버퍼 최대 행 수 (초과분은 버리고 dropped 로 집계)
+TICK_STATS_INTERVAL = 1  # 틱 저장소 지표를 공유 캐시에 게시하는 간격 (초)
+UPBIT_WS_SYMBOLS = ['BTC', 'ETH']  # manage.py run_upbit_ws 기본 모니터링 심볼
+
 REST_AUTH_REGISTER_SERIALIZERS = {
     "REGISTER_SERIALIZER": "accounts.serializers.CustomRegisterSerializer",
 }
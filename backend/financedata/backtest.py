@@ -0,0 +1,183 @@
+import logging
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F, FloatField, Sum
+from django.db.models.functions import Cast
+from numpy.lib.stride_tricks import sliding_window_view
+
+from . import columnar
+from .forecast import INPUT_WINDOW, OUTPUT_WINDOW, get_forecaster, run_forecast
+from .models import Asset, BacktestResult
+
+logger = logging.getLogger(__name__)
+
+# 한 번의 추론에 묶을 예측 수 (자산 × 예측 시점을 섞어서 배치 구성)
+BACKTEST_BATCH_SIZE = getattr(settings, 'BACKTEST_BATCH_SIZE', 1024)
+
+WINDOW_LENGTH = INPUT_WINDOW + OUTPUT_WINDOW
+
+
+def walk_forward_windows(columns, start_date, end_date, step=1):
+    """
+    [start_date, end_date] 안의 예측 시점(입력 마지막 봉)마다 (입력 종가 + 실제 이후 종가) 윈도우를 만듭니다.
+    입력 INPUT_WINDOW 개와 정답 OUTPUT_WINDOW 개가 모두 있는 시점만 사용하며, step 봉 간격으로 고릅니다.
+    기준 종가(입력 마지막 봉)가 0 이하인 시점은 변화율 정규화를 할 수 없으므로 제외합니다.
+
+    반환값: (예측 시점 수, INPUT_WINDOW + OUTPUT_WINDOW) float64 배열
+    """
+    n = len(columns)
+    if n < WINDOW_LENGTH:
+        return np.empty((0, WINDOW_LENGTH))
+    first = max(int(np.searchsorted(columns.date, np.datetime64(start_date, 'D'), side='left')), INPUT_WINDOW - 1)
+    last = min(int(np.searchsorted(columns.date, np.datetime64(end_date, 'D'), side='right')) - 1, n - 1 - OUTPUT_WINDOW)
+    if first > last:
+        return np.empty((0, WINDOW_LENGTH))
+    origins = np.arange(first, last + 1, step)
+    origins = origins[columns.close[origins] > 0]
+    return sliding_window_view(columns.close, WINDOW_LENGTH)[origins - (INPUT_WINDOW - 1)]
+
+
+def evaluate_windows(windows, segments, batch_size=BACKTEST_BATCH_SIZE):
+    """
+    여러 자산의 윈도우를 이어 붙인 배열을 batch_size 단위로 예측하고, 자산 × horizon 지표를 한 번에 계산합니다.
+    segments: 자산별 시작 위치 (np.add.reduceat 오프셋)
+
+    반환값: (samples (A,), mae (A, H), mape (A, H), mape_samples (A, H), directional_accuracy (A, H))
+    MAPE 는 실제 종가가 0 이라 정의되지 않는 예측을 빼고 유효한 예측 수로 나눕니다. (유효 예측이 없으면 NaN)
+    """
+    inputs = windows[:, :INPUT_WINDOW]
+    actual = windows[:, INPUT_WINDOW:]
+    last_close = inputs[:, -1:]
+    predicted = np.concatenate([
+        run_forecast(np.asarray(inputs[i:i + batch_size], dtype=np.float32))
+        for i in range(0, len(inputs), batch_size)
+    ])
+
+    abs_error = np.abs(predicted - actual)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_error = np.where(actual != 0, abs_error / np.abs(actual), np.nan)
+    hit = np.sign(predicted - last_close) == np.sign(actual - last_close)
+
+    samples = np.diff(np.append(segments, len(windows)))
+    per_sample = samples[:, None]
+    mae = np.add.reduceat(abs_error, segments, axis=0) / per_sample
+    valid = np.isfinite(pct_error)
+    mape_samples = np.add.reduceat(valid, segments, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mape = np.add.reduceat(np.where(valid, pct_error, 0.0), segments, axis=0) / mape_samples * 100
+    directional_accuracy = np.add.reduceat(hit, segments, axis=0) / per_sample * 100
+    return samples, mae, mape, mape_samples, directional_accuracy
+
+
+def backtest_assets(run):
+    """백테스트 대상 자산 (symbols 가 있으면 해당 심볼, 없으면 asset_types / 상장 자산 전체)"""
+    assets = Asset.objects.all()
+    if run.symbols:
+        return list(assets.filter(symbol__in=run.symbols).order_by('id'))
+    if run.asset_types:
+        assets = assets.filter(asset_type__in=run.asset_types)
+    return list(assets.filter(is_active=True).order_by('id'))
+
+
+def run_backtest(run, batch_size=BACKTEST_BATCH_SIZE):
+    """
+    walk-forward 백테스트를 실행하여 BacktestResult 를 저장하고 run 의 요약 필드를 갱신합니다.
+    자산별 윈도우를 batch_size 이상 모일 때까지 버퍼에 쌓았다가 한 번에 평가하므로
+    메모리 사용량은 배치 크기 수준으로 유지되고, 추론은 자산 × 예측 시점을 섞은 큰 배치로 이루어집니다.
+    """
+    started_at = time.perf_counter()
+    run.model_version = get_forecaster().version
+    run.assets = run.samples = 0
+    BacktestResult.objects.filter(run=run).delete()  # 재실행 시 이전 결과 제거
+
+    buffer, buffered = [], 0
+
+    def flush():
+        nonlocal buffer, buffered
+        windows = np.concatenate([w for _, w in buffer])
+        segments = np.cumsum([0] + [len(w) for _, w in buffer[:-1]])
+        samples, mae, mape, mape_samples, directional_accuracy = evaluate_windows(windows, segments, batch_size)
+        BacktestResult.objects.bulk_create([
+            BacktestResult(
+                run=run,
+                asset=asset,
+                horizon=h + 1,
+                samples=int(samples[i]),
+                mae=float(mae[i, h]),
+                mape=float(mape[i, h]) if mape_samples[i, h] else None,
+                mape_samples=int(mape_samples[i, h]),
+                directional_accuracy=float(directional_accuracy[i, h]),
+            )
+            for i, (asset, _) in enumerate(buffer)
+            for h in range(OUTPUT_WINDOW)
+        ])
+        run.assets += len(buffer)
+        run.samples += int(samples.sum())
+        elapsed = time.perf_counter() - started_at
+        logger.info(
+            f"📈 백테스트 #{run.id}: 자산 {run.assets}개 / 예측 {run.samples}회 "
+            f"({elapsed:.1f}s, {run.samples / elapsed:.0f} forecasts/sec)"
+        )
+        buffer, buffered = [], 0
+
+    for asset in backtest_assets(run):
+        windows = walk_forward_windows(columnar.get_columns(asset.id), run.start_date, run.end_date, run.step)
+        if len(windows) == 0:
+            continue
+        buffer.append((asset, windows))
+        buffered += len(windows)
+        if buffered >= batch_size:
+            flush()
+    if buffer:
+        flush()
+
+    run.seconds = time.perf_counter() - started_at
+    return run
+
+
+def summarize_backtest(run):
+    """
+    백테스트 결과 요약: 전체 / horizon 별 / asset_type 별 지표 (자산별 지표를 예측 횟수로 가중 평균)
+    MAE 는 자산마다 가격 단위가 달라 합치지 않고 자산별 결과에만 남깁니다.
+    MAPE 는 MAPE 계산에 사용된 예측 수(mape_samples)로 가중 평균합니다.
+    """
+    weighted = {
+        "sample_sum": Sum('samples'),
+        "mape_sample_sum": Sum('mape_samples'),
+        "mape_sum": Sum(F('mape') * Cast('mape_samples', FloatField())),
+        "hit_sum": Sum(F('directional_accuracy') * Cast('samples', FloatField())),
+    }
+
+    def metrics(row):
+        samples = row["sample_sum"] or 0
+        mape_samples = row["mape_sample_sum"] or 0
+        return {
+            "samples": samples,
+            "mape": round(row["mape_sum"] / mape_samples, 4) if mape_samples else None,
+            "directional_accuracy": round(row["hit_sum"] / samples, 4) if samples else None,
+        }
+
+    results = BacktestResult.objects.filter(run=run)
+    return {
+        "run": run.id,
+        "status": run.status,
+        "start_date": run.start_date,
+        "end_date": run.end_date,
+        "step": run.step,
+        "model_version": run.model_version,
+        "assets": run.assets,
+        "forecasts": run.samples,
+        "seconds": run.seconds,
+        "forecasts_per_sec": round(run.samples / run.seconds, 1) if run.seconds else None,
+        "overall": {key: value for key, value in metrics(results.aggregate(**weighted)).items() if key != "samples"},
+        "by_horizon": [
+            {"horizon": row["horizon"], **metrics(row)}
+            for row in results.values('horizon').annotate(**weighted).order_by('horizon')
+        ],
+        "by_asset_type": [
+            {"asset_type": row["asset__asset_type"], **metrics(row)}
+            for row in results.values('asset__asset_type').annotate(**weighted).order_by('asset__asset_type')
+        ],
+    }
@@ -0,0 +1,52 @@
+import hashlib
+
+import numpy as np
+from django.conf import settings
+
+# 예측 밴드 계산에 사용할 Monte Carlo 경로 수
+FORECAST_BAND_PATHS = getattr(settings, 'FORECAST_BAND_PATHS', 1000)
+FORECAST_BAND_PERCENTILES = (10, 50, 90)
+# 밴드 중심 가격의 하한 (마지막 종가 대비 비율) - 0 이하 예측값에서도 p10 <= p50 <= p90 을 보장
+FORECAST_BAND_MIN_RATIO = 1e-6
+
+
+def band_seed(symbol, as_of):
+    """(symbol, 마지막 봉 날짜) 로 정해지는 난수 시드 - 같은 입력이면 항상 같은 밴드를 돌려줍니다."""
+    return int.from_bytes(hashlib.sha256(f"{symbol}:{as_of}".encode()).digest()[:8], 'little')
+
+
+def forecast_bands(forecast, windows, seeds, n_paths=FORECAST_BAND_PATHS):
+    """
+    예측 경로 주변의 Monte Carlo 분위수 밴드(p10 / p50 / p90)를 계산합니다.
+    자산마다 입력 구간의 일간 로그수익률 잔차(평균 제거)를 부트스트랩으로 뽑아 horizon 방향으로 누적한
+    경로 n_paths 개를 만들고, 예측 경로에 곱해 분위수를 구합니다.
+    난수는 자산별 시드의 Generator 로 한 번에 (n_paths, horizon) 만큼 뽑고, 나머지는 배치 전체 배열 연산입니다.
+
+    forecast: (batch, horizon) 예측 가격, windows: (batch, input_window) 입력 종가, seeds: 자산별 시드
+    반환값: {"p10": (batch, horizon), "p50": ..., "p90": ...}
+    """
+    forecast = np.asarray(forecast, dtype=np.float64)
+    batch, horizon = forecast.shape
+    log_returns = np.diff(np.log(np.asarray(windows, dtype=np.float64)), axis=1)
+    residuals = (log_returns - log_returns.mean(axis=1, keepdims=True)).astype(np.float32)  # (batch, input_window - 1)
+
+    picks = np.stack([
+        np.random.default_rng(seed).integers(0, residuals.shape[1], size=(horizon, n_paths), dtype=np.int32)
+        for seed in seeds
+    ])  # (batch, horizon, n_paths)
+    shocks = residuals[np.arange(batch)[:, None, None], picks]
+
+    # 경로 축을 마지막(연속 메모리)에 두고 정렬한 뒤 분위수 위치를 선형 보간 (np.percentile 'linear' 와 동일)
+    # exp 와 양수 중심값 곱은 순서를 보존하므로 누적 로그수익률의 분위수만 구해서 변환합니다.
+    # 예측값이 0 이하이면 순서가 뒤집히므로 중심값을 마지막 종가 기준 작은 양수로 하한 처리합니다.
+    cumulative = np.sort(np.cumsum(shocks, axis=1), axis=-1)
+    last_close = np.asarray(windows, dtype=np.float64)[:, -1:]
+    center = np.maximum(forecast, last_close * FORECAST_BAND_MIN_RATIO)
+    bands = {}
+    for p in FORECAST_BAND_PERCENTILES:
+        position = p / 100 * (n_paths - 1)
+        lo = int(position)
+        hi = min(lo + 1, n_paths - 1)
+        quantile = cumulative[..., lo] + (cumulative[..., hi] - cumulative[..., lo]) * (position - lo)
+        bands[f"p{p}"] = center * np.exp(quantile)
+    return bands
@@ -0,0 +1,277 @@
+import logging
+import os
+import tempfile
+import time
+from typing import NamedTuple
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import OHLCV
+
+logger = logging.getLogger(__name__)
+
+# 자산별 컬럼형 OHLCV 캐시 파일 위치
+OHLCV_CACHE_DIR = getattr(
+    settings, 'OHLCV_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'ohlcv'),
+)
+
+# 캐시 파일을 DB 와 대조하는 최소 간격 (초)
+# 캐시 디렉터리가 워커 간에 공유되지 않거나 bulk_upsert_ohlcv 밖에서 DB 가 바뀐 경우에도
+# 이 간격 안에 (봉 개수, 마지막 날짜) 가 DB 와 다른 파일을 다시 만듭니다.
+OHLCV_CACHE_CHECK_INTERVAL = getattr(settings, 'OHLCV_CACHE_CHECK_INTERVAL', 60)
+
+# 파일 레이아웃: (6, n) int64 배열 한 개 (.npy)
+#   0: date  (1970-01-01 기준 일수, datetime64[D] 로 view)
+#   1~4: open / high / low / close  (float64 비트 그대로 저장, float64 로 view)
+#   5: volume
+# 각 행이 연속된 메모리라서 컬럼 단위 접근/슬라이싱이 복사 없이 이루어지고,
+# 파일 하나를 os.replace 로 교체하므로 읽는 쪽은 항상 일관된 스냅샷을 봅니다.
+ROW_DATE, ROW_OPEN, ROW_HIGH, ROW_LOW, ROW_CLOSE, ROW_VOLUME = range(6)
+
+# 프로세스별 memmap 보관 {asset_id: ((st_ino, st_mtime_ns), OHLCVColumns)}
+# 실제 페이지는 OS 페이지 캐시를 통해 워커 간에 공유됩니다.
+_mapped = {}
+
+# 프로세스별 마지막 DB 대조 시각 {asset_id: time.monotonic()}
+_checked = {}
+
+
+class OHLCVColumns(NamedTuple):
+    date: np.ndarray  # datetime64[D]
+    open: np.ndarray  # float64
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray  # int64
+
+    def __len__(self):
+        return len(self.date)
+
+    def between(self, start_date=None, end_date=None):
+        """
+        [start_date, end_date] 구간을 이분 탐색으로 잘라낸 view 를 반환합니다. (복사 없음)
+        """
+        lo = 0 if start_date is None else np.searchsorted(self.date, np.datetime64(start_date, 'D'), side='left')
+        hi = len(self.date) if end_date is None else np.searchsorted(self.date, np.datetime64(end_date, 'D'), side='right')
+        return OHLCVColumns(*(column[lo:hi] for column in self))
+
+    def tail(self, n):
+        """마지막 n개 봉의 view"""
+        return OHLCVColumns(*(column[-n:] for column in self))
+
+    def slice(self, start, stop):
+        """[start, stop) 위치 구간의 view"""
+        return OHLCVColumns(*(column[start:stop] for column in self))
+
+
+def cache_path(asset_id):
+    return os.path.join(OHLCV_CACHE_DIR, f"{asset_id}.npy")
+
+
+def _as_columns(block):
+    return OHLCVColumns(
+        date=block[ROW_DATE].view('datetime64[D]'),
+        open=block[ROW_OPEN].view(np.float64),
+        high=block[ROW_HIGH].view(np.float64),
+        low=block[ROW_LOW].view(np.float64),
+        close=block[ROW_CLOSE].view(np.float64),
+        volume=block[ROW_VOLUME],
+    )
+
+
+def write_columns(asset_id, date, open, high, low, close, volume):
+    """
+    컬럼 배열을 하나의 블록으로 묶어 임시 파일에 기록한 뒤 원자적으로 교체합니다.
+    기존 파일을 memmap 중인 프로세스는 교체 전 스냅샷을 안전하게 계속 사용할 수 있습니다.
+    """
+    os.makedirs(OHLCV_CACHE_DIR, exist_ok=True)
+    n = len(date)
+    block = np.empty((6, n), dtype=np.int64)
+    block[ROW_DATE] = np.asarray(date, dtype='datetime64[D]').view(np.int64)
+    for row, values in ((ROW_OPEN, open), (ROW_HIGH, high), (ROW_LOW, low), (ROW_CLOSE, close)):
+        block[row] = np.asarray(values, dtype=np.float64).view(np.int64)
+    block[ROW_VOLUME] = np.asarray(volume, dtype=np.int64)
+
+    fd, tmp_path = tempfile.mkstemp(dir=OHLCV_CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, block)
+        os.replace(tmp_path, cache_path(asset_id))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _mapped.pop(asset_id, None)
+    _checked[asset_id] = time.monotonic()
+
+
+def load_columns(asset_id):
+    """
+    캐시 파일을 읽기 전용 memmap 으로 엽니다. 파일이 없으면 None.
+    파일이 교체되었으면(inode/mtime 변경) 다시 매핑합니다.
+    """
+    try:
+        stat = os.stat(cache_path(asset_id))
+    except FileNotFoundError:
+        return None
+
+    key = (stat.st_ino, stat.st_mtime_ns)
+    cached = _mapped.get(asset_id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    columns = _as_columns(np.load(cache_path(asset_id), mmap_mode='r'))
+    _mapped[asset_id] = (key, columns)
+    return columns
+
+
+def rebuild_from_db(asset_id):
+    """DB에 저장된 OHLCV 전체로 캐시 파일을 다시 만듭니다."""
+    rows = list(
+        OHLCV.objects.filter(asset_id=asset_id)
+        .order_by('date')
+        .values_list('date', 'open', 'high', 'low', 'close', 'volume')
+    )
+    if rows:
+        date, open, high, low, close, volume = zip(*rows)
+    else:
+        date = open = high = low = close = volume = ()
+    write_columns(
+        asset_id,
+        np.array(date, dtype='datetime64[D]'),
+        np.array(open, dtype=np.float64),
+        np.array(high, dtype=np.float64),
+        np.array(low, dtype=np.float64),
+        np.array(close, dtype=np.float64),
+        np.array(volume, dtype=np.int64),
+    )
+    return load_columns(asset_id)
+
+
+def db_fingerprints(asset_ids):
+    """자산별 DB 기준 (봉 개수, 마지막 날짜) 를 한 번의 집계 쿼리로 가져옵니다."""
+    rows = (
+        OHLCV.objects.filter(asset_id__in=asset_ids)
+        .values('asset_id')
+        .annotate(count=Count('id'), last_date=Max('date'))
+        .values_list('asset_id', 'count', 'last_date')
+    )
+    return {asset_id: (count, last_date) for asset_id, count, last_date in rows}
+
+
+def is_fresh(columns, fingerprint):
+    """캐시의 (봉 개수, 마지막 날짜) 가 DB 와 같은지 확인합니다."""
+    count, last_date = fingerprint
+    if len(columns) != count:
+        return False
+    return count == 0 or columns.date[-1] == np.datetime64(last_date, 'D')
+
+
+def ensure_fresh(asset_ids):
+    """
+    OHLCV_CACHE_CHECK_INTERVAL 이 지난 자산들의 캐시를 DB 와 대조하고, 다르거나 없으면 다시 만듭니다.
+    여러 자산을 읽는 경로(스크리너, 배치 예측)는 한 번에 호출하여 쿼리를 1회로 줄입니다.
+    """
+    now = time.monotonic()
+    due = [
+        asset_id for asset_id in asset_ids
+        if now - _checked.get(asset_id, -OHLCV_CACHE_CHECK_INTERVAL) >= OHLCV_CACHE_CHECK_INTERVAL
+    ]
+    if not due:
+        return
+    fingerprints = db_fingerprints(due)
+    for asset_id in due:
+        columns = load_columns(asset_id)
+        if columns is not None and is_fresh(columns, fingerprints.get(asset_id, (0, None))):
+            _checked[asset_id] = now
+            continue
+        if columns is not None:
+            logger.info(f"🔄 OHLCV 캐시가 DB 와 달라 다시 만듭니다 (asset_id={asset_id})")
+        rebuild_from_db(asset_id)
+
+
+def get_columns(asset_id):
+    """
+    읽기 경로용 진입점: 캐시가 있으면 memmap view, 없으면 DB에서 만들어 반환합니다.
+    주기적으로(OHLCV_CACHE_CHECK_INTERVAL) DB 와 대조하여 오래된 캐시는 다시 만듭니다.
+    """
+    ensure_fresh([asset_id])
+    columns = load_columns(asset_id)
+    if columns is None:
+        columns = rebuild_from_db(asset_id)
+    return columns
+
+
+def row_ids(asset_id, columns):
+    """
+    columns(날짜 오름차순)의 각 봉에 대응하는 OHLCV pk 목록 - 행 형식(JSON) 응답의 id 필드용
+    캐시 파일에는 pk 를 저장하지 않으므로 요청 구간만 (date, id) 로 조회합니다. (DB 에 없는 봉은 None)
+    """
+    if len(columns) == 0:
+        return []
+    ids = dict(
+        OHLCV.objects.filter(asset_id=asset_id, date__gte=columns.date[0].item(), date__lte=columns.date[-1].item())
+        .values_list('date', 'id')
+    )
+    return [ids.get(date) for date in columns.date.tolist()]
+
+
+def merge_frame(asset_id, frame):
+    """
+    수집된 OHLCV(normalize_ohlcv_frame 결과)를 캐시에 반영합니다.
+    새 날짜는 뒤에 붙이고, 겹치는 날짜(정정 데이터)는 새 값으로 교체합니다.
+    캐시가 아직 없으면 DB 기준으로 새로 만듭니다.
+    """
+    current = load_columns(asset_id)
+    if current is None:
+        return rebuild_from_db(asset_id)
+    if frame.empty:
+        return current
+
+    new_date = np.array(frame.index, dtype='datetime64[D]')
+    keep = ~np.isin(current.date, new_date)
+    date = np.concatenate([current.date[keep], new_date])
+    order = np.argsort(date, kind='stable')
+
+    merged = {'date': date[order]}
+    for field in OHLCVColumns._fields[1:]:
+        column = getattr(current, field)
+        merged[field] = np.concatenate([column[keep], frame[field].to_numpy(dtype=column.dtype)])[order]
+
+    write_columns(asset_id, **merged)
+    return load_columns(asset_id)
+
+
+def update_cache(asset_id, frame):
+    """
+    수집 경로에서 호출: 캐시 갱신 실패가 DB 수집 자체를 실패시키지 않도록 로그만 남깁니다.
+    """
+    try:
+        merge_frame(asset_id, frame)
+    except Exception as e:
+        logger.warning(f"⚠️ OHLCV 캐시 갱신 실패 (asset_id={asset_id}): {e}")
+        invalidate(asset_id)
+
+
+def invalidate(asset_id):
+    """캐시 파일을 삭제합니다. 다음 읽기에서 DB 기준으로 다시 만들어집니다."""
+    _mapped.pop(asset_id, None)
+    _checked.pop(asset_id, None)
+    try:
+        os.remove(cache_path(asset_id))
+    except FileNotFoundError:
+        pass
+
+
+def cache_version(asset_id):
+    """
+    캐시 파일의 마지막 갱신 시각(ns)을 반환합니다. 파일이 없으면 None.
+    수집으로 새 봉/정정 데이터가 반영될 때마다 바뀌므로 ETag/캐시 키에 사용합니다.
+    """
+    try:
+        return os.stat(cache_path(asset_id)).st_mtime_ns
+    except FileNotFoundError:
+        return None
@@ -1,10 +1,22 @@
+import hashlib
+import io
+import logging
 import math
+import os
+import threading
+import time
+from dataclasses import dataclass
 import torch
 import torch.nn as nn
 import numpy as np
-from .models import Asset, OHLCV
+from django.conf import settings
+from . import columnar, forecast_cache
+from .bands import band_seed, forecast_bands
+from .models import Asset, ForecastResult
 from decimal import Decimal
 
+logger = logging.getLogger(__name__)
+
 
 ########################################
 # Positional Encoding (Transformer 공통)
@@ -127,9 +139,128 @@ class AwesomeTransformerForecaster(nn.Module):
         forecast = torch.cat(outputs, dim=1)
         return forecast
 
+    def forward_teacher_forcing(self, src, tgt):
+        """
+        학습용 forward: 디코더 입력으로 예측값 대신 정답 시퀀스를 한 칸 밀어 넣고(teacher forcing)
+        인과 마스크를 적용해 output_window 스텝을 한 번의 디코더 호출로 계산합니다.
+        src: (batch_size, input_window, 1), tgt: (batch_size, output_window) - 정답 (forward 출력과 같은 단위)
+        반환: (batch_size, output_window)
+        """
+        batch_size = src.size(0)
+
+        src = self.input_projection(src).transpose(0, 1)
+        memory = self.transformer_encoder(self.encoder_pos_encoding(src))
+
+        # 디코더 입력: [시작 토큰, 정답 0 ~ output_window-2 의 임베딩]
+        previous = self.output_embedding(tgt[:, :-1].unsqueeze(-1)).transpose(0, 1)
+        decoder_inputs = torch.cat([self.start_token.repeat(1, batch_size, 1), previous], dim=0)
+        dec_inputs = self.decoder_pos_encoding(decoder_inputs)
+        tgt_mask = self.generate_square_subsequent_mask(dec_inputs.size(0)).to(dec_inputs.device)
+
+        decoder_output = self.transformer_decoder(tgt=dec_inputs, memory=memory, tgt_mask=tgt_mask)
+        return self.output_projection(decoder_output).squeeze(-1).transpose(0, 1)
+
+    ########################################
+    # KV 캐시 기반 증분 디코딩 (추론 전용)
+    ########################################
+    @torch.no_grad()
+    def forward_incremental(self, src):
+        """
+        forward 와 같은 결과를 내는 추론 전용 디코딩입니다. (eval 모드에서 사용)
+        - 디코더 self-attention 의 key/value 를 레이어별로 캐시하여 매 스텝 새 토큰 1개만 계산
+        - 교차 어텐션(memory)의 key/value 와 positional encoding 은 디코딩 시작 전에 한 번만 계산
+        - 인과 마스크는 필요 없음 (새 토큰은 항상 캐시된 과거 토큰 전체를 참조)
+        스텝마다 전체 접두사를 다시 돌리는 forward 의 O(T²) 대신 O(T) 레이어 연산으로 동작합니다.
+
+        src: (batch_size, input_window, 1)
+        반환: (batch_size, output_window)
+        """
+        batch_size = src.size(0)
+        layers = self.transformer_decoder.layers
+        nhead = layers[0].self_attn.num_heads
+        head_dim = self.d_model // nhead
+
+        # 1. 인코더 (forward 와 동일)
+        memory = self.transformer_encoder(self.encoder_pos_encoding(self.input_projection(src).transpose(0, 1)))
+
+        # 2. 레이어별 교차 어텐션 key/value: (batch, nhead, input_window, head_dim)
+        cross_kv = [self._project_memory(layer.multihead_attn, memory, nhead, head_dim) for layer in layers]
+
+        # 3. self-attention KV 캐시 (미리 할당하여 torch.cat 없이 채움)
+        cache_shape = (len(layers), batch_size, nhead, self.output_window, head_dim)
+        key_cache = src.new_empty(cache_shape)
+        value_cache = src.new_empty(cache_shape)
+
+        positions = self.decoder_pos_encoding.pe[:self.output_window, 0, :]  # (output_window, d_model)
+        token = self.start_token[0].expand(batch_size, -1)  # (batch, d_model)
+        outputs = src.new_empty(batch_size, self.output_window)
+
+        for t in range(self.output_window):
+            x = token + positions[t]
+            for i, layer in enumerate(layers):
+                x = self._decoder_layer_step(layer, x, t, key_cache[i], value_cache[i], cross_kv[i], nhead, head_dim)
+            if self.transformer_decoder.norm is not None:
+                x = self.transformer_decoder.norm(x)
+
+            next_price = self.output_projection(x)  # (batch, 1)
+            outputs[:, t] = next_price[:, 0]
+            token = self.output_embedding(next_price)
+
+        return outputs
+
+    @staticmethod
+    def _project_memory(attn, memory, nhead, head_dim):
+        """인코더 출력 (S, batch, d_model) 을 교차 어텐션 key/value (batch, nhead, S, head_dim) 로 변환"""
+        _, w_k, w_v = attn.in_proj_weight.chunk(3)
+        _, b_k, b_v = attn.in_proj_bias.chunk(3)
+        seq_len, batch_size, _ = memory.shape
+
+        def split_heads(x):
+            return x.view(seq_len, batch_size, nhead, head_dim).permute(1, 2, 0, 3)
+
+        return split_heads(nn.functional.linear(memory, w_k, b_k)), split_heads(nn.functional.linear(memory, w_v, b_v))
+
+    @staticmethod
+    def _decoder_layer_step(layer, x, t, key_cache, value_cache, cross_kv, nhead, head_dim):
+        """
+        nn.TransformerDecoderLayer 한 개를 새 토큰 1개에 대해 계산합니다. (eval 모드 기준, dropout 생략)
+        x: (batch, d_model), key_cache/value_cache: (batch, nhead, output_window, head_dim)
+        """
+        batch_size, d_model = x.shape
+
+        def self_attention(h):
+            q, k, v = nn.functional.linear(h, layer.self_attn.in_proj_weight, layer.self_attn.in_proj_bias) \
+                .view(batch_size, 3, nhead, head_dim).unbind(1)
+            key_cache[:, :, t] = k
+            value_cache[:, :, t] = v
+            out = nn.functional.scaled_dot_product_attention(
+                q.unsqueeze(2), key_cache[:, :, :t + 1], value_cache[:, :, :t + 1]
+            )
+            return layer.self_attn.out_proj(out.reshape(batch_size, d_model))
+
+        def cross_attention(h):
+            attn = layer.multihead_attn
+            w_q, b_q = attn.in_proj_weight[:d_model], attn.in_proj_bias[:d_model]
+            q = nn.functional.linear(h, w_q, b_q).view(batch_size, nhead, 1, head_dim)
+            out = nn.functional.scaled_dot_product_attention(q, *cross_kv)
+            return attn.out_proj(out.reshape(batch_size, d_model))
+
+        def feed_forward(h):
+            return layer.linear2(layer.activation(layer.linear1(h)))
+
+        if layer.norm_first:
+            x = x + self_attention(layer.norm1(x))
+            x = x + cross_attention(layer.norm2(x))
+            x = x + feed_forward(layer.norm3(x))
+        else:
+            x = layer.norm1(x + self_attention(x))
+            x = layer.norm2(x + cross_attention(x))
+            x = layer.norm3(x + feed_forward(x))
+        return x
+
 
 ########################################
-# 하이퍼파라미터 정의 및 모델 인스턴스 생성
+# 하이퍼파라미터 정의
 ########################################
 INPUT_WINDOW = 120  # 최근 30일의 종가 데이터 사용
 OUTPUT_WINDOW = 14  # 향후 7일 예측
@@ -140,64 +271,340 @@ NUM_DECODER_LAYERS = 3
 DIM_FEEDFORWARD = 128
 DROPOUT = 0.1
 
-# Awesome Transformer 모델 인스턴스 생성
-model = AwesomeTransformerForecaster(
-    input_window=INPUT_WINDOW,
-    output_window=OUTPUT_WINDOW,
-    d_model=D_MODEL,
-    nhead=NHEAD,
-    num_encoder_layers=NUM_ENCODER_LAYERS,
-    num_decoder_layers=NUM_DECODER_LAYERS,
-    dim_feedforward=DIM_FEEDFORWARD,
-    dropout=DROPOUT
+# 학습 완료된 체크포인트 경로 (파일이 없으면 초기화된 가중치로 동작)
+FORECAST_MODEL_PATH = getattr(
+    settings, 'FORECAST_MODEL_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'checkpoints',
+                 'awesome_transformer_forecaster.pth'),
 )
+# Linear 레이어 동적 int8 양자화 여부
+FORECAST_MODEL_QUANTIZE = getattr(settings, 'FORECAST_MODEL_QUANTIZE', False)
+# 컴파일 방식: None (eager) / 'torchscript' (torch.jit.trace) / 'compile' (torch.compile)
+FORECAST_MODEL_COMPILE = getattr(settings, 'FORECAST_MODEL_COMPILE', None)
+# 프로세스당 torch 연산 스레드 수 (None 이면 torch 기본값 = 코어 수)
+# 워커 여러 개가 한 서버에서 돌 때 (코어 수 / 워커 수) 로 맞춰야 CPU 과다 점유를 피할 수 있습니다.
+FORECAST_TORCH_THREADS = getattr(settings, 'FORECAST_TORCH_THREADS', None)
 
-# 실제 서비스에서는 아래와 같이 학습 완료된 모델 파라미터를 로드하세요.
-# model.load_state_dict(torch.load('path/to/awesome_transformer_forecaster.pth', map_location=torch.device('cpu')))
-model.eval()  # 평가 모드로 전환
+FORECAST_COMPILE_MODES = (None, 'torchscript', 'compile')
 
 
-def add_volatility(forecast, volatility_factor=0.05):
+########################################
+# 모델 로더 (첫 예측 요청 시 한 번만 생성)
+# 웹/Celery 워커가 예측을 하지 않으면 모델 생성/체크포인트 로드 비용을 치르지 않습니다.
+########################################
+class IncrementalForecaster(nn.Module):
+    """forward_incremental 을 forward 로 노출하는 래퍼 (TorchScript trace / torch.compile 대상)"""
+
+    def __init__(self, model):
+        super(IncrementalForecaster, self).__init__()
+        self.model = model
+
+    def forward(self, src):
+        return self.model.forward_incremental(src)
+
+
+@dataclass
+class LoadedForecaster:
+    module: nn.Module  # (batch, INPUT_WINDOW, 1) -> (batch, OUTPUT_WINDOW)
+    version: str  # 체크포인트 내용 해시 (체크포인트가 없으면 'untrained')
+    mode: str  # 예: 'eager', 'int8+torchscript'
+    target: str  # 'relative': 마지막 종가 대비 변화율 입출력 (train_forecaster 체크포인트), 'delta': 원 가격 입력 + 마지막 종가 대비 차이 출력
+    load_seconds: float  # 생성 + 체크포인트 로드 + 양자화/컴파일 + 워밍업
+    warmup_ms: float  # 첫 예측 1회 지연 시간
+
+
+def build_model(**hparams):
+    """하이퍼파라미터(기본값: 모듈 상수)로 AwesomeTransformerForecaster 를 생성합니다."""
+    config = dict(
+        input_window=INPUT_WINDOW,
+        output_window=OUTPUT_WINDOW,
+        d_model=D_MODEL,
+        nhead=NHEAD,
+        num_encoder_layers=NUM_ENCODER_LAYERS,
+        num_decoder_layers=NUM_DECODER_LAYERS,
+        dim_feedforward=DIM_FEEDFORWARD,
+        dropout=DROPOUT,
+    )
+    config.update(hparams)
+    return AwesomeTransformerForecaster(**config)
+
+
+def load_checkpoint(path):
+    """
+    체크포인트를 읽어 (state_dict, hparams, version) 을 반환합니다. 파일이 없으면 None.
+    {"state_dict": ..., "hparams": {...}} 형식과 state_dict 만 저장한 형식을 모두 지원합니다.
+    hparams 가 없는 형식(이전 방식으로 학습된 체크포인트)이면 hparams 는 None 입니다.
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+    checkpoint = torch.load(io.BytesIO(raw), map_location='cpu', weights_only=True)
+    version = hashlib.sha1(raw).hexdigest()[:12]
+    if 'state_dict' in checkpoint:
+        return checkpoint['state_dict'], checkpoint.get('hparams'), version
+    return checkpoint, None, version
+
+
+def load_forecaster(path=FORECAST_MODEL_PATH, quantize=FORECAST_MODEL_QUANTIZE,
+                    compile_mode=FORECAST_MODEL_COMPILE, threads=FORECAST_TORCH_THREADS):
     """
-    예측값에 변동성을 추가하는 함수
-    volatility_factor: 변동성을 조절하는 인자 (기본값 0.05)
+    체크포인트를 로드하고 (선택) 동적 int8 양자화, TorchScript/torch.compile 을 적용한 예측 모델을 만듭니다.
+    워밍업 예측 1회까지 마친 뒤 반환하므로 trace/compile 비용이 첫 사용자 요청에 실리지 않습니다.
     """
-    forecast_with_volatility = []
-    for val in forecast:
-        volatility = val * volatility_factor * (np.random.rand() * 2 - 1)  # -1 ~ 1 사이의 랜덤 값
-        forecast_with_volatility.append(val + volatility)
-    return forecast_with_volatility
+    if compile_mode not in FORECAST_COMPILE_MODES:
+        raise ValueError(f"지원하지 않는 compile 방식입니다: {compile_mode!r} {FORECAST_COMPILE_MODES}")
+    if threads:
+        torch.set_num_threads(threads)
+
+    started_at = time.perf_counter()
+    checkpoint = load_checkpoint(path)
+    if checkpoint is None:
+        logger.warning(f"⚠️ 예측 모델 체크포인트가 없습니다: {path} (초기화된 가중치 사용)")
+        # 같은 'untrained' 버전이 워커마다 다른 예측을 내지 않도록 초기화 시드를 고정
+        with torch.random.fork_rng():
+            torch.manual_seed(0)
+            model = build_model()
+        version = 'untrained'
+        target = 'delta'
+    else:
+        state_dict, hparams, version = checkpoint
+        # train_forecaster 로 저장한 체크포인트(hparams 포함)만 변화율 정규화로 학습되었음
+        target = 'relative' if hparams is not None else 'delta'
+        model = build_model(**(hparams or {}))
+        model.load_state_dict(state_dict)
+    model.eval()
+
+    modes = []
+    if quantize:
+        model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        modes.append('int8')
+
+    module = IncrementalForecaster(model).eval()
+    example = torch.zeros(1, model.input_window, 1)
+    if compile_mode == 'torchscript':
+        with torch.no_grad():
+            module = torch.jit.freeze(torch.jit.trace(module, example, check_trace=False))
+        modes.append('torchscript')
+    elif compile_mode == 'compile':
+        module = torch.compile(module)
+        modes.append('compile')
+
+    warmup_started_at = time.perf_counter()
+    with torch.no_grad():
+        module(example)
+    finished_at = time.perf_counter()
 
-def predict_forecast(asset_symbol):
+    loaded = LoadedForecaster(
+        module=module,
+        version=version,
+        mode='+'.join(modes) or 'eager',
+        target=target,
+        load_seconds=finished_at - started_at,
+        warmup_ms=(finished_at - warmup_started_at) * 1000,
+    )
+    logger.info(
+        f"🧠 예측 모델 로드 완료 (version={loaded.version}, mode={loaded.mode}, target={loaded.target}, "
+        f"threads={torch.get_num_threads()}, {loaded.load_seconds:.2f}s)"
+    )
+    return loaded
+
+
+_forecaster = None
+_forecaster_lock = threading.Lock()
+
+
+def get_forecaster():
+    """프로세스별 예측 모델 (첫 호출 시 로드, 이후 재사용)"""
+    global _forecaster
+    if _forecaster is None:
+        with _forecaster_lock:
+            if _forecaster is None:
+                _forecaster = load_forecaster()
+    return _forecaster
+
+
+# 한 번의 배치 예측 요청에서 허용하는 최대 자산 수
+MAX_FORECAST_BATCH = 100
+
+
+def collect_close_windows(assets):
     """
-    특정 자산의 최근 OHLCV 데이터를 기반으로 향후 7일의 실제 종가를 예측합니다.
-    (모델이 변화량(delta)을 예측하는 경우)
+    Asset 목록의 마지막 INPUT_WINDOW 개 종가를 컬럼형 캐시(memmap)에서 view 로 읽습니다.
+
+    반환값: ({symbol: (INPUT_WINDOW,) float32 배열}, {symbol: 마지막 봉 날짜 (ISO)}, {symbol: 에러 메시지})
     """
-    try:
-        asset = Asset.objects.get(symbol=asset_symbol)
-    except Asset.DoesNotExist:
-        raise ValueError(f"Asset with symbol '{asset_symbol}' does not exist.")
+    windows, last_dates, errors = {}, {}, {}
+    columnar.ensure_fresh([asset.id for asset in assets])
+    for asset in assets:
+        columns = columnar.get_columns(asset.id)
+        if len(columns) < INPUT_WINDOW:
+            errors[asset.symbol] = (
+                f"Not enough data for asset '{asset.symbol}'. Minimum {INPUT_WINDOW} records are required."
+            )
+            continue
+        window = np.asarray(columns.close[-INPUT_WINDOW:], dtype=np.float32)
+        # 변화율 정규화와 밴드의 로그수익률 계산을 위해 윈도우의 모든 종가가 유한한 양수여야 함
+        if not (np.isfinite(window).all() and (window > 0).all()):
+            errors[asset.symbol] = f"Invalid close prices in the last {INPUT_WINDOW} records for asset '{asset.symbol}'."
+            continue
+        windows[asset.symbol] = window
+        last_dates[asset.symbol] = str(columns.date[-1])
+    return windows, last_dates, errors
+
+
+def load_close_windows(asset_symbols):
+    """
+    요청한 자산들의 마지막 INPUT_WINDOW 개 종가를 가져옵니다. (Asset 조회는 쿼리 1회)
+    반환값은 collect_close_windows 와 같고, 존재하지 않는 자산은 에러에 담깁니다.
+    """
+    assets = {asset.symbol: asset for asset in Asset.objects.filter(symbol__in=asset_symbols)}
+    windows, last_dates, errors = collect_close_windows([assets[s] for s in asset_symbols if s in assets])
+    for symbol in asset_symbols:
+        if symbol not in assets:
+            errors[symbol] = f"Asset with symbol '{symbol}' does not exist."
+    return windows, last_dates, errors
 
-    # 2. 해당 자산의 OHLCV 데이터 가져오기 (날짜 오름차순 정렬)
-    qs = OHLCV.objects.filter(asset=asset).order_by('date')
-    if qs.count() < INPUT_WINDOW:
-        raise ValueError(f"Not enough data for asset '{asset_symbol}'. Minimum {INPUT_WINDOW} records are required.")
 
-    close_values = list(qs.values_list('close', flat=True))
-    series = np.array(close_values[-INPUT_WINDOW:], dtype=np.float32)
-    x = torch.tensor(series, dtype=torch.float32).unsqueeze(0).unsqueeze(-1)
+def load_precomputed(keys):
+    """
+    야간 배치로 저장된 예측 중 (마지막 봉 날짜, 입력 윈도우 해시, 모델 버전) 이 일치하는 항목을
+    {symbol: {"forecast": [...], "bands": {...}}} 로 반환합니다.
+    """
+    if not keys:
+        return {}
+    rows = ForecastResult.objects.filter(asset__symbol__in=keys, bands__isnull=False).values_list(
+        'asset__symbol', 'as_of', 'input_digest', 'model_version', 'forecast', 'bands'
+    )
+    return {
+        symbol: {
+            "forecast": [Decimal(value) for value in forecast],
+            "bands": {name: [Decimal(value) for value in values] for name, values in bands.items()},
+        }
+        for symbol, as_of, input_digest, model_version, forecast, bands in rows
+        if (str(as_of), input_digest, model_version) == keys[symbol]
+    }
+
 
+def normalize_windows(windows, base_index=INPUT_WINDOW - 1):
+    """
+    가격 윈도우를 base_index 위치 종가(= 입력의 마지막 종가) 대비 변화율로 바꿉니다.
+    자산마다 가격 단위가 크게 달라도 같은 스케일로 학습/추론하기 위함입니다.
+    반환값: (변화율 배열, 기준 종가 (batch, 1))
+    """
+    base = windows[:, base_index:base_index + 1]
+    return windows / base - 1.0, base
+
+
+def run_forecast(windows):
+    """
+    (batch, INPUT_WINDOW) 종가 배열을 (batch, INPUT_WINDOW, 1) 텐서로 쌓아 한 번의 forward 로 예측합니다.
+    target='relative' 모델은 마지막 종가 대비 변화율을 입력받아 같은 단위로 예측하고 (train_forecaster 와 동일한 정규화),
+    target='delta' 모델(초기화된 가중치, hparams 없는 이전 체크포인트)은 원 가격을 입력받아 마지막 종가 대비 차이를 예측합니다.
+    반환값: (batch, OUTPUT_WINDOW) 실제 가격 단위 예측값
+    """
+    forecaster = get_forecaster()
+    if forecaster.target == 'relative':
+        inputs, last_close = normalize_windows(windows)
+    else:
+        inputs, last_close = windows, windows[:, -1:]
+    x = torch.from_numpy(np.ascontiguousarray(inputs, dtype=np.float32)).unsqueeze(-1)
+    started_at = time.perf_counter()
     with torch.no_grad():
-        forecast = model(x)
+        forecast = forecaster.module(x)
+    logger.debug(
+        f"🔮 예측 {len(windows)}건 ({forecaster.mode}): {(time.perf_counter() - started_at) * 1000:.1f}ms"
+    )
+    forecast = forecast.cpu().numpy()
+    if forecaster.target == 'relative':
+        return last_close * (1.0 + forecast)
+    return last_close + forecast
+
 
-    last_close = float(close_values[-1])  # 마지막 실제 종가
-    forecast = forecast.squeeze().cpu().numpy() + last_close
+def to_decimal_list(values):
+    """후처리: 소수점 2자리 Decimal 리스트"""
+    return [Decimal(str(val)).quantize(Decimal('0.01')) for val in values]
 
-    # 예측에 변동성 추가
-    forecast_with_volatility = add_volatility(forecast)
 
-    # 후처리: 소수점 2자리까지 반올림하여 반환
+def compute_forecasts(windows, last_dates, symbols):
+    """
+    symbols 의 종가 윈도우를 한 번의 배치 추론으로 예측하고, 예측 밴드(p10/p50/p90)를 함께 계산합니다.
+    밴드 난수 시드는 (symbol, 마지막 봉 날짜) 로 정해지므로 같은 입력이면 항상 같은 결과입니다.
+
+    반환값: {symbol: {"forecast": Decimal 리스트, "bands": {"p10": [...], "p50": [...], "p90": [...]}}}
+    """
+    if not symbols:
+        return {}
+    inputs = np.stack([windows[symbol] for symbol in symbols])
+    predicted = run_forecast(inputs)
+    bands = forecast_bands(predicted, inputs, [band_seed(symbol, last_dates[symbol]) for symbol in symbols])
     return {
-        "asset": asset_symbol,
-        "forecast": [Decimal(str(val)).quantize(Decimal('0.01')) for val in forecast_with_volatility]  # 소수점 2자리로 반환
+        symbol: {
+            "forecast": to_decimal_list(predicted[i]),
+            "bands": {name: to_decimal_list(values[i]) for name, values in bands.items()},
+        }
+        for i, symbol in enumerate(symbols)
+    }
+
+
+def predict_forecast_batch(asset_symbols):
+    """
+    여러 자산의 향후 OUTPUT_WINDOW 일 종가를 한 번의 배치 추론으로 예측합니다.
+    데이터가 부족하거나 존재하지 않는 자산은 배치 전체를 실패시키지 않고 항목별 error 로 반환합니다.
+    결과는 (symbol, 마지막 봉 날짜, 입력 윈도우 해시, 모델 버전) 기준으로 캐시되며,
+    캐시 → 야간 배치 결과(ForecastResult) 순으로 찾고 둘 다 없는 항목만 추론합니다.
+
+    반환값: 요청 순서대로 [{"asset": symbol, "forecast": [...], "bands": {"p10", "p50", "p90"}}
+            또는 {"asset": symbol, "error": "..."}]
+    """
+    asset_symbols = list(dict.fromkeys(asset_symbols))  # 중복 제거 (순서 유지)
+    windows, last_dates, errors = load_close_windows(asset_symbols)
+
+    model_version = get_forecaster().version if windows else None
+    keys = {
+        symbol: (last_dates[symbol], forecast_cache.window_digest(windows[symbol]), model_version)
+        for symbol in windows
     }
+    forecasts = forecast_cache.get_cached(keys)
+
+    # 캐시에 없으면 야간 배치 결과 테이블을 먼저 확인
+    precomputed = load_precomputed({symbol: key for symbol, key in keys.items() if symbol not in forecasts})
+    forecast_cache.set_cached(precomputed, keys)
+    forecasts.update(precomputed)
+
+    # 그래도 없는 항목: 잠금을 얻은 항목은 직접 계산하고, 다른 요청이 계산 중인 항목은 결과를 기다림
+    misses = {symbol: key for symbol, key in keys.items() if symbol not in forecasts}
+    owned = {symbol: misses[symbol] for symbol in forecast_cache.claim(misses)}
+    try:
+        computed = compute_forecasts(windows, last_dates, list(owned))
+        forecast_cache.set_cached(computed, keys)
+    finally:
+        forecast_cache.release(owned)
+    forecasts.update(computed)
+
+    waiting = {symbol: key for symbol, key in misses.items() if symbol not in owned}
+    if waiting:
+        forecasts.update(forecast_cache.wait_for(waiting))
+        # 기다리는 동안 계산하던 쪽이 실패했거나 시간이 초과된 항목은 직접 계산
+        forecasts.update(compute_forecasts(windows, last_dates, [symbol for symbol in waiting if symbol not in forecasts]))
+
+    results = []
+    for symbol in asset_symbols:
+        if symbol in forecasts:
+            results.append({"asset": symbol, **forecasts[symbol]})
+        else:
+            results.append({"asset": symbol, "error": errors[symbol]})
+    return results
+
+
+def predict_forecast(asset_symbol):
+    """
+    특정 자산의 최근 OHLCV 데이터를 기반으로 향후 OUTPUT_WINDOW 일의 실제 종가를 예측합니다.
+    (모델 출력은 체크포인트의 target 에 따라 마지막 종가 대비 변화율('relative') 또는 차이('delta')이며,
+     run_forecast 에서 실제 가격 단위로 변환됩니다)
+    """
+    result = predict_forecast_batch([asset_symbol])[0]
+    if "error" in result:
+        raise ValueError(result["error"])
+    return result
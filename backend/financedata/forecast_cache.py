@@ -0,0 +1,89 @@
+import hashlib
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+# 예측 결과 캐시
+# 자산별로 {"key": (마지막 봉 날짜, 입력 윈도우 해시, 모델 버전), "forecast": [...]} 를 한 항목에 보관합니다.
+# 새 봉이 들어오거나, 같은 날짜의 봉이 정정되거나(입력 윈도우 해시 변경), 모델이 바뀌면 key 가 달라져
+# 자동으로 무효가 되므로 수집 프로세스에서 웹 워커로 무효화 신호를 보낼 필요가 없습니다.
+# 계산 잠금(cache.add)이 워커 간에 동작하려면 공유 캐시(settings.CACHES 의 Redis)가 필요합니다.
+# (torch 를 import 하지 않으므로 수집 워커에서도 가볍게 사용할 수 있습니다.)
+
+FORECAST_CACHE_TIMEOUT = getattr(settings, 'FORECAST_CACHE_TIMEOUT', 60 * 60 * 24 * 2)
+
+# 같은 key 의 캐시 미스가 동시에 발생하면 한 요청만 계산하고 나머지는 결과를 기다립니다.
+# 계산하던 프로세스가 죽어도 FORECAST_LOCK_TIMEOUT 이 지나면 잠금이 풀립니다.
+FORECAST_LOCK_TIMEOUT = getattr(settings, 'FORECAST_LOCK_TIMEOUT', 30)
+FORECAST_LOCK_POLL_INTERVAL = 0.05
+
+
+def window_digest(window):
+    """예측 입력 종가 윈도우의 해시 (16자리 hex) - 같은 날짜의 봉이 정정되면 바뀝니다."""
+    return hashlib.blake2b(np.ascontiguousarray(window, dtype=np.float32).tobytes(), digest_size=8).hexdigest()
+
+
+def _entry_key(symbol):
+    return f"forecast:{symbol}"
+
+
+def _lock_key(symbol, key):
+    return f"forecast_lock:{symbol}:{':'.join(map(str, key))}"
+
+
+def get_cached(keys):
+    """
+    keys: {symbol: (마지막 봉 날짜, 입력 윈도우 해시, 모델 버전)}
+    반환값: key 가 일치하는 캐시 항목만 {symbol: forecast}
+    """
+    entries = cache.get_many([_entry_key(symbol) for symbol in keys])
+    hits = {}
+    for symbol, key in keys.items():
+        entry = entries.get(_entry_key(symbol))
+        if entry is not None and entry["key"] == key:
+            hits[symbol] = entry["forecast"]
+    return hits
+
+
+def set_cached(forecasts, keys):
+    """forecasts: {symbol: forecast} 를 keys 의 (마지막 봉 날짜, 입력 윈도우 해시, 모델 버전) 과 함께 저장합니다."""
+    cache.set_many(
+        {_entry_key(symbol): {"key": keys[symbol], "forecast": forecast} for symbol, forecast in forecasts.items()},
+        FORECAST_CACHE_TIMEOUT,
+    )
+
+
+def claim(keys):
+    """
+    계산 잠금을 시도합니다. (cache.add 는 키가 없을 때만 성공하는 원자적 연산)
+    반환값: 이 호출이 계산을 맡게 된 symbol 리스트
+    """
+    return [symbol for symbol, key in keys.items() if cache.add(_lock_key(symbol, key), 1, FORECAST_LOCK_TIMEOUT)]
+
+
+def release(keys):
+    cache.delete_many([_lock_key(symbol, key) for symbol, key in keys.items()])
+
+
+def wait_for(keys, timeout=FORECAST_LOCK_TIMEOUT):
+    """
+    다른 요청이 계산 중인 항목의 결과를 기다립니다.
+    계산하던 쪽이 실패해 잠금이 먼저 풀린 항목은 더 기다리지 않습니다.
+    반환값: 캐시에 저장된 항목 {symbol: forecast} (나머지는 호출한 쪽에서 직접 계산)
+    """
+    deadline = time.monotonic() + timeout
+    pending = dict(keys)
+    found = {}
+    while pending:
+        found.update(get_cached(pending))
+        locks = cache.get_many([_lock_key(symbol, key) for symbol, key in pending.items()])
+        pending = {
+            symbol: key for symbol, key in pending.items()
+            if symbol not in found and _lock_key(symbol, key) in locks
+        }
+        if not pending or time.monotonic() >= deadline:
+            break
+        time.sleep(FORECAST_LOCK_POLL_INTERVAL)
+    return found
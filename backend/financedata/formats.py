@@ -0,0 +1,92 @@
+import numpy as np
+
+# CSV 스트리밍 시 한 번에 문자열로 변환할 행 수
+CSV_CHUNK_ROWS = 5000
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+# ?format=binary 응답 레이아웃 (리틀 엔디언, 컬럼 순서대로 n개씩 연속 배치, date 는 1970-01-01 기준 일수)
+BINARY_DTYPES = (('date', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'), ('volume', '<i8'))
+BINARY_LAYOUT = ','.join(f"{name}:{dtype}" for name, dtype in BINARY_DTYPES)
+
+
+def _price_strings(values):
+    """DecimalField 직렬화와 같은 소수점 2자리 문자열"""
+    return np.char.mod('%.2f', values).tolist()
+
+
+def ohlcv_rows(asset_label, columns, ids=None):
+    """
+    OHLCVColumns 를 기존 OHLCVSerializer(fields='__all__') 와 같은 형태의 행 목록으로 변환합니다. (날짜 내림차순)
+    {"id", "asset": str(asset) (StringRelatedField), "date", "open"~"close": 소수점 2자리 문자열, "volume"}
+    ids: columns 와 같은 순서(날짜 오름차순)의 OHLCV pk 목록 (columnar.row_ids). 없으면 id 를 생략합니다. (리샘플 봉)
+    """
+    dates = columns.date[::-1].astype(str).tolist()
+    prices = [_price_strings(getattr(columns, field)[::-1]) for field in PRICE_FIELDS]
+    volumes = columns.volume[::-1].tolist()
+    rows = [
+        {"asset": asset_label, "date": date, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for date, o, h, l, c, v in zip(dates, *prices, volumes)
+    ]
+    if ids is not None:
+        rows = [{"id": row_id, **row} for row_id, row in zip(ids[::-1], rows)]
+    return rows
+
+
+def ohlcv_columnar(asset_label, columns):
+    """
+    컬럼형 JSON: {"asset": ..., "date": [...], "open": [...], ...} (날짜 오름차순, 가격은 숫자)
+    """
+    payload = {"asset": asset_label, "date": columns.date.astype(str).tolist()}
+    for field in PRICE_FIELDS:
+        payload[field] = getattr(columns, field).tolist()
+    payload["volume"] = columns.volume.tolist()
+    return payload
+
+
+def iter_ohlcv_csv(columns, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    CSV 를 CSV_CHUNK_ROWS 단위로 생성하는 제너레이터 (날짜 오름차순)
+    memmap 을 구간별로 읽으므로 전체 기간을 메모리에 올리지 않습니다.
+    """
+    yield "date,open,high,low,close,volume\n"
+    for start in range(0, len(columns), chunk_rows):
+        chunk = columns.slice(start, start + chunk_rows)
+        dates = chunk.date.astype(str).tolist()
+        prices = [_price_strings(getattr(chunk, field)) for field in PRICE_FIELDS]
+        volumes = chunk.volume.tolist()
+        yield "".join(
+            f"{date},{o},{h},{l},{c},{v}\n"
+            for date, o, h, l, c, v in zip(dates, *prices, volumes)
+        )
+
+
+def ohlcv_binary(columns):
+    """
+    차트 클라이언트용 바이너리: BINARY_LAYOUT 순서로 각 컬럼을 n개씩 연속 배치 (Float64Array 등으로 바로 view 가능)
+    """
+    arrays = (columns.date.view(np.int64), *columns[1:])
+    return b"".join(
+        np.asarray(array, dtype=dtype).tobytes()
+        for array, (_, dtype) in zip(arrays, BINARY_DTYPES)
+    )
+
+
+def ohlcv_arrow(columns):
+    """
+    Arrow IPC 스트림 포맷 (pyarrow 필요)
+    """
+    import pyarrow as pa
+
+    batch = pa.RecordBatch.from_arrays(
+        [
+            pa.array(np.asarray(columns.date)),
+            *(pa.array(np.asarray(getattr(columns, field))) for field in PRICE_FIELDS),
+            pa.array(np.asarray(columns.volume)),
+        ],
+        names=['date', *PRICE_FIELDS, 'volume'],
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
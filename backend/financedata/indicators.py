@@ -0,0 +1,317 @@
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+from django.core.cache import cache
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from . import columnar
+
+########################################
+# 벡터화 지표 커널
+# 모든 함수는 입력과 같은 길이의 float64 배열을 반환하며, 계산할 수 없는 앞부분은 NaN 입니다.
+########################################
+
+
+def _nan_like(x):
+    return np.full(len(x), np.nan, dtype=np.float64)
+
+
+def _smoothed(x, alpha, period):
+    """
+    지수 평활 (y[t] = y[t-1] + alpha * (x[t] - y[t-1]))
+    첫 period 개의 단순평균으로 시작값을 잡고, 이후는 IIR 필터(lfilter)로 한 번에 계산합니다.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = _nan_like(x)
+    if len(x) < period:
+        return out
+    seed = x[:period].mean()
+    out[period - 1] = seed
+    if len(x) > period:
+        out[period:] = lfilter([alpha], [1.0, alpha - 1.0], x[period:], zi=[(1.0 - alpha) * seed])[0]
+    return out
+
+
+def sma(x, period=20):
+    """단순 이동평균"""
+    x = np.asarray(x, dtype=np.float64)
+    out = _nan_like(x)
+    if len(x) < period:
+        return out
+    csum = np.cumsum(np.concatenate(([0.0], x)))
+    out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def ema(x, period=20):
+    """지수 이동평균 (alpha = 2 / (period + 1))"""
+    return _smoothed(x, 2.0 / (period + 1), period)
+
+
+def _rsi_gain_loss(close, period):
+    delta = np.diff(np.asarray(close, dtype=np.float64))
+    avg_gain = _smoothed(np.clip(delta, 0, None), 1.0 / period, period)
+    avg_loss = _smoothed(np.clip(-delta, 0, None), 1.0 / period, period)
+    return avg_gain, avg_loss
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        rsi = 100.0 - 100.0 / (1.0 + rs)
+    return np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+
+
+def rsi(close, period=14):
+    """RSI (Wilder 평활)"""
+    out = _nan_like(close)
+    if len(close) <= period:
+        return out
+    avg_gain, avg_loss = _rsi_gain_loss(close, period)
+    out[1:] = _rsi_from_averages(avg_gain, avg_loss)
+    out[:period] = np.nan
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD 라인, 시그널 라인, 히스토그램"""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = _nan_like(line)
+    valid = ~np.isnan(line)
+    if valid.any():
+        first = int(np.argmax(valid))
+        signal_line[first:] = ema(line[first:], signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, period=20, k=2.0):
+    """볼린저 밴드 (상단, 중심, 하단) - 모표준편차 기준"""
+    close = np.asarray(close, dtype=np.float64)
+    middle = sma(close, period)
+    std = _nan_like(close)
+    if len(close) >= period:
+        std[period - 1:] = sliding_window_view(close, period).std(axis=1)
+    return middle + k * std, middle, middle - k * std
+
+
+def true_range(high, low, close):
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return tr
+
+
+def atr(high, low, close, period=14):
+    """ATR (True Range 의 Wilder 평활)"""
+    return _smoothed(true_range(high, low, close), 1.0 / period, period)
+
+
+def obv(close, volume):
+    """OBV (On-Balance Volume)"""
+    close = np.asarray(close, dtype=np.float64)
+    direction = np.sign(np.diff(close, prepend=close[:1]))
+    return np.cumsum(direction * np.asarray(volume, dtype=np.float64))
+
+
+########################################
+# 다중 지표 요청 파싱 / 계산
+# 예: "sma:20,ema:12,rsi:14,macd:12:26:9,bbands:20:2,atr:14,obv"
+########################################
+
+INDICATOR_DEFAULTS = {
+    'sma': (20,),
+    'ema': (20,),
+    'rsi': (14,),
+    'macd': (12, 26, 9),
+    'bbands': (20, 2.0),
+    'atr': (14,),
+    'obv': (),
+}
+
+# 한 요청에서 허용하는 최대 지표 수 / 최대 기간
+MAX_INDICATORS = 20
+MAX_PERIOD = 1000
+
+
+def parse_indicator_specs(text):
+    """
+    "name[:param[:param...]]" 를 쉼표로 나열한 문자열을 [(name, params), ...] 로 변환합니다.
+    잘못된 지표/파라미터면 ValueError
+    """
+    specs = []
+    for token in filter(None, (t.strip().lower() for t in (text or '').split(','))):
+        name, *raw_params = token.split(':')
+        if name not in INDICATOR_DEFAULTS:
+            raise ValueError(f"지원하지 않는 지표입니다: '{name}' ({', '.join(INDICATOR_DEFAULTS)})")
+        defaults = INDICATOR_DEFAULTS[name]
+        if len(raw_params) > len(defaults):
+            raise ValueError(f"'{name}' 지표의 파라미터가 너무 많습니다.")
+        try:
+            params = tuple(
+                type(default)(raw) if raw else default
+                for raw, default in zip(raw_params + [''] * (len(defaults) - len(raw_params)), defaults)
+            )
+        except ValueError:
+            raise ValueError(f"'{token}' 의 파라미터가 올바르지 않습니다.")
+        if any(p <= 0 or p > MAX_PERIOD for p in params):
+            raise ValueError(f"'{token}' 의 파라미터는 1 ~ {MAX_PERIOD} 사이여야 합니다.")
+        specs.append((name, params))
+
+    if not specs:
+        raise ValueError("indicators 파라미터가 필요합니다. (예: sma:20,rsi:14,macd)")
+    if len(specs) > MAX_INDICATORS:
+        raise ValueError(f"지표는 최대 {MAX_INDICATORS}개까지 요청할 수 있습니다.")
+    return specs
+
+
+def specs_key(specs):
+    """specs 를 캐시 키용 문자열로 정규화합니다. (예: "sma_20,rsi_14,macd_12_26_9")"""
+    return ','.join(name + ''.join(f"_{p:g}" for p in params) for name, params in specs)
+
+
+def compute_indicators(columns, specs):
+    """
+    OHLCVColumns 에 대해 specs 의 지표를 계산하여 {컬럼 이름: 배열} 로 반환합니다.
+    컬럼 이름은 지표 이름과 파라미터를 이어 붙인 형태입니다. (예: sma_20, macd_signal_12_26_9)
+    """
+    close, high, low, volume = columns.close, columns.high, columns.low, columns.volume
+    result = {}
+    for name, params in specs:
+        suffix = ''.join(f"_{p:g}" for p in params)
+        if name == 'sma':
+            result[f"sma{suffix}"] = sma(close, *params)
+        elif name == 'ema':
+            result[f"ema{suffix}"] = ema(close, *params)
+        elif name == 'rsi':
+            result[f"rsi{suffix}"] = rsi(close, *params)
+        elif name == 'macd':
+            line, signal_line, hist = macd(close, *params)
+            result[f"macd{suffix}"] = line
+            result[f"macd_signal{suffix}"] = signal_line
+            result[f"macd_hist{suffix}"] = hist
+        elif name == 'bbands':
+            upper, middle, lower = bollinger(close, *params)
+            result[f"bb_upper{suffix}"] = upper
+            result[f"bb_middle{suffix}"] = middle
+            result[f"bb_lower{suffix}"] = lower
+        elif name == 'atr':
+            result[f"atr{suffix}"] = atr(high, low, close, *params)
+        elif name == 'obv':
+            result["obv"] = obv(close, volume)
+    return result
+
+
+def to_json_list(values):
+    """NaN 을 None 으로 바꾼 리스트 (엄격한 JSON 직렬화용)"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), None, np.round(values, 4)).tolist()
+
+
+########################################
+# 증분 갱신용 상태 (EMA / RSI)
+# 수집으로 봉이 뒤에 추가되면 전체 이력을 다시 계산하지 않고 새 봉만큼 한 단계씩 진행합니다.
+########################################
+
+STATE_EMA_PERIODS = (12, 20, 26, 50, 200)
+STATE_RSI_PERIODS = (14,)
+STATE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+@dataclass
+class IndicatorState:
+    last_date: str = ''  # 상태가 반영된 마지막 봉 날짜 (ISO)
+    last_close: float = math.nan
+    bars: int = 0
+    ema: dict = field(default_factory=dict)  # {period: 값}
+    rsi: dict = field(default_factory=dict)  # {period: (avg_gain, avg_loss)}
+
+    def step(self, close):
+        """종가 1개만큼 상태를 진행합니다. (O(지표 수))"""
+        for period, value in self.ema.items():
+            if not math.isnan(value):
+                self.ema[period] = value + 2.0 / (period + 1) * (close - value)
+        for period, (avg_gain, avg_loss) in self.rsi.items():
+            if not math.isnan(avg_gain):
+                delta = close - self.last_close
+                self.rsi[period] = (
+                    avg_gain + (max(delta, 0.0) - avg_gain) / period,
+                    avg_loss + (max(-delta, 0.0) - avg_loss) / period,
+                )
+        self.last_close = close
+        self.bars += 1
+
+    def values(self):
+        """현재 상태의 지표 값 {ema_12: ..., rsi_14: ...}"""
+        result = {f"ema_{period}": value for period, value in self.ema.items()}
+        for period, (avg_gain, avg_loss) in self.rsi.items():
+            result[f"rsi_{period}"] = float(_rsi_from_averages(np.float64(avg_gain), np.float64(avg_loss)))
+        return result
+
+
+def build_state(columns, ema_periods=STATE_EMA_PERIODS, rsi_periods=STATE_RSI_PERIODS):
+    """전체 이력으로 상태를 새로 계산합니다. (벡터화 커널 사용)"""
+    state = IndicatorState(bars=len(columns))
+    if len(columns) == 0:
+        return state
+    close = columns.close
+    state.last_date = str(columns.date[-1])
+    state.last_close = float(close[-1])
+    state.ema = {period: float(ema(close, period)[-1]) for period in ema_periods}
+    for period in rsi_periods:
+        if len(close) > period:
+            avg_gain, avg_loss = _rsi_gain_loss(close, period)
+            state.rsi[period] = (float(avg_gain[-1]), float(avg_loss[-1]))
+        else:
+            state.rsi[period] = (math.nan, math.nan)
+    return state
+
+
+def advance_state(state, columns):
+    """
+    state 이후에 추가된 봉만큼 상태를 진행합니다.
+    기존 봉이 바뀌었거나(정정 데이터) 앞쪽 데이터가 바뀐 경우에는 전체를 다시 계산합니다.
+    """
+    if not state.last_date or len(columns) < state.bars:
+        return build_state(columns)
+
+    pos = np.searchsorted(columns.date, np.datetime64(state.last_date, 'D'))
+    if (
+        pos >= len(columns)
+        or pos != state.bars - 1
+        or str(columns.date[pos]) != state.last_date
+        or float(columns.close[pos]) != state.last_close
+    ):
+        return build_state(columns)
+
+    # 아직 계산 가능한 길이에 도달하지 못한 지표가 있으면 전체 계산이 더 간단함
+    if any(math.isnan(v) for v in state.ema.values()) or any(math.isnan(g) for g, _ in state.rsi.values()):
+        return build_state(columns)
+
+    for close in columns.close[pos + 1:].tolist():
+        state.step(close)
+    state.last_date = str(columns.date[-1])
+    return state
+
+
+def get_latest_state(asset_id):
+    """
+    자산의 최신 지표 상태를 반환합니다. (Django 캐시에 보관, 새 봉만큼만 증분 계산)
+    캐시는 웹/Celery 워커가 공유하므로 수집 시 진행한 상태를 API 요청에서 그대로 사용합니다.
+    """
+    key = f"indicator_state:{asset_id}"
+    columns = columnar.get_columns(asset_id)
+    state = cache.get(key)
+    if state is None:
+        state = build_state(columns)
+    elif (
+        state.bars == len(columns)
+        and state.last_date == (str(columns.date[-1]) if len(columns) else '')
+        and (not len(columns) or state.last_close == float(columns.close[-1]))
+    ):
+        return state
+    else:
+        state = advance_state(state, columns)
+    cache.set(key, state, STATE_CACHE_TIMEOUT)
+    return state
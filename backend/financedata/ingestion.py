@@ -0,0 +1,176 @@
+import logging
+import time
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from . import columnar, indicators, snapshot
+from .models import Asset, OHLCV
+
+logger = logging.getLogger(__name__)
+
+# 한 번의 INSERT ... ON CONFLICT 문에 담을 최대 행 수
+OHLCV_UPSERT_BATCH_SIZE = getattr(settings, 'OHLCV_UPSERT_BATCH_SIZE', 2000)
+
+OHLCV_PRICE_FIELDS = ['open', 'high', 'low', 'close']
+OHLCV_UPDATE_FIELDS = OHLCV_PRICE_FIELDS + ['volume']
+
+# FinanceDataReader DataFrame 컬럼 → OHLCV 필드
+FDR_COLUMN_MAP = {
+    'Open': 'open',
+    'High': 'high',
+    'Low': 'low',
+    'Close': 'close',
+    'Volume': 'volume',
+}
+
+
+def normalize_ohlcv_frame(df):
+    """
+    FDR DataFrame을 (date, open, high, low, close, volume) 형태로 정리합니다.
+    - 가격이 비어 있는 행은 제거하고, 거래량이 없으면 0으로 채웁니다.
+    - 같은 날짜가 중복되면 마지막 행만 남깁니다. (ON CONFLICT 는 한 문장에서 같은 키를 두 번 갱신할 수 없음)
+    """
+    frame = df.rename(columns=FDR_COLUMN_MAP)
+    if 'volume' not in frame.columns:
+        frame['volume'] = 0
+    frame = frame[OHLCV_UPDATE_FIELDS].dropna(subset=OHLCV_PRICE_FIELDS)
+
+    frame = frame.copy()
+    frame.index = frame.index.date if hasattr(frame.index, 'date') else frame.index
+    frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+
+    frame[OHLCV_PRICE_FIELDS] = frame[OHLCV_PRICE_FIELDS].astype(float).round(2)
+    frame['volume'] = frame['volume'].fillna(0).astype('int64')
+    frame.index.name = 'date'
+    return frame
+
+
+def bulk_upsert_ohlcv(asset, df, batch_size=OHLCV_UPSERT_BATCH_SIZE):
+    """
+    자산 하나의 DataFrame을 (asset, date) 유니크 제약 기준으로 배치 upsert 합니다.
+    행마다 update_or_create 를 호출하던 방식(행당 쿼리 2회)을 배치당 쿼리 2회로 줄입니다.
+
+    반환값: {"rows": 전체 행 수, "inserted": 신규 행 수, "updated": 갱신 행 수, "batches": 배치 수}
+    """
+    frame = normalize_ohlcv_frame(df)
+    result = {"rows": len(frame), "inserted": 0, "updated": 0, "batches": 0}
+    if frame.empty:
+        return result
+
+    dates = list(frame.index)
+    records = frame.to_dict('records')
+
+    with transaction.atomic():
+        for start in range(0, len(records), batch_size):
+            started_at = time.perf_counter()
+            batch_dates = dates[start:start + batch_size]
+            batch_records = records[start:start + batch_size]
+
+            # 신규/갱신 건수 집계를 위해 이미 존재하는 날짜를 한 번에 조회
+            existing = set(
+                OHLCV.objects.filter(asset=asset, date__in=batch_dates).values_list('date', flat=True)
+            )
+            objs = [
+                OHLCV(asset=asset, date=date, **record)
+                for date, record in zip(batch_dates, batch_records)
+            ]
+            OHLCV.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=['asset', 'date'],
+                update_fields=OHLCV_UPDATE_FIELDS,
+            )
+
+            updated = len(existing)
+            inserted = len(objs) - updated
+            result["inserted"] += inserted
+            result["updated"] += updated
+            result["batches"] += 1
+
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            logger.info(
+                f"📦 {asset.symbol} 배치 {result['batches']}: "
+                f"신규 {inserted}건 / 갱신 {updated}건 ({elapsed_ms:.1f}ms)"
+            )
+
+    # 읽기 경로용 컬럼형 캐시에 반영하고, 지표 상태(EMA/RSI)와 최신 봉 스냅샷을 갱신
+    columnar.update_cache(asset.id, frame)
+    try:
+        indicators.get_latest_state(asset.id)
+    except Exception as e:
+        logger.warning(f"⚠️ {asset.symbol} 지표 상태 갱신 실패: {e}")
+    try:
+        snapshot.update_snapshot(asset.id, columnar.get_columns(asset.id))
+    except Exception as e:
+        logger.warning(f"⚠️ {asset.symbol} 시장 스냅샷 갱신 실패: {e}")
+    return result
+
+
+def sync_asset_universe(listing, batch_size=OHLCV_UPSERT_BATCH_SIZE):
+    """
+    상장 종목 목록(asset_type, name, symbol 컬럼의 DataFrame)과 DB의 Asset 을 집합 단위로 동기화합니다.
+    - 신규 종목: bulk_create
+    - 이름/종류 변경 종목: bulk_update
+    - 목록에서 사라진 종목: is_active=False (OHLCV 수집 대상에서 제외)
+    - 다시 나타난 종목: is_active=True
+    상장폐지 판정은 listing 에 포함된 asset_type 안에서만 합니다. (수집하지 못한 시장은 건드리지 않음)
+
+    반환값: {"total", "new", "renamed", "delisted", "relisted"} 건수
+    """
+    listing = (
+        listing.dropna(subset=['symbol', 'name'])
+        .astype({'symbol': str, 'name': str})
+        .drop_duplicates(subset='symbol', keep='first')
+    )
+    existing = pd.DataFrame(
+        list(Asset.objects.values_list('id', 'symbol', 'name', 'asset_type', 'is_active')),
+        columns=['id', 'symbol', 'name', 'asset_type', 'is_active'],
+    )
+    merged = listing.merge(existing, on='symbol', how='outer', suffixes=('', '_db'), indicator=True)
+
+    in_listing = merged['_merge'] == 'left_only'
+    in_both = merged['_merge'] == 'both'
+    in_db_only = merged['_merge'] == 'right_only'
+
+    new_rows = merged[in_listing]
+    changed_rows = merged[
+        in_both & ((merged['name'] != merged['name_db']) | (merged['asset_type'] != merged['asset_type_db']))
+    ]
+    delisted_ids = merged.loc[
+        in_db_only
+        & merged['is_active'].astype(bool)
+        & merged['asset_type_db'].isin(listing['asset_type'].unique()),
+        'id',
+    ].astype('int64').tolist()
+    relisted_ids = merged.loc[in_both & ~merged['is_active'].astype(bool), 'id'].astype('int64').tolist()
+
+    with transaction.atomic():
+        Asset.objects.bulk_create(
+            [
+                Asset(asset_type=asset_type, name=name, symbol=symbol)
+                for asset_type, name, symbol in new_rows[['asset_type', 'name', 'symbol']].itertuples(index=False)
+            ],
+            batch_size=batch_size,
+        )
+        Asset.objects.bulk_update(
+            [
+                Asset(id=int(asset_id), name=name, asset_type=asset_type)
+                for asset_id, name, asset_type in changed_rows[['id', 'name', 'asset_type']].itertuples(index=False)
+            ],
+            fields=['name', 'asset_type'],
+            batch_size=batch_size,
+        )
+        if delisted_ids:
+            Asset.objects.filter(id__in=delisted_ids).update(is_active=False)
+        if relisted_ids:
+            Asset.objects.filter(id__in=relisted_ids).update(is_active=True)
+
+    return {
+        "total": len(listing),
+        "new": len(new_rows),
+        "renamed": len(changed_rows),
+        "delisted": len(delisted_ids),
+        "relisted": len(relisted_ids),
+    }
@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from financedata.backtest import BACKTEST_BATCH_SIZE, run_backtest, summarize_backtest
+from financedata.models import BacktestRun
+
+
+class Command(BaseCommand):
+    help = "예측 모델 walk-forward 백테스트를 동기로 실행하고 요약을 출력합니다. (결과는 BacktestResult 에 저장)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help="예측 시점 범위 시작 (YYYY-MM-DD)")
+        parser.add_argument('--end', required=True, help="예측 시점 범위 끝 (YYYY-MM-DD)")
+        parser.add_argument('--step', type=int, default=5, help="예측 시점 간격 (봉 단위)")
+        parser.add_argument('--symbols', nargs='+', default=[])
+        parser.add_argument('--asset-types', nargs='+', default=[])
+        parser.add_argument('--batch-size', type=int, default=BACKTEST_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        start_date, end_date = parse_date(options['start']), parse_date(options['end'])
+        if not start_date or not end_date or start_date > end_date or options['step'] < 1:
+            raise CommandError("올바른 --start / --end / --step 값을 입력하세요.")
+
+        run = BacktestRun.objects.create(
+            start_date=start_date,
+            end_date=end_date,
+            step=options['step'],
+            symbols=options['symbols'],
+            asset_types=options['asset_types'],
+            status='running',
+        )
+        try:
+            run_backtest(run, batch_size=options['batch_size'])
+        except Exception as e:
+            run.status, run.error = 'failed', str(e)
+            run.save()
+            raise CommandError(f"백테스트 #{run.id} 실패: {e}")
+        run.status = 'done'
+        run.save()
+
+        self.stdout.write(json.dumps(summarize_backtest(run), ensure_ascii=False, indent=2, default=str))
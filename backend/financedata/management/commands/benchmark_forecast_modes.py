@@ -0,0 +1,59 @@
+import time
+
+import torch
+from django.core.management.base import BaseCommand
+
+from financedata.forecast import FORECAST_MODEL_PATH, INPUT_WINDOW, load_forecaster
+
+# 비교할 로딩 방식: 이름 → (quantize, compile_mode)
+MODES = {
+    'eager': (False, None),
+    'int8': (True, None),
+    'torchscript': (False, 'torchscript'),
+    'int8+torchscript': (True, 'torchscript'),
+    'compile': (False, 'compile'),
+}
+
+
+class Command(BaseCommand):
+    help = "예측 모델 로딩 방식(eager / int8 양자화 / TorchScript / torch.compile)별 로드 시간과 예측 지연 시간 비교"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=list(MODES),
+                            default=['eager', 'int8', 'torchscript', 'int8+torchscript'])
+        parser.add_argument('--path', default=FORECAST_MODEL_PATH, help="체크포인트 경로")
+        parser.add_argument('--batch-size', type=int, default=1)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--threads', type=int, default=None, help="torch.set_num_threads 값")
+
+    def handle(self, *args, **options):
+        torch.manual_seed(0)
+        x = torch.rand(options['batch_size'], INPUT_WINDOW, 1) * 100
+
+        reference = None
+        rows = []
+        for name in options['modes']:
+            quantize, compile_mode = MODES[name]
+            loaded = load_forecaster(options['path'], quantize=quantize, compile_mode=compile_mode,
+                                     threads=options['threads'])
+            with torch.no_grad():
+                output = loaded.module(x)
+                started_at = time.perf_counter()
+                for _ in range(options['repeat']):
+                    loaded.module(x)
+                latency_ms = (time.perf_counter() - started_at) / options['repeat'] * 1000
+            if reference is None:
+                reference = output
+            rows.append((name, loaded, latency_ms, (output - reference).abs().max().item()))
+
+        self.stdout.write(
+            f"checkpoint version={rows[0][1].version}, batch={options['batch_size']}, "
+            f"repeat={options['repeat']}, threads={torch.get_num_threads()}\n"
+            f"{'mode':>16} | {'load (s)':>8} | {'warmup (ms)':>11} | {'forecast (ms)':>13} | "
+            f"max |diff| vs {options['modes'][0]}"
+        )
+        for name, loaded, latency_ms, max_diff in rows:
+            self.stdout.write(
+                f"{name:>16} | {loaded.load_seconds:>8.2f} | {loaded.warmup_ms:>11.1f} | "
+                f"{latency_ms:>13.2f} | {max_diff:.2e}"
+            )
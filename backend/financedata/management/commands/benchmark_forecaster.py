@@ -0,0 +1,53 @@
+import time
+
+import torch
+from django.core.management.base import BaseCommand
+
+from financedata.forecast import INPUT_WINDOW, build_model
+
+
+class Command(BaseCommand):
+    help = "AwesomeTransformerForecaster 의 기존 디코딩(forward)과 KV 캐시 디코딩(forward_incremental) 지연 시간 비교"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-windows', type=int, nargs='+', default=[14, 30, 60])
+        parser.add_argument('--batch-size', type=int, default=1)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--threads', type=int, default=None, help="torch.set_num_threads 값")
+
+    def handle(self, *args, **options):
+        if options['threads']:
+            torch.set_num_threads(options['threads'])
+        torch.manual_seed(0)
+        batch_size = options['batch_size']
+
+        self.stdout.write(
+            f"batch={batch_size}, repeat={options['repeat']}, threads={torch.get_num_threads()}\n"
+            f"{'output_window':>13} | {'forward (ms)':>12} | {'incremental (ms)':>16} | {'speedup':>7} | max |diff|"
+        )
+        for output_window in options['output_windows']:
+            model = build_model(output_window=output_window).eval()
+            x = torch.randn(batch_size, INPUT_WINDOW, 1)
+
+            with torch.no_grad():
+                reference = model(x)
+            max_diff = (reference - model.forward_incremental(x)).abs().max().item()
+
+            forward_ms = self._measure(lambda: model(x), options['warmup'], options['repeat'])
+            incremental_ms = self._measure(lambda: model.forward_incremental(x), options['warmup'], options['repeat'])
+            self.stdout.write(
+                f"{output_window:>13} | {forward_ms:>12.2f} | {incremental_ms:>16.2f} | "
+                f"{forward_ms / incremental_ms:>6.1f}x | {max_diff:.2e}"
+            )
+
+    @staticmethod
+    def _measure(fn, warmup, repeat):
+        """예측 1회당 평균 지연 시간 (ms)"""
+        with torch.no_grad():
+            for _ in range(warmup):
+                fn()
+            started_at = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+        return (time.perf_counter() - started_at) / repeat * 1000
@@ -0,0 +1,66 @@
+import os
+
+import torch
+from django.core.management.base import BaseCommand, CommandError
+
+from financedata import columnar
+from financedata.forecast import FORECAST_MODEL_PATH
+from financedata.models import Asset
+from financedata.training import build_window_dataset, load_dataset_rows, save_checkpoint, train_forecaster
+
+DEFAULT_DATASET_PATH = os.path.join(os.path.dirname(columnar.OHLCV_CACHE_DIR), 'datasets', 'forecast_windows.npy')
+
+
+class Command(BaseCommand):
+    help = "OHLCV 종가로 슬라이딩 윈도우 학습 데이터셋(memmap)을 만들고 예측 모델을 학습하여 체크포인트를 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', default=DEFAULT_DATASET_PATH, help="학습 데이터셋(.npy) 경로")
+        parser.add_argument('--rebuild', action='store_true', help="기존 데이터셋이 있어도 다시 생성")
+        parser.add_argument('--build-only', action='store_true', help="데이터셋만 만들고 학습은 하지 않음")
+        parser.add_argument('--asset-types', nargs='+', default=None, help="학습에 사용할 asset_type (기본: 전체)")
+        parser.add_argument('--stride', type=int, default=1, help="윈도우 시작 간격 (봉 단위)")
+        parser.add_argument('--epochs', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=256)
+        parser.add_argument('--lr', type=float, default=1e-3)
+        parser.add_argument('--workers', type=int, default=2, help="DataLoader 워커 수")
+        parser.add_argument('--val-fraction', type=float, default=0.05)
+        parser.add_argument('--threads', type=int, default=None, help="torch.set_num_threads 값")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default=FORECAST_MODEL_PATH, help="체크포인트 저장 경로")
+
+    def handle(self, *args, **options):
+        if options['threads']:
+            torch.set_num_threads(options['threads'])
+
+        dataset_path = options['dataset']
+        rows = None if options['rebuild'] else load_dataset_rows(dataset_path)
+        if rows is None:
+            assets = Asset.objects.all()
+            if options['asset_types']:
+                assets = assets.filter(asset_type__in=options['asset_types'])
+            asset_ids = list(assets.order_by('id').values_list('id', flat=True))
+            self.stdout.write(f"📦 자산 {len(asset_ids)}개로 학습 데이터셋 생성 중... ({dataset_path})")
+            rows = build_window_dataset(dataset_path, asset_ids, stride=options['stride'])
+            self.stdout.write(f"✅ 학습 샘플 {rows}개 생성 완료")
+        else:
+            self.stdout.write(f"📦 기존 학습 데이터셋 사용: 샘플 {rows}개 ({dataset_path})")
+
+        if options['build_only']:
+            return
+        if rows == 0:
+            raise CommandError("학습 샘플이 없습니다. OHLCV 데이터를 먼저 수집하세요.")
+
+        model, history = train_forecaster(
+            dataset_path,
+            rows,
+            epochs=options['epochs'],
+            batch_size=options['batch_size'],
+            lr=options['lr'],
+            workers=options['workers'],
+            val_fraction=options['val_fraction'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        )
+        save_checkpoint(model, options['output'], history=history, samples=rows)
+        self.stdout.write(self.style.SUCCESS(f"✅ 체크포인트 저장 완료: {options['output']}"))
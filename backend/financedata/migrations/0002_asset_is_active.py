@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financedata', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financedata', '0002_asset_is_active'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('model_version', models.CharField(max_length=40)),
+                ('forecast', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('asset', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast_result', to='financedata.asset')),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financedata', '0003_forecastresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BacktestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('step', models.PositiveIntegerField(default=5)),
+                ('symbols', models.JSONField(blank=True, default=list)),
+                ('asset_types', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('pending', '대기'), ('running', '실행 중'), ('done', '완료'), ('failed', '실패')], default='pending', max_length=10)),
+                ('model_version', models.CharField(blank=True, max_length=40)),
+                ('assets', models.IntegerField(default=0)),
+                ('samples', models.BigIntegerField(default=0)),
+                ('seconds', models.FloatField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BacktestResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon', models.PositiveSmallIntegerField()),
+                ('samples', models.IntegerField()),
+                ('mae', models.FloatField()),
+                ('mape', models.FloatField()),
+                ('directional_accuracy', models.FloatField()),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='backtest_results', to='financedata.asset')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='financedata.backtestrun')),
+            ],
+            options={
+                'unique_together': {('run', 'asset', 'horizon')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financedata', '0004_backtest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecastresult',
+            name='bands',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financedata', '0005_forecastresult_bands'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('open', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('high', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('low', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('close', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('volume', models.BigIntegerField()),
+                ('prev_date', models.DateField(blank=True, null=True)),
+                ('prev_close', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('change', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('change_pct', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('asset', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='financedata.asset')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['change_pct'], name='financedata_change__2ebbbe_idx'), models.Index(fields=['volume'], name='financedata_volume_209e4d_idx')],
+            },
+        ),
+    ]
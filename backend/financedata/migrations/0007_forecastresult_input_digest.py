@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financedata', '0006_marketsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecastresult',
+            name='input_digest',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
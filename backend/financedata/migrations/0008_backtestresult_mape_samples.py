@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financedata', '0007_forecastresult_input_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backtestresult',
+            name='mape_samples',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='backtestresult',
+            name='mape',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
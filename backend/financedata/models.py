@@ -13,6 +13,7 @@ class Asset(models.Model):
     name = models.CharField(max_length=255)  # 종목 이름
     symbol = models.CharField(max_length=50, unique=True)  # 심볼 (예: 005930, AAPL, BTC/USD)
     asset_type = models.CharField(max_length=20, choices=ASSET_TYPE_CHOICES)  # 자산 종류
+    is_active = models.BooleanField(default=True)  # 상장 여부 (상장폐지 종목은 OHLCV 수집 대상에서 제외)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -34,3 +35,86 @@ class OHLCV(models.Model):
 
     def __str__(self):
         return f"{self.asset.symbol} - {self.date}"
+
+
+# 야간 배치로 미리 계산한 예측 결과 (자산별 최신 1건)
+class ForecastResult(models.Model):
+    asset = models.OneToOneField(Asset, on_delete=models.CASCADE, related_name="forecast_result")
+    as_of = models.DateField()  # 예측에 사용한 마지막 봉 날짜
+    model_version = models.CharField(max_length=40)  # 예측 모델 체크포인트 버전
+    input_digest = models.CharField(max_length=16, blank=True, default='')  # 입력 종가 윈도우 해시 (같은 날짜 정정 감지)
+    forecast = models.JSONField()  # 향후 예측 종가 (소수점 2자리 문자열 리스트)
+    bands = models.JSONField(null=True, blank=True)  # 예측 밴드 {"p10": [...], "p50": [...], "p90": [...]}
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.asset.symbol} - {self.as_of} ({self.model_version})"
+
+
+# 예측 모델 walk-forward 백테스트 실행 (기간/자산 범위와 전체 진행 상황)
+class BacktestRun(models.Model):
+    STATUS_CHOICES = [
+        ('pending', '대기'),
+        ('running', '실행 중'),
+        ('done', '완료'),
+        ('failed', '실패'),
+    ]
+
+    start_date = models.DateField()  # 예측 시점(입력 마지막 봉) 범위 시작
+    end_date = models.DateField()  # 예측 시점 범위 끝
+    step = models.PositiveIntegerField(default=5)  # 예측 시점 간격 (봉 단위)
+    symbols = models.JSONField(default=list, blank=True)  # 대상 심볼 (비우면 asset_types 기준)
+    asset_types = models.JSONField(default=list, blank=True)  # 대상 자산 종류 (비우면 상장 자산 전체)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    model_version = models.CharField(max_length=40, blank=True)
+    assets = models.IntegerField(default=0)  # 평가된 자산 수
+    samples = models.BigIntegerField(default=0)  # 전체 예측 횟수
+    seconds = models.FloatField(null=True, blank=True)  # 실행 시간
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Backtest #{self.id} {self.start_date} ~ {self.end_date} ({self.status})"
+
+
+# 백테스트 결과: 자산 × 예측 horizon 별 지표
+class BacktestResult(models.Model):
+    run = models.ForeignKey(BacktestRun, on_delete=models.CASCADE, related_name="results")
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name="backtest_results")
+    horizon = models.PositiveSmallIntegerField()  # 며칠 뒤 종가에 대한 예측인지 (1 ~ OUTPUT_WINDOW)
+    samples = models.IntegerField()  # 예측 횟수
+    mae = models.FloatField()  # 평균 절대 오차 (가격 단위)
+    mape = models.FloatField(null=True, blank=True)  # 평균 절대 백분율 오차 (%, 실제 종가가 0 인 예측은 제외, 유효 예측이 없으면 None)
+    mape_samples = models.IntegerField(default=0)  # MAPE 계산에 사용된 예측 횟수
+    directional_accuracy = models.FloatField()  # 마지막 종가 대비 방향(상승/하락) 적중률 (%)
+
+    class Meta:
+        unique_together = ('run', 'asset', 'horizon')
+
+    def __str__(self):
+        return f"#{self.run_id} {self.asset.symbol} h={self.horizon}"
+
+
+# 자산별 최신 봉 스냅샷 (시장 개요용, 수집 시 증분 갱신)
+class MarketSnapshot(models.Model):
+    asset = models.OneToOneField(Asset, on_delete=models.CASCADE, related_name="snapshot")
+    date = models.DateField()  # 최신 봉 날짜
+    open = models.DecimalField(max_digits=15, decimal_places=2)
+    high = models.DecimalField(max_digits=15, decimal_places=2)
+    low = models.DecimalField(max_digits=15, decimal_places=2)
+    close = models.DecimalField(max_digits=15, decimal_places=2)
+    volume = models.BigIntegerField()
+    prev_date = models.DateField(null=True, blank=True)  # 직전 봉 날짜
+    prev_close = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    change = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)  # 전일 대비
+    change_pct = models.FloatField(null=True, blank=True)  # 전일 대비 등락률 (%)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['change_pct']),
+            models.Index(fields=['volume']),
+        ]
+
+    def __str__(self):
+        return f"{self.asset.symbol} - {self.date} ({self.close})"
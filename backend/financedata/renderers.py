@@ -0,0 +1,38 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    ?format=columnar : {"date": [...], "close": [...]} 형태의 컬럼형 JSON
+    """
+    format = 'columnar'
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    뷰에서 직접 만든 바이트(HttpResponse / StreamingHttpResponse)를 쓰는 포맷용 렌더러
+    콘텐츠 협상에서 포맷을 허용하는 역할만 하며, 에러 응답(dict)은 JSON 으로 인코딩합니다.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+class CSVRenderer(PassthroughRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class ArrowRenderer(PassthroughRenderer):
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+
+
+class BinaryRenderer(PassthroughRenderer):
+    media_type = 'application/octet-stream'
+    format = 'binary'
@@ -0,0 +1,57 @@
+import re
+
+import numpy as np
+
+from .columnar import OHLCVColumns
+
+# 지원하는 리샘플 규칙: W(주), M(월), Q(분기), ND(N일, 달력 기준)
+RESAMPLE_RULE_RE = re.compile(r'^(W|M|Q|(\d{1,3})D)$')
+
+# 1970-01-01 은 목요일 → +3 하면 월요일 시작 주 번호
+_EPOCH_WEEKDAY_OFFSET = 3
+
+
+def parse_rule(rule):
+    """규칙 문자열을 검증합니다. 잘못된 규칙이면 ValueError"""
+    match = RESAMPLE_RULE_RE.match(rule or '')
+    if not match or (match.group(2) is not None and int(match.group(2)) < 1):
+        raise ValueError(f"지원하지 않는 rule 입니다: '{rule}' (W, M, Q, 5D 등)")
+    return rule
+
+
+def period_keys(dates, rule):
+    """
+    각 일봉이 속한 기간 번호 (같은 기간이면 같은 값, 날짜 순서대로 단조 증가)
+    """
+    days = dates.view(np.int64)
+    if rule == 'W':
+        return (days + _EPOCH_WEEKDAY_OFFSET) // 7
+    if rule == 'M':
+        return dates.astype('datetime64[M]').view(np.int64)
+    if rule == 'Q':
+        return dates.astype('datetime64[M]').view(np.int64) // 3
+    return days // int(rule[:-1])
+
+
+def resample_ohlcv(columns, rule):
+    """
+    일봉 OHLCVColumns 를 rule 단위 봉으로 집계합니다. (Python 루프 없이 reduceat 으로 처리)
+    - open: 기간 첫 봉 시가, close: 기간 마지막 봉 종가
+    - high/low: 기간 최고/최저, volume: 합계
+    - date: 기간의 첫 거래일
+    """
+    if len(columns) == 0:
+        return columns
+
+    keys = period_keys(columns.date, rule)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(keys)])) - 1
+
+    return OHLCVColumns(
+        date=columns.date[starts],
+        open=columns.open[starts],
+        high=np.maximum.reduceat(columns.high, starts),
+        low=np.minimum.reduceat(columns.low, starts),
+        close=columns.close[ends],
+        volume=np.add.reduceat(columns.volume, starts),
+    )
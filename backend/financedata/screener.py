@@ -0,0 +1,288 @@
+import ast
+import logging
+import os
+import re
+import tempfile
+
+import numpy as np
+from django.conf import settings
+
+from . import columnar
+from .indicators import atr, ema, macd, rsi
+from .models import Asset
+
+logger = logging.getLogger(__name__)
+
+# 스크리너 피처 행렬 파일 (자산 1행, 피처 1컬럼의 NumPy structured array)
+SCREENER_FEATURES_PATH = getattr(
+    settings, 'SCREENER_FEATURES_PATH',
+    os.path.join(os.path.dirname(columnar.OHLCV_CACHE_DIR), 'screener', 'features.npy'),
+)
+
+SCREENER_FEATURES = (
+    'close',  # 최신 종가
+    'change_pct',  # 전일 대비 등락률 (%)
+    'volume',  # 최신 거래량
+    'volume_avg_20',  # 20일 평균 거래량
+    'sma_20', 'sma_50', 'sma_200',
+    'ema_20', 'ema_50',
+    'rsi_14',
+    'macd', 'macd_signal',  # MACD(12, 26, 9)
+    'atr_14',
+    'high_52w', 'low_52w',  # 최근 252봉 최고/최저 종가
+    'return_20d',  # 20봉 수익률 (%)
+    'bars',  # 전체 봉 수
+)
+FEATURE_DTYPE = np.dtype(
+    [('asset_id', 'i8'), ('symbol', 'U50'), ('asset_type', 'U20')]
+    + [(name, 'f8') for name in SCREENER_FEATURES]
+)
+WEEKS_52 = 252
+
+SCREEN_MAX_LENGTH = 500
+SCREEN_DEFAULT_LIMIT = 50
+SCREEN_MAX_LIMIT = 1000
+
+# 프로세스별 피처 행렬 보관 ((st_ino, st_mtime_ns), 배열)
+_loaded = None
+
+
+########################################
+# 피처 행렬 생성 / 저장 / 로드
+########################################
+def _tail_mean(values, n):
+    return float(values[-n:].mean()) if len(values) >= n else np.nan
+
+
+def compute_features(columns):
+    """자산 하나의 OHLCV 컬럼으로 스크리너 피처 {이름: 값} 을 계산합니다. (최신 봉 기준)"""
+    close, volume = columns.close, columns.volume
+    n = len(close)
+    line, signal_line, _ = macd(close)
+    prev_close = close[-2] if n >= 2 else np.nan
+    return {
+        'close': float(close[-1]),
+        'change_pct': float((close[-1] / prev_close - 1) * 100) if prev_close else np.nan,
+        'volume': float(volume[-1]),
+        'volume_avg_20': _tail_mean(volume.astype(np.float64), 20),
+        'sma_20': _tail_mean(close, 20),
+        'sma_50': _tail_mean(close, 50),
+        'sma_200': _tail_mean(close, 200),
+        'ema_20': float(ema(close, 20)[-1]),
+        'ema_50': float(ema(close, 50)[-1]),
+        'rsi_14': float(rsi(close, 14)[-1]),
+        'macd': float(line[-1]),
+        'macd_signal': float(signal_line[-1]),
+        'atr_14': float(atr(columns.high, columns.low, close, 14)[-1]),
+        'high_52w': float(close[-WEEKS_52:].max()),
+        'low_52w': float(close[-WEEKS_52:].min()),
+        'return_20d': float((close[-1] / close[-21] - 1) * 100) if n > 20 and close[-21] else np.nan,
+        'bars': float(n),
+    }
+
+
+def build_feature_matrix():
+    """상장 중인 전체 자산의 피처 행렬을 만듭니다. (자산마다 컬럼형 캐시 memmap 에서 계산)"""
+    assets = list(Asset.objects.filter(is_active=True).order_by('id').values_list('id', 'symbol', 'asset_type'))
+    matrix = np.zeros(len(assets), dtype=FEATURE_DTYPE)
+    columnar.ensure_fresh([asset_id for asset_id, _, _ in assets])
+    rows = 0
+    for asset_id, symbol, asset_type in assets:
+        columns = columnar.get_columns(asset_id)
+        if len(columns) == 0:
+            continue
+        row = matrix[rows]
+        row['asset_id'], row['symbol'], row['asset_type'] = asset_id, symbol, asset_type
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name, value in compute_features(columns).items():
+                row[name] = value
+        rows += 1
+    return matrix[:rows]
+
+
+def write_feature_matrix(matrix, path=SCREENER_FEATURES_PATH):
+    """임시 파일에 기록한 뒤 원자적으로 교체합니다."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def refresh_feature_matrix():
+    """피처 행렬을 다시 계산하여 저장합니다. (수집 완료 후 호출)"""
+    matrix = build_feature_matrix()
+    write_feature_matrix(matrix)
+    return len(matrix)
+
+
+class ScreenerNotReady(Exception):
+    """피처 행렬 파일이 아직 만들어지지 않음 (refresh_screener_features 작업 필요)"""
+
+
+def get_feature_matrix():
+    """
+    피처 행렬을 반환합니다. 파일이 교체되었으면(inode/mtime 변경) 다시 읽고, 없으면 None.
+    전체 자산을 도는 생성 작업은 요청 경로에서 하지 않고 Celery 작업(refresh_screener_features)에 맡깁니다.
+    """
+    global _loaded
+    try:
+        stat = os.stat(SCREENER_FEATURES_PATH)
+    except FileNotFoundError:
+        return None
+
+    key = (stat.st_ino, stat.st_mtime_ns)
+    if _loaded is None or _loaded[0] != key:
+        _loaded = (key, np.load(SCREENER_FEATURES_PATH))
+    return _loaded[1]
+
+
+########################################
+# 스크린 식 → 벡터화된 불리언 마스크
+# 예: "rsi_14 < 30 and close > sma_200 and volume_avg_20 > 1000000"
+########################################
+class ScreenExpressionError(ValueError):
+    pass
+
+
+_BINARY_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+}
+_COMPARE_OPS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+
+def parse_screen(expression):
+    """
+    스크린 식을 검증된 AST 로 변환합니다.
+    허용: 피처 이름, 숫자, + - * /, 비교 연산(연쇄 포함), and / or / not, 괄호
+    반환값: (AST, 식에서 사용한 피처 이름 리스트)
+    """
+    if not expression or not expression.strip():
+        raise ScreenExpressionError("q 파라미터가 필요합니다. (예: rsi_14 < 30 and close > sma_200)")
+    if len(expression) > SCREEN_MAX_LENGTH:
+        raise ScreenExpressionError(f"스크린 식은 최대 {SCREEN_MAX_LENGTH}자까지 입력할 수 있습니다.")
+    expression = re.sub(r'\b(AND|OR|NOT)\b', lambda m: m.group(1).lower(), expression)
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError:
+        raise ScreenExpressionError(f"스크린 식을 해석할 수 없습니다: '{expression}'")
+
+    fields = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id not in SCREENER_FEATURES:
+                raise ScreenExpressionError(
+                    f"지원하지 않는 피처입니다: '{node.id}' ({', '.join(SCREENER_FEATURES)})"
+                )
+            if node.id not in fields:
+                fields.append(node.id)
+        elif isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise ScreenExpressionError(f"숫자만 사용할 수 있습니다: {node.value!r}")
+        elif not isinstance(node, (
+            ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+            ast.BinOp, ast.Compare, ast.Load, *_BINARY_OPS, *_COMPARE_OPS,
+        )):
+            raise ScreenExpressionError(f"허용되지 않는 식입니다: '{ast.unparse(node)}'")
+    return tree, fields
+
+
+def _evaluate(node, matrix):
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, matrix)
+    if isinstance(node, ast.Name):
+        return matrix[node.id]
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.BoolOp):
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        result = _as_mask(_evaluate(node.values[0], matrix))
+        for value in node.values[1:]:
+            result = combine(result, _as_mask(_evaluate(value, matrix)))
+        return result
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, matrix)
+        if isinstance(node.op, ast.Not):
+            return np.logical_not(_as_mask(operand))
+        return -operand if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.BinOp):
+        return _BINARY_OPS[type(node.op)](_evaluate(node.left, matrix), _evaluate(node.right, matrix))
+    if isinstance(node, ast.Compare):
+        # a < b < c → (a < b) & (b < c)
+        result = np.ones(len(matrix), dtype=bool)
+        left = _evaluate(node.left, matrix)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _evaluate(comparator, matrix)
+            result &= _COMPARE_OPS[type(op)](left, right)
+            left = right
+        return result
+    raise ScreenExpressionError(f"허용되지 않는 식입니다: '{ast.unparse(node)}'")
+
+
+def _as_mask(value):
+    if isinstance(value, np.ndarray) and value.dtype == bool:
+        return value
+    raise ScreenExpressionError("and / or / not 에는 비교식만 사용할 수 있습니다.")
+
+
+def screen_mask(matrix, tree):
+    """파싱된 스크린 식을 피처 행렬 전체에 대해 한 번에 평가한 불리언 마스크 (NaN 비교는 False)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mask = _evaluate(tree, matrix)
+    if not isinstance(mask, np.ndarray) or mask.dtype != bool:
+        raise ScreenExpressionError("스크린 식은 비교식이어야 합니다. (예: rsi_14 < 30)")
+    return mask
+
+
+def run_screen(expression, asset_type=None, sort=None, limit=SCREEN_DEFAULT_LIMIT):
+    """
+    전체 자산 피처 행렬에 스크린 식을 적용합니다.
+    sort: 피처 이름 (내림차순은 '-' 접두사, NaN 은 항상 뒤로)
+    반환값: {"count": 전체 일치 수, "fields": 응답 피처, "results": [{"symbol", "asset_type", 피처...}, ...]}
+    피처 행렬이 아직 없으면 ScreenerNotReady
+    """
+    tree, fields = parse_screen(expression)
+    sort_field = (sort or '').lstrip('-')
+    if sort and sort_field not in SCREENER_FEATURES:
+        raise ScreenExpressionError(f"정렬할 수 없는 피처입니다: '{sort}'")
+
+    matrix = get_feature_matrix()
+    if matrix is None:
+        raise ScreenerNotReady("스크리너 피처 행렬이 아직 준비되지 않았습니다.")
+    mask = screen_mask(matrix, tree)
+    if asset_type:
+        mask &= matrix['asset_type'] == asset_type
+    matched = matrix[mask]
+
+    if sort:
+        values = matched[sort_field]
+        keys = np.where(np.isnan(values), np.inf, -values if sort.startswith('-') else values)
+        matched = matched[np.argsort(keys, kind='stable')]
+    matched = matched[:limit]
+
+    output_fields = list(dict.fromkeys(['close', 'change_pct', *fields, *([sort_field] if sort else [])]))
+    columns = {name: np.round(matched[name], 4) for name in output_fields}
+    results = [
+        {
+            "symbol": str(matched['symbol'][i]),
+            "asset_type": str(matched['asset_type'][i]),
+            **{name: (None if np.isnan(values[i]) else float(values[i])) for name, values in columns.items()},
+        }
+        for i in range(len(matched))
+    ]
+    return {"count": int(mask.sum()), "fields": output_fields, "results": results}
@@ -0,0 +1,172 @@
+import bisect
+import itertools
+import threading
+import time
+
+from django.db.models import Count, Max, Q
+
+from .models import Asset
+from .symbols import get_symbols_version
+
+# 자산 검색(자동완성) 인덱스
+# 워커 프로세스마다 한 번 만들어 메모리에 두고, 종목 목록 버전이 바뀌면 다시 만듭니다.
+# 버전 = (get_symbols 캐시 버전, DB 의 자산 수 / 상장 자산 수 / 최대 id)
+# - 캐시 버전: fetch_assets / 자산 API 수정 시 올라감 (이름 변경 포함)
+# - DB 지문: 캐시 버전을 올리지 않는 경로(admin, 직접 SQL)로 추가/상장폐지된 자산도 반영
+# - 접두사 검색: 정렬된 키 배열 + 이분 탐색
+# - 부분 문자열 검색: 2-gram 역색인으로 후보를 좁힌 뒤 확인
+# - 초성 검색: 이름을 초성 문자열로 바꾼 키 ("삼성전자" → "ㅅㅅㅈㅈ")
+
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+# 버전 확인 간격 (초) - 매 요청마다 캐시 서버/DB 를 조회하지 않도록
+SEARCH_VERSION_CHECK_INTERVAL = 5
+
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+CHOSUNG_SET = frozenset(CHOSUNG)
+HANGUL_FIRST, HANGUL_LAST = 0xAC00, 0xD7A3
+JUNGSUNG_JONGSUNG_COUNT = 21 * 28  # 초성 하나에 대응하는 음절 수
+
+NGRAM = 2
+
+
+def normalize(text):
+    """소문자 + 공백 제거"""
+    return ''.join(text.lower().split())
+
+
+def to_chosung(text):
+    """한글 음절을 초성으로 바꿉니다. (그 외 문자는 그대로)"""
+    return ''.join(
+        CHOSUNG[(ord(c) - HANGUL_FIRST) // JUNGSUNG_JONGSUNG_COUNT] if HANGUL_FIRST <= ord(c) <= HANGUL_LAST else c
+        for c in text
+    )
+
+
+class AssetSearchIndex:
+    # 검색 필드별 매칭 순서 (앞쪽일수록 높은 순위)
+    RANKING = [
+        ('symbol', 'exact'),
+        ('name', 'exact'),
+        ('symbol', 'prefix'),
+        ('name', 'prefix'),
+        ('name', 'substring'),
+        ('symbol', 'substring'),
+    ]
+    CHOSUNG_RANKING = [
+        ('chosung', 'prefix'),
+        ('chosung', 'substring'),
+    ]
+
+    def __init__(self, rows):
+        """rows: [(id, symbol, name, asset_type), ...]"""
+        self.assets = [
+            {"id": asset_id, "symbol": symbol, "name": name, "asset_type": asset_type}
+            for asset_id, symbol, name, asset_type in rows
+        ]
+        keys = {
+            'symbol': [normalize(a["symbol"]) for a in self.assets],
+            'name': [normalize(a["name"]) for a in self.assets],
+        }
+        keys['chosung'] = [to_chosung(name) for name in keys['name']]
+        self.keys = keys
+
+        # 필드별 (정렬된 키, 자산 위치) 배열과 2-gram 역색인 (게시 목록은 키 정렬 순서)
+        self.sorted_keys, self.sorted_ids, self.exact, self.ngrams = {}, {}, {}, {}
+        for field, values in keys.items():
+            order = sorted(range(len(values)), key=lambda i: (values[i], i))
+            self.sorted_keys[field] = [values[i] for i in order]
+            self.sorted_ids[field] = order
+            exact, ngrams = {}, {}
+            for i in order:
+                exact.setdefault(values[i], []).append(i)
+                for gram in {values[i][j:j + NGRAM] for j in range(len(values[i]) - NGRAM + 1)}:
+                    ngrams.setdefault(gram, []).append(i)
+            self.exact[field] = exact
+            self.ngrams[field] = ngrams
+
+    def __len__(self):
+        return len(self.assets)
+
+    def _match(self, field, mode, query):
+        """(field, mode) 로 일치하는 자산 위치를 순위 순서로 반환하는 이터레이터"""
+        if mode == 'exact':
+            return iter(self.exact[field].get(query, ()))
+        if mode == 'prefix':
+            keys, ids = self.sorted_keys[field], self.sorted_ids[field]
+            start = bisect.bisect_left(keys, query)
+            return (ids[i] for i in itertools.takewhile(lambda i: keys[i].startswith(query), range(start, len(keys))))
+        # substring: 가장 짧은 2-gram 게시 목록을 후보로 두고 실제 포함 여부 확인 (접두사 일치는 앞 단계에서 처리됨)
+        if len(query) < NGRAM:
+            return iter(())
+        postings = [self.ngrams[field].get(query[j:j + NGRAM], ()) for j in range(len(query) - NGRAM + 1)]
+        candidates = min(postings, key=len)
+        values = self.keys[field]
+        return (i for i in candidates if query in values[i] and not values[i].startswith(query))
+
+    def search(self, query, limit=SEARCH_DEFAULT_LIMIT):
+        """
+        심볼/이름/초성으로 자산을 찾아 순위대로 최대 limit 개를 반환합니다.
+        순위: 심볼 일치 > 이름 일치 > 심볼 접두사 > 이름 접두사 > 이름 포함 > 심볼 포함
+        자음(ㄱ~ㅎ)이 섞인 검색어는 초성 검색으로 처리합니다. ("ㅅㅅㅈㅈ", "삼ㅅ")
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        if any(c in CHOSUNG_SET for c in query):
+            query, ranking = to_chosung(query), self.CHOSUNG_RANKING
+        else:
+            ranking = self.RANKING
+
+        results, seen = [], set()
+        for field, mode in ranking:
+            for i in self._match(field, mode, query):
+                if i in seen:
+                    continue
+                seen.add(i)
+                results.append(self.assets[i])
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+_index = None
+_index_version = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def build_search_index():
+    """상장 중인 자산으로 검색 인덱스를 만듭니다. (쿼리 1회)"""
+    return AssetSearchIndex(
+        Asset.objects.filter(is_active=True).order_by('id').values_list('id', 'symbol', 'name', 'asset_type')
+    )
+
+
+def get_index_version():
+    """검색 인덱스 버전 (캐시 조회 1회 + 집계 쿼리 1회)"""
+    fingerprint = Asset.objects.aggregate(
+        total=Count('id'), active=Count('id', filter=Q(is_active=True)), last_id=Max('id'),
+    )
+    return get_symbols_version(), tuple(fingerprint.values())
+
+
+def get_search_index():
+    """
+    프로세스별 검색 인덱스를 반환합니다.
+    SEARCH_VERSION_CHECK_INTERVAL 마다 종목 목록 버전을 확인해 바뀌었으면 새로 만들어 교체합니다.
+    (교체는 참조 하나를 바꾸는 것이라 검색 중인 요청은 이전 인덱스를 끝까지 사용)
+    """
+    global _index, _index_version, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < SEARCH_VERSION_CHECK_INTERVAL:
+        return _index
+
+    with _index_lock:
+        if _index is None or now - _checked_at >= SEARCH_VERSION_CHECK_INTERVAL:
+            version = get_index_version()
+            if _index is None or version != _index_version:
+                _index = build_search_index()
+                _index_version = version
+            _checked_at = now
+    return _index
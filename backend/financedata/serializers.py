@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Asset, OHLCV
+from .models import Asset, BacktestRun, OHLCV
 
 # 투자자산 시리얼라이저
 class AssetSerializer(serializers.ModelSerializer):
@@ -14,3 +14,17 @@ class OHLCVSerializer(serializers.ModelSerializer):
     class Meta:
         model = OHLCV
         fields = '__all__'
+
+# 백테스트 실행 시리얼라이저 (생성 시 기간/대상만 받고 나머지는 실행 결과)
+class BacktestRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BacktestRun
+        fields = '__all__'
+        read_only_fields = ['status', 'model_version', 'assets', 'samples', 'seconds', 'error', 'created_at']
+
+    def validate(self, attrs):
+        if attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError("start_date 는 end_date 보다 늦을 수 없습니다.")
+        if attrs.get('step', 1) < 1:
+            raise serializers.ValidationError("step 은 1 이상이어야 합니다.")
+        return attrs
@@ -0,0 +1,99 @@
+import logging
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import Lag, RowNumber
+
+from .models import MarketSnapshot, OHLCV
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_UPDATE_FIELDS = [
+    'date', 'open', 'high', 'low', 'close', 'volume', 'prev_date', 'prev_close', 'change', 'change_pct', 'updated_at',
+]
+
+
+def _price(value):
+    return Decimal(f"{value:.2f}")
+
+
+def make_snapshot(asset_id, date, open, high, low, close, volume, prev_date=None, prev_close=None):
+    """최신 봉과 직전 종가로 MarketSnapshot 객체를 만듭니다. (저장하지 않음)"""
+    close = Decimal(close).quantize(Decimal('0.01'))
+    prev_close = Decimal(prev_close).quantize(Decimal('0.01')) if prev_close is not None else None
+    change = close - prev_close if prev_close is not None else None
+    change_pct = float(change / prev_close * 100) if prev_close else None
+    return MarketSnapshot(
+        asset_id=asset_id,
+        date=date,
+        open=open,
+        high=high,
+        low=low,
+        close=close,
+        volume=volume,
+        prev_date=prev_date,
+        prev_close=prev_close,
+        change=change,
+        change_pct=change_pct,
+    )
+
+
+def save_snapshots(snapshots, batch_size=1000):
+    MarketSnapshot.objects.bulk_create(
+        snapshots,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['asset'],
+        update_fields=SNAPSHOT_UPDATE_FIELDS,
+    )
+
+
+def update_snapshot(asset_id, columns):
+    """
+    수집 경로에서 호출: 컬럼형 캐시의 마지막 두 봉으로 자산 하나의 스냅샷을 갱신합니다. (쿼리 1회)
+    """
+    if len(columns) == 0:
+        MarketSnapshot.objects.filter(asset_id=asset_id).delete()
+        return None
+    has_prev = len(columns) >= 2
+    snapshot = make_snapshot(
+        asset_id,
+        columns.date[-1].item(),
+        _price(columns.open[-1]),
+        _price(columns.high[-1]),
+        _price(columns.low[-1]),
+        _price(columns.close[-1]),
+        int(columns.volume[-1]),
+        prev_date=columns.date[-2].item() if has_prev else None,
+        prev_close=_price(columns.close[-2]) if has_prev else None,
+    )
+    save_snapshots([snapshot])
+    return snapshot
+
+
+def latest_bars():
+    """
+    자산별 최신 봉과 직전 종가를 한 번의 쿼리로 가져옵니다.
+    PostgreSQL: LAG 윈도우 + DISTINCT ON (asset_id) ... ORDER BY asset_id, date DESC
+    그 외 DB: 같은 윈도우에 ROW_NUMBER = 1 필터
+    """
+    qs = OHLCV.objects.annotate(
+        prev_date=Window(Lag('date'), partition_by=[F('asset_id')], order_by=F('date').asc()),
+        prev_close=Window(Lag('close'), partition_by=[F('asset_id')], order_by=F('date').asc()),
+    )
+    if connection.features.can_distinct_on_fields:
+        qs = qs.order_by('asset_id', '-date').distinct('asset_id')
+    else:
+        qs = qs.annotate(
+            row_number=Window(RowNumber(), partition_by=[F('asset_id')], order_by=F('date').desc())
+        ).filter(row_number=1)
+    return qs.values_list('asset_id', 'date', 'open', 'high', 'low', 'close', 'volume', 'prev_date', 'prev_close')
+
+
+def rebuild_snapshots(batch_size=1000):
+    """OHLCV 전체 기준으로 스냅샷 테이블을 다시 만듭니다. (복구/초기 적재용)"""
+    snapshots = [make_snapshot(*row) for row in latest_bars().iterator(chunk_size=batch_size)]
+    save_snapshots(snapshots, batch_size)
+    MarketSnapshot.objects.exclude(asset_id__in=[s.asset_id for s in snapshots]).delete()
+    return len(snapshots)
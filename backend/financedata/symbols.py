@@ -0,0 +1,48 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+from .models import Asset
+
+# get_symbols 응답 캐시
+# 종목 목록이 바뀔 때(fetch_assets, 자산 API 수정)마다 버전을 올리고, 직렬화된 응답은 버전별 키에 보관합니다.
+# fetch_assets 는 Celery 워커에서 버전을 올리므로 웹 워커와 공유되는 캐시(settings.CACHES 의 Redis)가 필요합니다.
+SYMBOLS_VERSION_KEY = 'asset_symbols:version'
+SYMBOLS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_symbols_version():
+    version = cache.get(SYMBOLS_VERSION_KEY)
+    if version is None:
+        cache.add(SYMBOLS_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(SYMBOLS_VERSION_KEY)
+    return version
+
+
+def bump_symbols_version():
+    """종목 목록이 바뀌었을 때 호출: 이후 요청은 새 키로 응답을 다시 만듭니다."""
+    cache.set(SYMBOLS_VERSION_KEY, time.time_ns(), None)
+
+
+def build_symbol_groups():
+    """자산 타입별 [{"symbol", "name"}, ...] (쿼리 1회, 메모리에서 그룹화)"""
+    symbol_groups = {asset_type: [] for asset_type, _ in Asset.ASSET_TYPE_CHOICES}
+    for asset_type, symbol, name in Asset.objects.order_by('id').values_list('asset_type', 'symbol', 'name'):
+        symbol_groups.setdefault(asset_type, []).append({"symbol": symbol, "name": name})
+    return symbol_groups
+
+
+def get_symbols_payload():
+    """
+    직렬화된 get_symbols 응답과 ETag 를 반환합니다. (캐시 적중 시 쿼리/직렬화 없음)
+    반환값: (JSON bytes, ETag)
+    """
+    key = f"asset_symbols:{get_symbols_version()}"
+    cached = cache.get(key)
+    if cached is None:
+        body = json.dumps(build_symbol_groups(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        cached = (body, f'"{hashlib.md5(body).hexdigest()}"')
+        cache.set(key, cached, SYMBOLS_CACHE_TIMEOUT)
+    return cached
@@ -1,100 +1,372 @@
 import FinanceDataReader as fdr
 import datetime
+import pandas as pd
 import logging
-from celery import shared_task
-from .models import Asset, OHLCV
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from celery import chord, group, shared_task
+from django.conf import settings
+from django.db.models import Count, Max
+from .models import Asset, BacktestRun, ForecastResult, OHLCV
+from .ingestion import bulk_upsert_ohlcv, sync_asset_universe
+from .screener import refresh_feature_matrix
+from .snapshot import rebuild_snapshots
+from .symbols import bump_symbols_version
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# 저장된 데이터가 없는 자산(또는 전체 재동기화)에서 가져올 기간
+OHLCV_LOOKBACK_DAYS = getattr(settings, 'OHLCV_LOOKBACK_DAYS', 365)
+# 증분 수집 시 워터마크 이전으로 다시 가져올 기간 (늦게 반영되는 정정 데이터 대비)
+OHLCV_OVERLAP_DAYS = getattr(settings, 'OHLCV_OVERLAP_DAYS', 5)
+# 하나의 fetch_ohlcv_chunk 태스크가 처리할 자산 수
+OHLCV_CHUNK_SIZE = getattr(settings, 'OHLCV_CHUNK_SIZE', 200)
+# asset_type 별 청크 내부 FDR 동시 요청 수
+OHLCV_FETCH_CONCURRENCY = getattr(settings, 'OHLCV_FETCH_CONCURRENCY', {
+    'stock_kr': 8,
+    'stock_us': 4,
+    'crypto': 2,
+    'forex': 2,
+})
+OHLCV_FETCH_CONCURRENCY_DEFAULT = 4
+# 야간 예측 배치: 청크 태스크 하나가 처리할 자산 수 / 한 번의 추론에 묶을 자산 수
+FORECAST_PRECOMPUTE_CHUNK_SIZE = getattr(settings, 'FORECAST_PRECOMPUTE_CHUNK_SIZE', 1000)
+FORECAST_PRECOMPUTE_BATCH_SIZE = getattr(settings, 'FORECAST_PRECOMPUTE_BATCH_SIZE', 256)
+
 @shared_task
 def fetch_assets():
     """
     FinanceDataReader에서 제공하는 모든 자산을 자동으로 DB에 추가하는 Celery Task
+    종목 목록을 한 번에 비교하여 신규/변경/상장폐지 종목을 일괄 반영합니다.
     """
     logger.info("🔍 [START] 자동 자산 등록 시작")
 
-    asset_list = []
-
     try:
         # 한국 주식 종목 가져오기
         logger.info("📡 한국 주식 데이터 가져오는 중...")
         stock_kr = fdr.StockListing("KRX")
-        for _, row in stock_kr.iterrows():
-            asset_list.append(("stock_kr", row['Name'], row['Code']))
+        stock_kr = pd.DataFrame({"asset_type": "stock_kr", "name": stock_kr['Name'], "symbol": stock_kr['Code']})
         logger.info(f"✅ 한국 주식 {len(stock_kr)}개 수집 완료")
 
         # 미국 주식 종목 가져오기
         logger.info("📡 미국 주식 데이터 가져오는 중...")
         stock_us = fdr.StockListing("NASDAQ")
-        for _, row in stock_us.iterrows():
-            asset_list.append(("stock_us", row['Name'], row['Symbol']))
+        stock_us = pd.DataFrame({"asset_type": "stock_us", "name": stock_us['Name'], "symbol": stock_us['Symbol']})
         logger.info(f"✅ 미국 주식 {len(stock_us)}개 수집 완료")
 
-        # 암호화폐 데이터 추가
-        crypto_assets = [("crypto", "Bitcoin", "BTC/USD"), ("crypto", "Ethereum", "ETH/USD")]
-        asset_list.extend(crypto_assets)
-        logger.info("✅ 암호화폐 데이터 추가 완료")
-
-        # 환율 정보 추가
-        forex_assets = [("forex", "USD/KRW", "USD/KRW"), ("forex", "EUR/KRW", "EUR/KRW")]
-        asset_list.extend(forex_assets)
-        logger.info("✅ 환율 데이터 추가 완료")
-
-        # DB에 저장
-        for asset_type, name, symbol in asset_list:
-            obj, created = Asset.objects.get_or_create(
-                asset_type=asset_type,
-                name=name,
-                symbol=symbol
-            )
-            if created:
-                logger.info(f"✅ [NEW] {name} ({symbol}) 저장 완료")
-            else:
-                logger.info(f"🟡 [EXIST] {name} ({symbol}) 이미 존재")
+        # 암호화폐 / 환율 데이터 추가
+        static_assets = pd.DataFrame(
+            [
+                ("crypto", "Bitcoin", "BTC/USD"),
+                ("crypto", "Ethereum", "ETH/USD"),
+                ("forex", "USD/KRW", "USD/KRW"),
+                ("forex", "EUR/KRW", "EUR/KRW"),
+            ],
+            columns=["asset_type", "name", "symbol"],
+        )
 
-        logger.info(f"🔍 [COMPLETE] 총 {len(asset_list)}개의 자산 등록 완료")
-        return f"Total {len(asset_list)} assets added."
+        # DB와 집합 단위로 동기화
+        listing = pd.concat([stock_kr, stock_us, static_assets], ignore_index=True)
+        summary = sync_asset_universe(listing)
+        if summary['new'] or summary['renamed'] or summary['delisted'] or summary['relisted']:
+            bump_symbols_version()  # get_symbols 응답 캐시 갱신
+
+        logger.info(
+            f"🔍 [COMPLETE] 총 {summary['total']}개 자산 동기화 완료 "
+            f"(신규 {summary['new']} / 변경 {summary['renamed']} / 상장폐지 {summary['delisted']} / 재상장 {summary['relisted']})"
+        )
+        return (
+            f"Total {summary['total']} assets synced. new={summary['new']}, renamed={summary['renamed']}, "
+            f"delisted={summary['delisted']}, relisted={summary['relisted']}"
+        )
 
     except Exception as e:
         logger.error(f"❌ [ERROR] 자산 등록 실패: {e}")
         return f"Failed to fetch assets: {str(e)}"
 
 
+def get_ohlcv_watermarks(asset_ids=None):
+    """
+    자산별 마지막 저장 날짜를 {asset_id: date} 형태로 반환합니다. (GROUP BY 쿼리 1회)
+    asset_ids 를 주면 해당 자산들만 조회합니다.
+    """
+    qs = OHLCV.objects.all()
+    if asset_ids is not None:
+        qs = qs.filter(asset_id__in=asset_ids)
+    return dict(
+        qs.values('asset_id')
+        .annotate(last_date=Max('date'))
+        .values_list('asset_id', 'last_date')
+    )
+
+
+def get_fetch_start_date(last_date, today, full_resync=False):
+    """
+    워터마크를 기준으로 FDR에 요청할 시작일을 계산합니다.
+    - 저장된 데이터가 없거나 full_resync 인 경우: today - OHLCV_LOOKBACK_DAYS
+    - 그 외: 마지막 저장일 - OHLCV_OVERLAP_DAYS (정정 데이터 반영용 겹침 구간)
+    """
+    if full_resync or last_date is None:
+        return today - datetime.timedelta(days=OHLCV_LOOKBACK_DAYS)
+    return last_date - datetime.timedelta(days=OHLCV_OVERLAP_DAYS)
+
+
+def get_fetch_concurrency(asset_type):
+    """자산 종류별 FDR 동시 요청 수 (데이터 소스마다 허용량이 다름)"""
+    return OHLCV_FETCH_CONCURRENCY.get(asset_type, OHLCV_FETCH_CONCURRENCY_DEFAULT)
+
+
 @shared_task
-def fetch_ohlcv_data():
+def fetch_ohlcv_data(full_resync=False, precompute=False):
     """
-    모든 자산의 OHLCV 데이터를 FDR에서 가져와 업데이트하는 Celery Task
+    상장 중인 모든 자산의 OHLCV 데이터를 FDR에서 가져와 업데이트하는 Celery Task
+    자산을 asset_type 별 OHLCV_CHUNK_SIZE 단위 청크로 나누어 fetch_ohlcv_chunk 를 chord 로 분산 실행하고,
+    aggregate_ohlcv_results 콜백에서 전체 건수를 집계합니다.
+
+    기본은 자산별 마지막 저장일 이후만 가져오는 증분 수집이며,
+    full_resync=True 이면 OHLCV_LOOKBACK_DAYS 전체 구간을 다시 가져옵니다. (복구용)
+    precompute=True 이면 수집이 끝난 뒤 precompute_forecasts 를 이어서 실행합니다. (야간 배치)
     """
-    logger.info("🔍 [START] OHLCV 데이터 업데이트 시작")
-    assets = Asset.objects.all()
-    start_date = (datetime.datetime.today() - datetime.timedelta(days=365)).strftime('%Y-%m-%d')
+    logger.info(f"🔍 [START] OHLCV 데이터 업데이트 시작 ({'전체 재동기화' if full_resync else '증분'})")
 
-    total_count = 0
+    asset_ids_by_type = {}
+    for asset_id, asset_type in Asset.objects.filter(is_active=True).order_by('asset_type', 'id').values_list('id', 'asset_type'):
+        asset_ids_by_type.setdefault(asset_type, []).append(asset_id)
 
-    for asset in assets:
-        try:
-            logger.info(f"📡 {asset.symbol} ({asset.name}) 데이터 가져오는 중...")
-            df = fdr.DataReader(asset.symbol, start=start_date)
-
-            for index, row in df.iterrows():
-                date = index.date()
-                _, created = OHLCV.objects.update_or_create(
-                    asset=asset, date=date,
-                    defaults={
-                        "open": row['Open'],
-                        "high": row['High'],
-                        "low": row['Low'],
-                        "close": row['Close'],
-                        "volume": row['Volume'],
-                    }
+    chunks = [
+        fetch_ohlcv_chunk.s(asset_ids[i:i + OHLCV_CHUNK_SIZE], asset_type, full_resync)
+        for asset_type, asset_ids in asset_ids_by_type.items()
+        for i in range(0, len(asset_ids), OHLCV_CHUNK_SIZE)
+    ]
+    if not chunks:
+        logger.info("🟡 업데이트할 자산이 없습니다.")
+        return "OHLCV Data Updated. No assets."
+
+    chord(group(chunks))(aggregate_ohlcv_results.s(precompute))
+    total_assets = sum(len(ids) for ids in asset_ids_by_type.values())
+    logger.info(f"📡 자산 {total_assets}개를 {len(chunks)}개 청크로 분산 실행")
+    return f"OHLCV update dispatched. {total_assets} assets in {len(chunks)} chunks."
+
+
+@shared_task
+def fetch_ohlcv_chunk(asset_ids, asset_type, full_resync=False):
+    """
+    같은 asset_type 자산 청크의 OHLCV를 수집하는 Celery Task
+    FDR 호출은 I/O 대기가 대부분이므로 asset_type 별 동시성 제한을 둔 스레드 풀에서 병렬로 가져오고,
+    DB upsert 는 태스크 스레드에서 순차적으로 처리합니다.
+    """
+    assets = list(Asset.objects.filter(id__in=asset_ids))
+    watermarks = {} if full_resync else get_ohlcv_watermarks(asset_ids)
+    today = datetime.date.today()
+    result = {"assets": len(assets), "inserted": 0, "updated": 0, "failed": 0}
+
+    with ThreadPoolExecutor(max_workers=get_fetch_concurrency(asset_type)) as executor:
+        futures = {}
+        for asset in assets:
+            start_date = get_fetch_start_date(watermarks.get(asset.id), today, full_resync)
+            future = executor.submit(fdr.DataReader, asset.symbol, start=start_date.strftime('%Y-%m-%d'))
+            futures[future] = asset
+
+        for future in as_completed(futures):
+            asset = futures[future]
+            try:
+                df = future.result()
+                upserted = bulk_upsert_ohlcv(asset, df)
+                result["inserted"] += upserted["inserted"]
+                result["updated"] += upserted["updated"]
+                logger.info(
+                    f"✅ {asset.symbol} 데이터 업데이트 완료 "
+                    f"({upserted['rows']}건, 신규 {upserted['inserted']} / 갱신 {upserted['updated']}, "
+                    f"배치 {upserted['batches']}회)"
                 )
-                if created:
-                    total_count += 1
-            logger.info(f"✅ {asset.symbol} 데이터 업데이트 완료 ({len(df)}건)")
+            except Exception as e:
+                result["failed"] += 1
+                logger.error(f"❌ [ERROR] {asset.symbol} ({asset.name}) 데이터 수집 실패: {e}")
+
+    return result
+
+
+@shared_task
+def aggregate_ohlcv_results(results, precompute=False):
+    """
+    fetch_ohlcv_chunk 결과를 합산하는 chord 콜백
+    precompute=True 이면 새 봉 기준으로 전체 자산 예측을 미리 계산하는 배치를 시작합니다.
+    """
+    total = {"assets": 0, "inserted": 0, "updated": 0, "failed": 0}
+    for result in results:
+        for key in total:
+            total[key] += result.get(key, 0)
+
+    logger.info(
+        f"🔍 [COMPLETE] 자산 {total['assets']}개 중 {total['failed']}개 실패, "
+        f"총 {total['inserted']}개의 OHLCV 데이터 추가, {total['updated']}개 갱신 완료"
+    )
+    refresh_screener_features.delay()
+    if precompute:
+        precompute_forecasts.delay()
+    return total
+
+
+@shared_task
+def precompute_forecasts():
+    """
+    OHLCV 가 INPUT_WINDOW 개 이상인 상장 자산 전체의 예측을 미리 계산하여 ForecastResult 에 저장하는 Celery Task
+    자산을 FORECAST_PRECOMPUTE_CHUNK_SIZE 단위 청크로 나누어 precompute_forecast_chunk 를 chord 로 실행합니다.
+    청크는 이미 최신 결과(마지막 봉 날짜 + 입력 윈도우 해시 + 모델 버전 일치)가 있는 자산을 건너뛰므로,
+    중간에 실패하거나 중단된 배치를 다시 실행하면 남은 자산만 계산합니다.
+    """
+    # 예측 모델(torch)은 예측 태스크에서만 필요하므로 수집 전용 워커가 import 비용을 치르지 않도록 지연 import
+    from .forecast import INPUT_WINDOW
 
+    asset_ids = list(
+        OHLCV.objects.filter(asset__is_active=True)
+        .values('asset_id')
+        .annotate(bars=Count('id'))
+        .filter(bars__gte=INPUT_WINDOW)
+        .order_by('asset_id')
+        .values_list('asset_id', flat=True)
+    )
+    chunks = [
+        precompute_forecast_chunk.s(asset_ids[i:i + FORECAST_PRECOMPUTE_CHUNK_SIZE])
+        for i in range(0, len(asset_ids), FORECAST_PRECOMPUTE_CHUNK_SIZE)
+    ]
+    if not chunks:
+        logger.info("🟡 예측할 자산이 없습니다.")
+        return "Forecast precompute skipped. No assets."
+
+    chord(group(chunks))(aggregate_forecast_results.s(time.time()))
+    logger.info(f"🔮 [START] 자산 {len(asset_ids)}개 예측 배치를 {len(chunks)}개 청크로 분산 실행")
+    return f"Forecast precompute dispatched. {len(asset_ids)} assets in {len(chunks)} chunks."
+
+
+@shared_task
+def precompute_forecast_chunk(asset_ids):
+    """
+    자산 청크의 예측을 FORECAST_PRECOMPUTE_BATCH_SIZE 단위 배치 추론으로 계산하여 저장합니다.
+    배치마다 바로 저장하므로 청크 중간에 중단되어도 저장된 결과는 다음 실행에서 재사용됩니다.
+    """
+    from .forecast import collect_close_windows, compute_forecasts, get_forecaster
+    from .forecast_cache import window_digest
+
+    started_at = time.perf_counter()
+    model_version = get_forecaster().version
+    assets = list(Asset.objects.filter(id__in=asset_ids).order_by('id'))
+    up_to_date = set(
+        ForecastResult.objects.filter(asset_id__in=asset_ids, model_version=model_version)
+        .values_list('asset_id', 'as_of', 'input_digest')
+    )
+    windows, last_dates, errors = collect_close_windows(assets)
+    digests = {symbol: window_digest(window) for symbol, window in windows.items()}
+    pending = [
+        asset for asset in assets
+        if asset.symbol in windows
+        and (
+            asset.id, datetime.date.fromisoformat(last_dates[asset.symbol]), digests[asset.symbol]
+        ) not in up_to_date
+    ]
+    result = {"assets": len(assets), "computed": 0, "skipped": len(assets) - len(pending), "failed": 0}
+
+    for i in range(0, len(pending), FORECAST_PRECOMPUTE_BATCH_SIZE):
+        batch = pending[i:i + FORECAST_PRECOMPUTE_BATCH_SIZE]
+        try:
+            forecasts = compute_forecasts(windows, last_dates, [asset.symbol for asset in batch])
+            ForecastResult.objects.bulk_create(
+                [
+                    ForecastResult(
+                        asset=asset,
+                        as_of=last_dates[asset.symbol],
+                        model_version=model_version,
+                        input_digest=digests[asset.symbol],
+                        forecast=[str(value) for value in forecasts[asset.symbol]["forecast"]],
+                        bands={
+                            name: [str(value) for value in values]
+                            for name, values in forecasts[asset.symbol]["bands"].items()
+                        },
+                    )
+                    for asset in batch
+                ],
+                update_conflicts=True,
+                unique_fields=['asset'],
+                update_fields=['as_of', 'model_version', 'input_digest', 'forecast', 'bands', 'updated_at'],
+            )
+            result["computed"] += len(batch)
         except Exception as e:
-            logger.error(f"❌ [ERROR] {asset.symbol} ({asset.name}) 데이터 수집 실패: {e}")
+            result["failed"] += len(batch)
+            logger.error(f"❌ [ERROR] 예측 배치 실패 ({batch[0].symbol} 외 {len(batch) - 1}개): {e}")
+
+    elapsed = time.perf_counter() - started_at
+    logger.info(
+        f"🔮 예측 청크 완료: 계산 {result['computed']} / 건너뜀 {result['skipped']} / 실패 {result['failed']} "
+        f"({elapsed:.1f}s, {result['computed'] / elapsed if elapsed else 0:.1f} assets/sec)"
+    )
+    return result
+
+
+@shared_task
+def aggregate_forecast_results(results, started_at):
+    """
+    precompute_forecast_chunk 결과를 합산하고 전체 처리량(assets/sec)을 기록하는 chord 콜백
+    """
+    total = {"assets": 0, "computed": 0, "skipped": 0, "failed": 0}
+    for result in results:
+        for key in total:
+            total[key] += result.get(key, 0)
+
+    elapsed = time.time() - started_at
+    total["seconds"] = round(elapsed, 1)
+    total["assets_per_sec"] = round(total["computed"] / elapsed, 1) if elapsed > 0 else 0.0
+    logger.info(
+        f"🔮 [COMPLETE] 예측 배치 완료: 자산 {total['assets']}개 중 계산 {total['computed']} / "
+        f"건너뜀 {total['skipped']} / 실패 {total['failed']} ({total['seconds']}s, {total['assets_per_sec']} assets/sec)"
+    )
+    return total
+
 
-    logger.info(f"🔍 [COMPLETE] 총 {total_count}개의 OHLCV 데이터 업데이트 완료")
-    return f"OHLCV Data Updated. Total {total_count} entries."
+@shared_task
+def run_forecast_backtest(run_id):
+    """
+    BacktestRun 하나를 실행하는 Celery Task (결과는 BacktestResult 에 저장)
+    """
+    from .backtest import run_backtest
+
+    run = BacktestRun.objects.get(id=run_id)
+    run.status = 'running'
+    run.error = ''
+    run.save(update_fields=['status', 'error'])
+    logger.info(f"📈 [START] 백테스트 #{run.id} ({run.start_date} ~ {run.end_date}, step={run.step})")
+
+    try:
+        run_backtest(run)
+        run.status = 'done'
+    except Exception as e:
+        run.status = 'failed'
+        run.error = str(e)
+        logger.error(f"❌ [ERROR] 백테스트 #{run.id} 실패: {e}")
+    run.save()
+
+    logger.info(f"📈 [COMPLETE] 백테스트 #{run.id}: 자산 {run.assets}개, 예측 {run.samples}회 ({run.seconds or 0:.1f}s)")
+    return {"run": run.id, "status": run.status, "assets": run.assets, "samples": run.samples}
+
+
+@shared_task
+def rebuild_market_snapshots():
+    """
+    OHLCV 전체 기준으로 MarketSnapshot 을 다시 만드는 Celery Task (초기 적재/복구용)
+    평소에는 수집 경로(bulk_upsert_ohlcv)에서 자산별로 증분 갱신됩니다.
+    """
+    count = rebuild_snapshots()
+    logger.info(f"📊 시장 스냅샷 {count}개 재생성 완료")
+    return count
+
+
+@shared_task
+def refresh_screener_features():
+    """
+    상장 자산 전체의 스크리너 피처 행렬(자산 1행, 지표 컬럼)을 다시 계산하는 Celery Task
+    OHLCV 수집이 끝날 때마다 aggregate_ohlcv_results 에서 호출됩니다.
+    """
+    started_at = time.perf_counter()
+    count = refresh_feature_matrix()
+    logger.info(f"🧮 스크리너 피처 행렬 {count}개 자산 갱신 완료 ({time.perf_counter() - started_at:.1f}s)")
+    return count
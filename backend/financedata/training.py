@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+from numpy.lib.stride_tricks import sliding_window_view
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler, SequentialSampler
+
+from . import columnar
+from .forecast import (
+    D_MODEL, DIM_FEEDFORWARD, DROPOUT, INPUT_WINDOW, NHEAD, NUM_DECODER_LAYERS, NUM_ENCODER_LAYERS,
+    OUTPUT_WINDOW, build_model, normalize_windows,
+)
+
+logger = logging.getLogger(__name__)
+
+# 학습 샘플 한 행: 입력 INPUT_WINDOW 개 + 정답 OUTPUT_WINDOW 개 (마지막 입력 종가 대비 변화율, float32)
+WINDOW_LENGTH = INPUT_WINDOW + OUTPUT_WINDOW
+
+# 체크포인트에 함께 저장하는 모델 하이퍼파라미터 (서빙 쪽 load_forecaster 가 그대로 사용)
+MODEL_HPARAMS = dict(
+    input_window=INPUT_WINDOW,
+    output_window=OUTPUT_WINDOW,
+    d_model=D_MODEL,
+    nhead=NHEAD,
+    num_encoder_layers=NUM_ENCODER_LAYERS,
+    num_decoder_layers=NUM_DECODER_LAYERS,
+    dim_feedforward=DIM_FEEDFORWARD,
+    dropout=DROPOUT,
+)
+
+
+########################################
+# 슬라이딩 윈도우 데이터셋 (memmap)
+########################################
+def count_windows(bars, stride=1):
+    """봉 bars 개에서 stride 간격으로 만들 수 있는 윈도우 수"""
+    return 0 if bars < WINDOW_LENGTH else (bars - WINDOW_LENGTH) // stride + 1
+
+
+def _meta_path(path):
+    return f"{path}.json"
+
+
+def build_window_dataset(path, asset_ids, stride=1):
+    """
+    자산별 종가에서 (INPUT_WINDOW + OUTPUT_WINDOW) 길이 윈도우를 만들어 (rows, WINDOW_LENGTH) .npy memmap 에 기록합니다.
+    - 1차: 자산별 봉 수로 전체 행 수를 계산해 파일을 미리 할당
+    - 2차: 자산 하나씩 sliding_window_view(복사 없는 strided view) 로 윈도우를 만들어 해당 구간에 기록
+    한 번에 메모리에 올라가는 것은 자산 하나 분량이므로 전체 데이터셋이 RAM 보다 커도 동작합니다.
+    가격이 0 이하이거나 비정상 값이 있는 윈도우는 건너뛰며, 실제 기록된 행 수는 메타 파일(.json)에 남깁니다.
+
+    반환값: 기록된 행 수
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    bars = {asset_id: len(columnar.get_columns(asset_id)) for asset_id in asset_ids}
+    capacity = sum(count_windows(n, stride) for n in bars.values())
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        data = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(max(capacity, 1), WINDOW_LENGTH))
+        rows = 0
+        for asset_id, n in bars.items():
+            if count_windows(n, stride) == 0:
+                continue
+            close = columnar.get_columns(asset_id).close
+            windows = sliding_window_view(close, WINDOW_LENGTH)[::stride]
+            relative, base = normalize_windows(windows)
+            valid = (base[:, 0] > 0) & np.isfinite(relative).all(axis=1)
+            count = int(valid.sum())
+            data[rows:rows + count] = relative[valid]
+            rows += count
+        data.flush()
+        del data
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    with open(_meta_path(path), 'w') as f:
+        json.dump({"rows": rows, "input_window": INPUT_WINDOW, "output_window": OUTPUT_WINDOW, "stride": stride}, f)
+    return rows
+
+
+def load_dataset_rows(path):
+    """
+    기존 데이터셋의 행 수를 반환합니다. 파일이 없거나 현재 윈도우 설정과 다르면 None.
+    """
+    try:
+        with open(_meta_path(path)) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    if not os.path.exists(path) or (meta["input_window"], meta["output_window"]) != (INPUT_WINDOW, OUTPUT_WINDOW):
+        return None
+    return meta["rows"]
+
+
+class WindowDataset(Dataset):
+    """
+    memmap 데이터셋을 인덱스 배치 단위로 읽어 (x, y) 텐서를 반환합니다. (BatchSampler 와 함께 사용)
+    파일은 DataLoader 워커 안에서 처음 접근할 때 열기 때문에 워커마다 자기 memmap 을 가집니다.
+    """
+
+    def __init__(self, path, indices):
+        self.path = path
+        self.indices = indices
+        self._data = None
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, positions):
+        if self._data is None:
+            self._data = np.load(self.path, mmap_mode='r')
+        rows = self._data[np.sort(self.indices[positions])]  # 정렬된 인덱스로 읽어야 순차 I/O 에 가까움
+        x = torch.from_numpy(np.ascontiguousarray(rows[:, :INPUT_WINDOW])).unsqueeze(-1)
+        y = torch.from_numpy(np.ascontiguousarray(rows[:, INPUT_WINDOW:]))
+        return x, y
+
+
+def _loader(dataset, batch_size, shuffle, workers):
+    sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+    return DataLoader(
+        dataset,
+        sampler=BatchSampler(sampler, batch_size, drop_last=False),
+        batch_size=None,
+        num_workers=workers,
+        persistent_workers=workers > 0,
+    )
+
+
+########################################
+# 학습 / 체크포인트 저장
+########################################
+def train_forecaster(dataset_path, rows, epochs=5, batch_size=256, lr=1e-3, workers=2, val_fraction=0.05,
+                     seed=42, log=logger.info):
+    """
+    memmap 데이터셋으로 AwesomeTransformerForecaster 를 teacher forcing 방식으로 학습합니다. (CPU)
+    반환값: (학습된 모델, [{"epoch", "train_loss", "val_loss", "seconds"}, ...])
+    """
+    torch.manual_seed(seed)
+    order = np.random.default_rng(seed).permutation(rows)
+    val_size = int(rows * val_fraction) if rows > 1 else 0
+    train_set = WindowDataset(dataset_path, order[val_size:])
+    val_set = WindowDataset(dataset_path, np.sort(order[:val_size]))
+
+    model = build_model(**MODEL_HPARAMS)
+    optimizer = torch.optim.AdamW(model.parameters(), lr=lr)
+    criterion = nn.MSELoss()
+    train_loader = _loader(train_set, batch_size, True, workers)
+    val_loader = _loader(val_set, batch_size, False, workers) if val_size else None
+
+    history = []
+    for epoch in range(1, epochs + 1):
+        started_at = time.perf_counter()
+        model.train()
+        train_loss = 0.0
+        for x, y in train_loader:
+            optimizer.zero_grad()
+            loss = criterion(model.forward_teacher_forcing(x, y), y)
+            loss.backward()
+            nn.utils.clip_grad_norm_(model.parameters(), 1.0)
+            optimizer.step()
+            train_loss += loss.item() * len(x)
+        train_loss /= len(train_set)
+
+        # 검증은 서빙과 같은 autoregressive 디코딩으로 계산
+        val_loss = None
+        if val_loader is not None:
+            model.eval()
+            total = 0.0
+            with torch.no_grad():
+                for x, y in val_loader:
+                    total += criterion(model.forward_incremental(x), y).item() * len(x)
+            val_loss = total / len(val_set)
+
+        seconds = time.perf_counter() - started_at
+        history.append({"epoch": epoch, "train_loss": train_loss, "val_loss": val_loss, "seconds": seconds})
+        log(
+            f"🧠 epoch {epoch}/{epochs}: train_loss={train_loss:.6f}"
+            + (f", val_loss={val_loss:.6f}" if val_loss is not None else "")
+            + f" ({seconds:.1f}s, {len(train_set) / seconds:.0f} samples/sec)"
+        )
+
+    model.eval()
+    return model, history
+
+
+def save_checkpoint(model, path, **extra):
+    """서빙 쪽 load_forecaster 가 읽는 형식({"state_dict", "hparams", ...})으로 체크포인트를 원자적으로 저장합니다."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        torch.save({"state_dict": model.state_dict(), "hparams": MODEL_HPARAMS, **extra}, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
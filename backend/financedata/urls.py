@@ -1,11 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AssetViewSet, OHLCVViewSet, ForecastAPIView
+from .views import (
+    AssetViewSet, BacktestRunViewSet, OHLCVViewSet, ForecastAPIView, ForecastBatchAPIView, MarketOverviewAPIView,
+    ScreenerAPIView,
+)
 
 # DefaultRouter를 사용하여 AssetViewSet과 OHLCVViewSet의 URL 자동 등록
 router = DefaultRouter()
 router.register(r'assets', AssetViewSet)
 router.register(r'ohlcv', OHLCVViewSet)
+router.register(r'backtests', BacktestRunViewSet)
 
 urlpatterns = [
     # AssetViewSet과 OHLCVViewSet에 대한 URL
@@ -13,4 +17,11 @@ urlpatterns = [
 
     # ForecastAPIView URL 추가
     path('forecast/', ForecastAPIView.as_view(), name='forecast'),
+    path('forecast/batch/', ForecastBatchAPIView.as_view(), name='forecast-batch'),
+
+    # 시장 개요 (전체 자산 최신 봉 스냅샷)
+    path('market/overview/', MarketOverviewAPIView.as_view(), name='market-overview'),
+
+    # 지표 조건 스크리너
+    path('screener/', ScreenerAPIView.as_view(), name='screener'),
 ]
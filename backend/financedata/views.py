@@ -1,11 +1,42 @@
-from rest_framework import viewsets
+from rest_framework import mixins, viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.utils.dateparse import parse_date
-from .models import Asset, OHLCV
-from .serializers import AssetSerializer, OHLCVSerializer
+from .models import Asset, BacktestRun, MarketSnapshot, OHLCV
+from .serializers import AssetSerializer, BacktestRunSerializer, OHLCVSerializer
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from django.core.cache import cache
+from django.db.models import F
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 import datetime
-from .tasks import fetch_assets, fetch_ohlcv_data  # Celery 작업 불러오기
+import hashlib
+import math
+import numpy as np
+from . import columnar
+from .formats import BINARY_LAYOUT, iter_ohlcv_csv, ohlcv_arrow, ohlcv_binary, ohlcv_columnar, ohlcv_rows
+from .indicators import compute_indicators, get_latest_state, parse_indicator_specs, specs_key, to_json_list
+from .resample import parse_rule, resample_ohlcv
+from .screener import SCREEN_DEFAULT_LIMIT, SCREEN_MAX_LIMIT, ScreenExpressionError, ScreenerNotReady, run_screen
+from .search import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, get_search_index
+from .symbols import bump_symbols_version, get_symbols_payload
+from .renderers import ArrowRenderer, BinaryRenderer, ColumnarJSONRenderer, CSVRenderer
+from .tasks import fetch_assets, fetch_ohlcv_data, refresh_screener_features, run_forecast_backtest  # Celery 작업 불러오기
+
+# history 액션에서 허용하는 응답 형식 (?format= 또는 Accept 헤더)
+HISTORY_RENDERER_CLASSES = [
+    JSONRenderer, BrowsableAPIRenderer, ColumnarJSONRenderer, CSVRenderer, ArrowRenderer, BinaryRenderer,
+]
+RESAMPLE_RENDERER_CLASSES = [JSONRenderer, BrowsableAPIRenderer, ColumnarJSONRenderer]
+
+# 리샘플 결과 캐시 유지 시간 (키에 캐시 버전이 포함되어 새 봉 수집 시 자동으로 새 키 사용)
+OHLCV_RESAMPLE_CACHE_TIMEOUT = 60 * 60 * 24
+# 지표 계산 결과 캐시 유지 시간 (리샘플과 같이 키에 캐시 버전 포함)
+OHLCV_INDICATORS_CACHE_TIMEOUT = 60 * 60 * 24
+# 스크리너 피처 행렬이 없을 때 생성 작업을 다시 큐에 넣기까지의 간격 (여러 요청/워커가 중복으로 넣지 않도록)
+SCREENER_REFRESH_QUEUE_TIMEOUT = 60 * 10
+
 
 class AssetViewSet(viewsets.ModelViewSet):
     queryset = Asset.objects.all()
@@ -23,18 +54,43 @@ class AssetViewSet(viewsets.ModelViewSet):
     def get_symbols(self, request):
         """
         자산 타입별로 심볼과 회사명을 반환하는 액션
+        종목 목록 버전별로 직렬화된 응답을 캐시하고, ETag 가 같으면 304 를 반환합니다.
+        """
+        body, etag = get_symbols_payload()
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        return response
+
+    @action(detail=False, methods=['GET'])
+    def search(self, request):
+        """
+        자산 검색 (자동완성): 심볼 / 이름 접두사·부분 문자열 / 초성("ㅅㅅㅈㅈ")
+        요청 예시: /assets/search/?q=삼성&limit=10
         """
-        asset_types = Asset.ASSET_TYPE_CHOICES
-        symbol_groups = {}
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(max(int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "limit 은 정수여야 합니다."}, status=400)
+        return Response({"query": query, "results": get_search_index().search(query, limit)})
 
-        # 자산 타입별로 심볼과 회사명(이름)을 함께 반환
-        for asset_type, _ in asset_types:
-            assets = Asset.objects.filter(asset_type=asset_type)
-            symbol_groups[asset_type] = [
-                {"symbol": asset.symbol, "name": asset.name} for asset in assets
-            ]
+    # 자산 API 로 종목이 바뀌면 get_symbols 캐시 버전을 올림
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        bump_symbols_version()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        bump_symbols_version()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        bump_symbols_version()
 
-        return Response(symbol_groups)
 
 class OHLCVViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = OHLCV.objects.all()
@@ -44,14 +100,23 @@ class OHLCVViewSet(viewsets.ReadOnlyModelViewSet):
     def update_ohlcv(self, request):
         """
         모든 자산의 OHLCV 데이터를 자동 업데이트하는 엔드포인트
+        full_resync=true 를 전달하면 증분 대신 전체 기간을 다시 수집합니다. (복구용)
         """
-        fetch_ohlcv_data.delay()  # 비동기 실행
+        full_resync = str(request.data.get('full_resync', '')).lower() in ('1', 'true', 'yes')
+        fetch_ohlcv_data.delay(full_resync=full_resync)  # 비동기 실행
         return Response({"message": "OHLCV 데이터 업데이트를 시작했습니다."})
 
-    @action(detail=False, methods=['GET'])
+    @action(detail=False, methods=['GET'], renderer_classes=HISTORY_RENDERER_CLASSES)
     def history(self, request):
         """
         특정 자산의 OHLCV 데이터 조회 (기간별)
+        format 파라미터로 응답 형식을 고를 수 있습니다.
+        - json (기본): 기존 OHLCVSerializer 와 같은 행 목록 (id, asset, date, open ~ volume / 날짜 내림차순)
+        - columnar: {"date": [...], "close": [...]} 컬럼형 JSON (날짜 오름차순, 이하 동일)
+        - csv: StreamingHttpResponse 로 스트리밍
+        - arrow: Arrow IPC 스트림
+        - binary: 컬럼별 리틀 엔디언 배열 연속 배치 (X-OHLCV-Layout 헤더 참고)
+        마지막 봉/갱신 시각 기반 ETag, Last-Modified 를 지원하여 변경이 없으면 304 를 반환합니다.
         """
         symbol = request.query_params.get('symbol')
         start_date = request.query_params.get('start_date')
@@ -65,19 +130,144 @@ class OHLCVViewSet(viewsets.ReadOnlyModelViewSet):
         except Asset.DoesNotExist:
             return Response({'error': '해당 symbol을 찾을 수 없습니다.'}, status=404)
 
-        ohlcv_data = OHLCV.objects.filter(
-            asset=asset,
-            date__range=[parse_date(start_date), parse_date(end_date)]
-        ).order_by('-date')
+        # 컬럼형 캐시(memmap)에서 기간만큼 잘라서 응답 구성 (ORM/Decimal 변환 없음)
+        cached = columnar.get_columns(asset.id)
+        output_format = request.accepted_renderer.format
+
+        # 조건부 요청: 마지막 봉 날짜 + 캐시 갱신 시각이 같으면 304
+        version = columnar.cache_version(asset.id)
+        last_bar = str(cached.date[-1]) if len(cached) else ''
+        etag = '"{}"'.format(hashlib.md5(
+            f"{asset.id}:{last_bar}:{version}:{output_format}:{start_date}:{end_date}".encode()
+        ).hexdigest())
+        last_modified = version // 1_000_000_000 if version else None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        columns = cached.between(
+            parse_date(start_date) if start_date else None,
+            parse_date(end_date) if end_date else None,
+        )
+
+        if output_format == 'csv':
+            response = StreamingHttpResponse(iter_ohlcv_csv(columns), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="{symbol.replace("/", "_")}.csv"'
+        elif output_format == 'arrow':
+            response = HttpResponse(ohlcv_arrow(columns), content_type=ArrowRenderer.media_type)
+        elif output_format == 'binary':
+            response = HttpResponse(ohlcv_binary(columns), content_type=BinaryRenderer.media_type)
+            response['X-OHLCV-Rows'] = len(columns)
+            response['X-OHLCV-Layout'] = BINARY_LAYOUT
+        elif output_format == 'columnar':
+            response = Response(ohlcv_columnar(str(asset), columns))
+        else:
+            response = Response(ohlcv_rows(str(asset), columns, columnar.row_ids(asset.id, columns)))
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    @action(detail=False, methods=['GET'], renderer_classes=RESAMPLE_RENDERER_CLASSES)
+    def resample(self, request):
+        """
+        저장된 일봉을 주/월/분기/N일 봉으로 집계하여 반환
+        요청 예시: /ohlcv/resample/?symbol=005930&rule=W  (rule: W, M, Q, 5D ...)
+        format=columnar 로 컬럼형 JSON 을 받을 수 있습니다.
+        결과는 (자산, rule, 캐시 버전) 단위로 캐시되어 새 일봉이 수집되기 전까지 재사용됩니다.
+        """
+        symbol = request.query_params.get('symbol')
+        rule = request.query_params.get('rule', 'W').upper()
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+
+        if not symbol:
+            return Response({'error': 'symbol 파라미터가 필요합니다.'}, status=400)
+        try:
+            parse_rule(rule)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        try:
+            asset = Asset.objects.get(symbol=symbol)
+        except Asset.DoesNotExist:
+            return Response({'error': '해당 symbol을 찾을 수 없습니다.'}, status=404)
+
+        daily = columnar.get_columns(asset.id)
+        cache_key = f"ohlcv_resample:{asset.id}:{rule}:{columnar.cache_version(asset.id)}"
+        bars = cache.get(cache_key)
+        if bars is None:
+            bars = resample_ohlcv(daily, rule)
+            cache.set(cache_key, bars, OHLCV_RESAMPLE_CACHE_TIMEOUT)
+
+        bars = bars.between(
+            parse_date(start_date) if start_date else None,
+            parse_date(end_date) if end_date else None,
+        )
+        if request.accepted_renderer.format == 'columnar':
+            return Response(ohlcv_columnar(str(asset), bars))
+        return Response(ohlcv_rows(str(asset), bars))
+
+    @action(detail=False, methods=['GET'])
+    def indicators(self, request):
+        """
+        여러 기술적 지표를 한 번에 계산하여 컬럼형 JSON 으로 반환
+        요청 예시: /ohlcv/indicators/?symbol=AAPL&indicators=sma:20,ema:12,rsi:14,macd,bbands:20:2,atr:14,obv
+        지표는 전체 이력으로 계산한 뒤 start_date ~ end_date 구간만 잘라서 반환합니다. (앞부분 워밍업 보장)
+        전체 이력 계산 결과는 (자산, 지표 목록, 캐시 버전) 단위로 캐시되어 새 일봉이 수집되기 전까지 재사용됩니다.
+        latest 에는 수집 시 증분 갱신되어 공유 캐시에 보관된 EMA/RSI 최신 값이 포함됩니다.
+        """
+        symbol = request.query_params.get('symbol')
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+
+        if not symbol:
+            return Response({'error': 'symbol 파라미터가 필요합니다.'}, status=400)
+        try:
+            specs = parse_indicator_specs(request.query_params.get('indicators'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        try:
+            asset = Asset.objects.get(symbol=symbol)
+        except Asset.DoesNotExist:
+            return Response({'error': '해당 symbol을 찾을 수 없습니다.'}, status=404)
+
+        columns = columnar.get_columns(asset.id)
+        cache_key = f"ohlcv_indicators:{asset.id}:{specs_key(specs)}:{columnar.cache_version(asset.id)}"
+        values = cache.get(cache_key)
+        if values is None:
+            values = compute_indicators(columns, specs)
+            cache.set(cache_key, values, OHLCV_INDICATORS_CACHE_TIMEOUT)
+
+        # 요청 구간 위치 계산 후 모든 지표 배열을 같은 구간으로 슬라이싱
+        window = columns.between(
+            parse_date(start_date) if start_date else None,
+            parse_date(end_date) if end_date else None,
+        )
+        lo = int(np.searchsorted(columns.date, window.date[0])) if len(window) else 0
+        hi = lo + len(window)
 
-        serializer = OHLCVSerializer(ohlcv_data, many=True)
-        return Response(serializer.data)
+        payload = {
+            "asset": str(asset),
+            "date": window.date.astype(str).tolist(),
+            "close": window.close.tolist(),
+        }
+        for name, series in values.items():
+            payload[name] = to_json_list(series[lo:hi])
+        payload["latest"] = {
+            name: (None if math.isnan(value) else round(value, 4))
+            for name, value in get_latest_state(asset.id).values().items()
+        }
+        return Response(payload)
 
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .forecast import predict_forecast
+from .backtest import summarize_backtest
+from .forecast import MAX_FORECAST_BATCH, predict_forecast, predict_forecast_batch
 
 
 class ForecastAPIView(APIView):
@@ -99,8 +289,135 @@ class ForecastAPIView(APIView):
         except Exception as e:
             return Response({"error": f"예측 처리 중 오류 발생: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # 예측 결과가 리스트 형태로 반환된다고 가정하고 결과 반환
+        # 예측 결과와 Monte Carlo 예측 밴드(p10/p50/p90) 반환
         return Response({
             "asset": asset_symbol,
-            "forecast": forecast["forecast"]  # forecast 필드를 반환 (forecast는 predict_forecast가 반환하는 dict로 가정)
+            "forecast": forecast["forecast"],
+            "bands": forecast["bands"],
         })
+
+
+class ForecastBatchAPIView(APIView):
+    """
+    여러 자산의 예측을 한 번의 배치 추론으로 반환합니다.
+    요청 예시: /forecast/batch/?symbols=AAPL,MSFT,005930
+    데이터가 부족한 자산은 해당 항목에만 error 가 담깁니다.
+    """
+
+    def get(self, request, format=None):
+        symbols = [s.strip() for s in request.query_params.get('symbols', '').split(',') if s.strip()]
+        if not symbols:
+            return Response({"error": "symbols 파라미터가 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(symbols) > MAX_FORECAST_BATCH:
+            return Response(
+                {"error": f"한 번에 최대 {MAX_FORECAST_BATCH}개 자산까지 요청할 수 있습니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            results = predict_forecast_batch(symbols)
+        except Exception as e:
+            return Response({"error": f"예측 처리 중 오류 발생: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({"results": results})
+
+
+class BacktestRunViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    예측 모델 walk-forward 백테스트
+    - POST /backtests/ {"start_date", "end_date", "step", "symbols" 또는 "asset_types"}: 백테스트를 비동기로 시작
+    - GET /backtests/<id>/summary/: 전체 / horizon 별 / asset_type 별 MAPE, 방향 적중률
+    """
+    queryset = BacktestRun.objects.all().order_by('-created_at')
+    serializer_class = BacktestRunSerializer
+
+    def perform_create(self, serializer):
+        run = serializer.save()
+        run_forecast_backtest.delay(run.id)  # 비동기 실행
+
+    @action(detail=True, methods=['GET'])
+    def summary(self, request, pk=None):
+        return Response(summarize_backtest(self.get_object()))
+
+
+# 시장 개요 정렬 기준 (?sort=)
+MARKET_OVERVIEW_SORTS = {
+    'symbol': F('asset__symbol').asc(),
+    'change_pct': F('change_pct').asc(nulls_last=True),
+    '-change_pct': F('change_pct').desc(nulls_last=True),
+    'volume': F('volume').asc(),
+    '-volume': F('volume').desc(),
+}
+
+
+class MarketOverviewAPIView(APIView):
+    """
+    전체 자산(또는 asset_type)의 최신 가격 / 전일 대비 등락률 / 거래량을 한 번에 반환합니다.
+    자산별 history 호출 대신 MarketSnapshot 테이블을 쿼리 1회로 읽습니다.
+    요청 예시: /market/overview/?asset_type=stock_kr&sort=-change_pct&limit=20 (상승률 상위 20개)
+    """
+
+    def get(self, request, format=None):
+        asset_type = request.query_params.get('asset_type')
+        sort = request.query_params.get('sort', 'symbol')
+        if sort not in MARKET_OVERVIEW_SORTS:
+            return Response(
+                {"error": f"sort 는 {', '.join(MARKET_OVERVIEW_SORTS)} 중 하나여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = int(request.query_params['limit']) if 'limit' in request.query_params else None
+        except ValueError:
+            return Response({"error": "limit 은 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = MarketSnapshot.objects.filter(asset__is_active=True)
+        if asset_type:
+            qs = qs.filter(asset__asset_type=asset_type)
+        qs = qs.order_by(MARKET_OVERVIEW_SORTS[sort]).values(
+            'date', 'close', 'change', 'change_pct', 'volume',
+            symbol=F('asset__symbol'), name=F('asset__name'), asset_type=F('asset__asset_type'),
+        )
+        if limit is not None:
+            qs = qs[:max(limit, 0)]
+
+        results = list(qs)
+        for row in results:
+            if row['change_pct'] is not None:
+                row['change_pct'] = round(row['change_pct'], 2)
+        return Response({
+            "as_of": max((row['date'] for row in results), default=None),
+            "count": len(results),
+            "results": results,
+        })
+
+
+class ScreenerAPIView(APIView):
+    """
+    전체 자산을 지표 조건식으로 필터링합니다. (미리 계산된 피처 행렬에 벡터화된 마스크 적용)
+    요청 예시: /screener/?q=rsi_14 < 30 and close > sma_200 and volume_avg_20 > 1000000&sort=rsi_14&limit=20
+    피처 행렬이 아직 없으면 생성 작업을 큐에 넣고 503 을 반환합니다.
+    """
+
+    def get(self, request, format=None):
+        try:
+            limit = int(request.query_params.get('limit', SCREEN_DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"error": "limit 은 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 0), SCREEN_MAX_LIMIT)
+
+        try:
+            result = run_screen(
+                request.query_params.get('q', ''),
+                asset_type=request.query_params.get('asset_type'),
+                sort=request.query_params.get('sort'),
+                limit=limit,
+            )
+        except ScreenExpressionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ScreenerNotReady as e:
+            if cache.add('screener:refresh_queued', 1, SCREENER_REFRESH_QUEUE_TIMEOUT):
+                refresh_screener_features.delay()
+            response = Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = 60
+            return response
+        return Response(result)
@@ -1,12 +1,11 @@
 from django.apps import AppConfig
-from .utils import start_upbit_ws
 
 class GraphsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
 
     name = 'graphs'
 
-    def ready(self):
-        symbols = ['BTC', 'ETH']  # 모니터링할 심볼 리스트
-        for symbol in symbols:
-            start_upbit_ws(symbol)
\ No newline at end of file
+    # Upbit 틱 수집(upbit_ws_consumer + TickSink)은 앱 로딩 시점이 아니라 전용 프로세스에서 실행합니다.
+    # (gunicorn + UvicornWorker 는 이벤트 루프가 생기기 전에 앱을 로드하므로 ready() 에서는 시작할 수 없고,
+    #  웹 워커마다 시작하면 같은 틱을 워커 수만큼 중복 브로드캐스트하게 됨)
+    #   python manage.py run_upbit_ws
@@ -0,0 +1,133 @@
+import datetime
+from collections import deque
+
+from django.conf import settings
+
+# 실시간 봉 간격 (이름 → 초) 과 시드용 캔들 종류 (graphs.store.get_candles 인자)
+BAR_INTERVALS = {
+    '1s': 1,
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+}
+BAR_SEED_CANDLES = {
+    '1s': ('seconds', None),
+    '1m': ('minutes', 1),
+    '5m': ('minutes', 5),
+    '15m': ('minutes', 15),
+}
+# 간격별로 메모리에 보관하는 마감 봉 수
+BAR_HISTORY = getattr(settings, 'BAR_HISTORY', 500)
+
+
+class Bar:
+    __slots__ = ('start', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, start, open, high, low, close, volume):
+        self.start = start  # 봉 시작 시각 (ms)
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def as_dict(self):
+        return {
+            'start': datetime.datetime.fromtimestamp(self.start / 1000, datetime.timezone.utc).isoformat(),
+            'timestamp': self.start,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+        }
+
+
+class BarSeries:
+    """
+    심볼 하나 × 간격 하나의 봉 시계열
+    마감 봉은 최근 BAR_HISTORY 개만 링 버퍼(deque)에 두고, 진행 중인 봉은 틱마다 갱신합니다.
+    """
+
+    def __init__(self, interval_seconds, history=BAR_HISTORY):
+        self.step = interval_seconds * 1000
+        self.closed = deque(maxlen=history)
+        self.current = None
+        self.seeded = False  # 과거 봉을 채웠는지 여부
+
+    def update(self, price, volume, timestamp):
+        """
+        틱 하나를 반영하고 발생한 이벤트 [(이벤트, Bar), ...] 를 반환합니다.
+        - 새 구간의 첫 틱: 진행 중이던 봉 bar_close, 새 봉 bar_update
+        - 같은 구간의 틱: bar_update
+        - 이미 마감된 구간의 늦은 틱은 버립니다.
+        거래가 없던 구간에는 봉이 생기지 않습니다. (Upbit 캔들과 동일)
+        """
+        start = timestamp - timestamp % self.step
+        current = self.current
+        if current is not None and start < current.start:
+            return []
+        if current is not None and start == current.start:
+            current.high = max(current.high, price)
+            current.low = min(current.low, price)
+            current.close = price
+            current.volume += volume
+            return [('bar_update', current)]
+
+        events = []
+        if current is not None:
+            self.closed.append(current)
+            events.append(('bar_close', current))
+        self.current = Bar(start, price, price, price, price, volume)
+        events.append(('bar_update', self.current))
+        return events
+
+    def seed(self, bars):
+        """
+        과거 마감 봉(오래된 순)을 앞에 채웁니다. 이미 받은 봉과 같거나 이후 구간, 아직 진행 중인 구간은 건너뜁니다.
+        """
+        now = int(datetime.datetime.now(datetime.timezone.utc).timestamp() * 1000)
+        first = self.closed[0].start if self.closed else (self.current.start if self.current else now - now % self.step)
+        older = [bar for bar in bars if bar.start < first]
+        room = self.closed.maxlen - len(self.closed)
+        if room > 0 and older:
+            self.closed.extendleft(reversed(older[-room:]))
+        self.seeded = True
+
+    def snapshot(self):
+        """마감 봉 + 진행 중인 봉 (오래된 순)"""
+        bars = list(self.closed)
+        if self.current is not None:
+            bars.append(self.current)
+        return bars
+
+    def __len__(self):
+        return len(self.closed) + (self.current is not None)
+
+
+class BarBuilder:
+    """심볼별 · 간격별 BarSeries 를 관리하며 틱을 모든 간격에 반영합니다."""
+
+    def __init__(self, intervals=BAR_INTERVALS, history=BAR_HISTORY):
+        self.intervals = intervals
+        self.history = history
+        self.series = {}  # {symbol: {interval: BarSeries}}
+
+    def get(self, symbol, interval):
+        by_interval = self.series.get(symbol)
+        if by_interval is None:
+            by_interval = self.series[symbol] = {
+                name: BarSeries(seconds, self.history) for name, seconds in self.intervals.items()
+            }
+        return by_interval[interval]
+
+    def on_tick(self, symbol, price, volume, timestamp):
+        """틱 하나를 반영하고 [(interval, 이벤트, Bar), ...] 를 반환합니다."""
+        events = []
+        for interval in self.intervals:
+            for event, bar in self.get(symbol, interval).update(price, volume, timestamp):
+                events.append((interval, event, bar))
+        return events
+
+    def discard(self, symbol):
+        self.series.pop(symbol, None)
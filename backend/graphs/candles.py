@@ -0,0 +1,182 @@
+import asyncio
+import datetime
+import logging
+import time
+from collections import OrderedDict
+
+import httpx
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+UPBIT_API_URL = getattr(settings, 'UPBIT_API_URL', "https://api.upbit.com/v1")
+# Upbit 캔들 API 초당 요청 제한 (프로세스 기준)
+UPBIT_CANDLE_RATE_LIMIT = getattr(settings, 'UPBIT_CANDLE_RATE_LIMIT', 10)
+UPBIT_REQUEST_TIMEOUT = getattr(settings, 'UPBIT_REQUEST_TIMEOUT', 10)
+
+# 응답 캐시: 최대 항목 수 (LRU), 과거 구간(to 가 과거) 캐시 유지 시간 (None 이면 LRU 에서 밀려날 때까지)
+CANDLE_CACHE_MAX_ENTRIES = getattr(settings, 'CANDLE_CACHE_MAX_ENTRIES', 4096)
+CANDLE_HISTORY_TTL = getattr(settings, 'CANDLE_HISTORY_TTL', None)
+# 최신 구간 캐시 유지 시간 = 캔들 간격 × 비율 (1초 ~ 최대값 사이)
+CANDLE_LIVE_TTL_RATIO = 1 / 60
+CANDLE_LIVE_TTL_MAX = getattr(settings, 'CANDLE_LIVE_TTL_MAX', 30)
+
+# 캔들 종류별 간격 (초, minutes 는 unit 을 곱함 / months 는 가장 긴 달 기준)
+CANDLE_INTERVAL_SECONDS = {
+    'seconds': 1,
+    'minutes': 60,
+    'days': 60 * 60 * 24,
+    'weeks': 60 * 60 * 24 * 7,
+    'months': 60 * 60 * 24 * 31,
+}
+MINUTE_UNITS = (1, 3, 5, 10, 15, 30, 60, 240)
+# 간격이 고정되어 로컬 캔들 저장소(graphs.store)에 보관하는 캔들 종류 (월봉은 Upbit 프록시만 사용)
+STORED_CANDLE_TYPES = ('seconds', 'minutes', 'days', 'weeks')
+UPBIT_PAGE_SIZE = 200  # Upbit 한 번 요청당 최대 캔들 수
+# 로컬 캔들 저장소를 거치는 요청의 최대 캔들 수 (Upbit 에는 UPBIT_PAGE_SIZE 단위로 나누어 요청)
+CANDLE_MAX_COUNT = getattr(settings, 'CANDLE_MAX_COUNT', 2000)
+
+
+class CandleRequestError(ValueError):
+    pass
+
+
+def candle_interval(candle_type, unit=None):
+    """캔들 하나의 길이 (초)"""
+    interval = CANDLE_INTERVAL_SECONDS[candle_type]
+    return interval * unit if candle_type == 'minutes' else interval
+
+
+def upstream_path(candle_type, unit=None):
+    """Upbit 캔들 API 경로 (분봉은 /candles/minutes/{unit})"""
+    return f"/candles/minutes/{unit}" if candle_type == 'minutes' else f"/candles/{candle_type}"
+
+
+def validate_request(candle_type, unit, count):
+    """쿼리 파라미터를 검증하여 (unit, count) 를 정수로 반환합니다. 잘못되면 CandleRequestError"""
+    if candle_type not in CANDLE_INTERVAL_SECONDS:
+        raise CandleRequestError(f"지원하지 않는 캔들 종류입니다: '{candle_type}' ({', '.join(CANDLE_INTERVAL_SECONDS)})")
+    try:
+        count = int(count)
+        unit = int(unit) if unit else None
+    except ValueError:
+        raise CandleRequestError("count와 unit은 정수여야 합니다.")
+    max_count = CANDLE_MAX_COUNT if candle_type in STORED_CANDLE_TYPES else UPBIT_PAGE_SIZE
+    if not 1 <= count <= max_count:
+        raise CandleRequestError(f"count는 1 ~ {max_count} 사이여야 합니다.")
+    if candle_type == 'minutes':
+        unit = unit or 1
+        if unit not in MINUTE_UNITS:
+            raise CandleRequestError(f"분봉 unit은 {', '.join(map(str, MINUTE_UNITS))} 중 하나여야 합니다.")
+    return unit, count
+
+
+def parse_to(to):
+    """Upbit 의 to 파라미터를 aware datetime 으로 변환합니다. (시간대가 없으면 UTC, 해석할 수 없으면 None)"""
+    if not to:
+        return None
+    value = parse_datetime(to.replace(' ', 'T'))
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def cache_ttl(candle_type, unit, to, now=None):
+    """
+    응답 캐시 유지 시간 (초, None 이면 만료 없음)
+    - to 이전 캔들이 모두 마감된 과거 구간: CANDLE_HISTORY_TTL (바뀌지 않음)
+    - 최신 구간: 캔들 간격에 비례한 짧은 시간 (마지막 캔들이 체결마다 바뀜)
+    """
+    interval = candle_interval(candle_type, unit)
+    end = parse_to(to)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    if end is not None and end + datetime.timedelta(seconds=interval) <= now:
+        return CANDLE_HISTORY_TTL
+    return min(max(interval * CANDLE_LIVE_TTL_RATIO, 1), CANDLE_LIVE_TTL_MAX)
+
+
+class CandleProxy:
+    """
+    Upbit 캔들 API 프록시 (이벤트 루프당 하나)
+    - keep-alive 연결을 재사용하는 httpx.AsyncClient 하나를 공유합니다.
+    - (candle_type, unit, symbol, count, to) 키로 Upbit 응답(캔들 리스트)을 TTL + LRU 캐시합니다.
+    - 같은 키의 동시 요청은 업스트림 호출 하나로 합칩니다. (single-flight)
+    - 업스트림 요청 시작 간격을 UPBIT_CANDLE_RATE_LIMIT 이하로 유지합니다.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.client = httpx.AsyncClient(
+            base_url=UPBIT_API_URL,
+            headers={"accept": "application/json"},
+            timeout=UPBIT_REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        )
+        self.cache = OrderedDict()  # {key: (만료 시각 또는 None, 캔들 리스트)}
+        self.inflight = {}  # {key: 업스트림 호출 Task}
+        self.rate_lock = asyncio.Lock()
+        self.next_request_at = 0.0
+
+        # 모니터링용 카운터
+        self.hits = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+
+    async def get(self, candle_type, unit, symbol, count, to=None):
+        """Upbit 캔들 리스트(최신순)를 반환합니다. 업스트림 실패 시 httpx.HTTPError"""
+        key = (candle_type, unit, symbol, count, to)
+        cached = self.cache.get(key)
+        if cached is not None:
+            expires_at, data = cached
+            if expires_at is None or expires_at > time.monotonic():
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return data
+            del self.cache[key]
+
+        task = self.inflight.get(key)
+        if task is None:
+            task = self.loop.create_task(self.fetch(key))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # 요청 하나가 취소되어도 같은 키를 기다리는 다른 요청은 계속 진행
+        return await asyncio.shield(task)
+
+    async def fetch(self, key):
+        candle_type, unit, symbol, count, to = key
+        params = {"market": symbol, "count": count}
+        if to:
+            params["to"] = to
+        data = await self.request(upstream_path(candle_type, unit), params)
+
+        ttl = cache_ttl(candle_type, unit, to)
+        self.cache[key] = (None if ttl is None else time.monotonic() + ttl, data)
+        while len(self.cache) > CANDLE_CACHE_MAX_ENTRIES:
+            self.cache.popitem(last=False)
+        return data
+
+    async def request(self, path, params):
+        """업스트림 GET (요청 간격 제한 적용)"""
+        async with self.rate_lock:
+            now = time.monotonic()
+            if self.next_request_at > now:
+                await asyncio.sleep(self.next_request_at - now)
+            self.next_request_at = max(now, self.next_request_at) + 1 / UPBIT_CANDLE_RATE_LIMIT
+        self.upstream_calls += 1
+        response = await self.client.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+
+_proxy = None
+
+
+def get_proxy():
+    """현재 이벤트 루프의 프록시를 반환합니다. (httpx 클라이언트는 루프에 묶이므로 루프가 바뀌면 새로 생성)"""
+    global _proxy
+    if _proxy is None or _proxy.loop is not asyncio.get_running_loop():
+        _proxy = CandleProxy()
+    return _proxy
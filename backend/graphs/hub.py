@@ -0,0 +1,219 @@
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime
+
+import websockets
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .bars import BAR_SEED_CANDLES, Bar, BarBuilder
+
+logger = logging.getLogger(__name__)
+
+UPBIT_WS_URL = getattr(settings, 'UPBIT_WS_URL', "wss://api.upbit.com/websocket/v1")
+
+# 짧은 시간 안에 몰린 구독/해제를 모아서 구독 메시지를 한 번만 다시 보내기 위한 대기 시간 (초)
+UPBIT_HUB_RESUBSCRIBE_DELAY = getattr(settings, 'UPBIT_HUB_RESUBSCRIBE_DELAY', 0.2)
+# 업스트림 재연결 대기 시간 (초, 실패할 때마다 두 배씩 최대값까지)
+UPBIT_HUB_RETRY_DELAY = getattr(settings, 'UPBIT_HUB_RETRY_DELAY', 5)
+UPBIT_HUB_MAX_RETRY_DELAY = getattr(settings, 'UPBIT_HUB_MAX_RETRY_DELAY', 60)
+
+
+def ticker_payload(data):
+    """Upbit ticker 메시지 → 클라이언트 전송용 데이터"""
+    return {
+        'symbol': data.get('code'),
+        'trade_price': data.get('trade_price'),  # 거래 가격
+        'timestamp': datetime.fromtimestamp(data.get('timestamp') / 1000).isoformat(),  # 타임스탬프
+        'signed_change_price': data.get('signed_change_price'),  # 가격 변화
+        'signed_change_rate': data.get('signed_change_rate'),  # 변화율
+        'trade_volume': data.get('trade_volume'),  # 거래량
+    }
+
+
+class UpbitTickerHub:
+    """
+    프로세스의 모든 시청자가 공유하는 Upbit 업스트림 WebSocket 하나를 관리합니다.
+    - 심볼별 로컬 구독자 수를 세고, 구독 코드 목록이 바뀌면 같은 연결에서 구독 메시지를 다시 보냅니다.
+    - 틱 하나는 심볼 그룹에 한 번만 group_send 합니다. (시청자 수와 무관)
+    - 구독자가 모두 떠나면 업스트림 연결을 닫습니다.
+    - 틱으로 실시간 봉(BarBuilder)을 만들고, 봉 구독자가 있는 간격에만 bar_update / bar_close 를 보냅니다.
+    그룹 이름에 허브 ID 를 붙여, 워커 프로세스가 여러 개여도 각 시청자는 자기 프로세스 허브의 틱만 한 번 받습니다.
+    """
+
+    def __init__(self, url=UPBIT_WS_URL):
+        self.url = url
+        self.hub_id = uuid.uuid4().hex[:12]
+        self.loop = asyncio.get_running_loop()
+        self.channel_layer = get_channel_layer()
+        self.subscribers = {}  # {symbol: 로컬 구독자 수}
+        self.bar_subscribers = {}  # {(symbol, interval): 로컬 봉 구독자 수}
+        self.bars = BarBuilder()
+        self.seeding = set()  # 과거 봉을 채우는 중인 (symbol, interval)
+        self.subscribed_codes = ()  # 업스트림에 마지막으로 보낸 코드 목록
+        self.changed = asyncio.Event()
+        self.task = None
+
+        # 모니터링용 카운터
+        self.connections = 0  # 업스트림 연결 횟수 (재연결 포함)
+        self.messages = 0  # 업스트림에서 받은 틱 수
+
+    def group_name(self, symbol):
+        return f"upbit_{symbol}.{self.hub_id}"
+
+    def bar_group_name(self, symbol, interval):
+        return f"upbit_bars_{symbol}_{interval}.{self.hub_id}"
+
+    def subscribe(self, symbol):
+        """심볼의 로컬 구독자를 하나 늘립니다. 첫 구독자면 업스트림 구독 목록에 추가합니다."""
+        self.subscribers[symbol] = self.subscribers.get(symbol, 0) + 1
+        if self.subscribers[symbol] == 1:
+            self.changed.set()
+        if self.task is None or self.task.done():
+            self.task = self.loop.create_task(self.run())
+
+    def unsubscribe(self, symbol):
+        """심볼의 로컬 구독자를 하나 줄입니다. 마지막 구독자면 업스트림 구독 목록에서 제거합니다."""
+        count = self.subscribers.get(symbol, 0) - 1
+        if count > 0:
+            self.subscribers[symbol] = count
+        elif self.subscribers.pop(symbol, None) is not None:
+            self.bars.discard(symbol)
+            self.changed.set()
+
+    def subscribe_bars(self, symbol, interval):
+        """
+        심볼·간격의 봉 구독자를 하나 늘리고 현재 봉 스냅샷(오래된 순 Bar 리스트)을 반환합니다.
+        아직 과거 봉을 채우지 않았으면 로컬 캔들 저장소에서 채운 뒤 스냅샷을 다시 보냅니다.
+        """
+        self.subscribe(symbol)
+        key = (symbol, interval)
+        self.bar_subscribers[key] = self.bar_subscribers.get(key, 0) + 1
+        series = self.bars.get(symbol, interval)
+        if not series.seeded and key not in self.seeding:
+            self.seeding.add(key)
+            self.loop.create_task(self.seed_bars(symbol, interval))
+        return series.snapshot()
+
+    def unsubscribe_bars(self, symbol, interval):
+        key = (symbol, interval)
+        count = self.bar_subscribers.get(key, 0) - 1
+        if count > 0:
+            self.bar_subscribers[key] = count
+        else:
+            self.bar_subscribers.pop(key, None)
+        self.unsubscribe(symbol)
+
+    async def seed_bars(self, symbol, interval):
+        """로컬 캔들 저장소(graphs.store)의 마감 캔들로 봉 링 버퍼를 채우고 봉 그룹에 스냅샷을 보냅니다."""
+        from .store import get_candles, parse_start
+
+        candle_type, unit = BAR_SEED_CANDLES[interval]
+        try:
+            candles = await get_candles(candle_type, unit, symbol, self.bars.history)
+        except Exception as e:
+            logger.warning(f"⚠️ {symbol} {interval} 과거 봉 채우기 실패: {e}")
+            return
+        finally:
+            self.seeding.discard((symbol, interval))
+        if symbol not in self.subscribers:
+            return
+
+        series = self.bars.get(symbol, interval)
+        series.seed([
+            Bar(
+                int(parse_start(c).timestamp() * 1000),
+                c['opening_price'], c['high_price'], c['low_price'], c['trade_price'], c['candle_acc_trade_volume'],
+            )
+            for c in reversed(candles)
+        ])
+        await self.channel_layer.group_send(
+            self.bar_group_name(symbol, interval),
+            {'type': 'send_bars', 'event': 'snapshot', 'interval': interval,
+             'bars': [bar.as_dict() for bar in series.snapshot()]},
+        )
+
+    def codes(self):
+        return tuple(sorted(self.subscribers))
+
+    async def run(self):
+        """구독자가 있는 동안 업스트림 연결을 유지합니다. (끊기면 지수 백오프로 재연결)"""
+        retry_delay = UPBIT_HUB_RETRY_DELAY
+        while self.subscribers:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    self.connections += 1
+                    retry_delay = UPBIT_HUB_RETRY_DELAY
+                    self.changed.clear()
+                    await self.send_subscription(websocket)
+                    watcher = self.loop.create_task(self.watch_subscriptions(websocket))
+                    try:
+                        async for message in websocket:
+                            await self.publish(json.loads(message))
+                    finally:
+                        watcher.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Upbit 허브 연결 오류: {e} ({retry_delay}초 후 재연결)")
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, UPBIT_HUB_MAX_RETRY_DELAY)
+            finally:
+                self.subscribed_codes = ()
+        logger.info("🔌 Upbit 허브 구독자가 없어 업스트림 연결을 종료했습니다.")
+
+    async def send_subscription(self, websocket):
+        codes = self.codes()
+        await websocket.send(json.dumps([
+            {"ticket": f"tradevortex-{self.hub_id}"},
+            {"type": "ticker", "codes": list(codes), "isOnlyRealtime": True},
+        ]))
+        self.subscribed_codes = codes
+        logger.info(f"📡 Upbit 허브 구독 갱신: {len(codes)}개 심볼")
+
+    async def watch_subscriptions(self, websocket):
+        """구독 목록 변경을 모아서 반영합니다. 구독자가 없으면 연결을 닫습니다."""
+        while True:
+            await self.changed.wait()
+            await asyncio.sleep(UPBIT_HUB_RESUBSCRIBE_DELAY)
+            self.changed.clear()
+            if not self.subscribers:
+                await websocket.close()
+                return
+            if self.codes() != self.subscribed_codes:
+                await self.send_subscription(websocket)
+
+    async def publish(self, data):
+        """틱 하나를 해당 심볼 그룹에 한 번 전송합니다."""
+        symbol = data.get('code')
+        if symbol not in self.subscribers:
+            if 'error' in data:
+                logger.error(f"❌ Upbit 허브 오류 응답: {data['error']}")
+            return  # 방금 구독 해제된 심볼의 잔여 틱
+        self.messages += 1
+        await self.channel_layer.group_send(
+            self.group_name(symbol),
+            {'type': 'send_data', 'data': ticker_payload(data)},
+        )
+
+        timestamp = data.get('trade_timestamp') or data.get('timestamp')
+        events = self.bars.on_tick(symbol, data.get('trade_price'), data.get('trade_volume') or 0, timestamp)
+        for interval, event, bar in events:
+            if (symbol, interval) in self.bar_subscribers:
+                await self.channel_layer.group_send(
+                    self.bar_group_name(symbol, interval),
+                    {'type': 'send_bars', 'event': event, 'interval': interval, 'bars': [bar.as_dict()]},
+                )
+
+
+_hub = None
+
+
+def get_hub():
+    """현재 이벤트 루프의 허브를 반환합니다. (프로세스당 하나, 루프가 바뀌면 새로 생성)"""
+    global _hub
+    if _hub is None or _hub.loop is not asyncio.get_running_loop():
+        _hub = UpbitTickerHub()
+    return _hub
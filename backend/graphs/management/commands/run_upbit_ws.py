@@ -0,0 +1,34 @@
+import asyncio
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from graphs.utils import run_upbit_ws
+
+# 기본 모니터링 심볼 (KRW 마켓 코드에서 'KRW-' 를 뺀 형태)
+UPBIT_WS_SYMBOLS = getattr(settings, 'UPBIT_WS_SYMBOLS', ['BTC', 'ETH'])
+
+
+class Command(BaseCommand):
+    help = "Upbit ticker 웹소켓을 구독하여 틱을 FinancialData 에 배치 저장하고 financial_data_{symbol} 그룹에 브로드캐스트합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbols', nargs='*', help=f"모니터링할 심볼 (기본: {' '.join(UPBIT_WS_SYMBOLS)})")
+
+    def handle(self, *args, **options):
+        symbols = options['symbols'] or UPBIT_WS_SYMBOLS
+        self.stdout.write(f"📡 Upbit 틱 수집 시작: {', '.join(symbols)}")
+        asyncio.run(self.run(symbols))
+        self.stdout.write("🛑 Upbit 틱 수집 종료 (버퍼 저장 완료)")
+
+    async def run(self, symbols):
+        # SIGTERM(컨테이너 종료)에도 버퍼에 남은 틱을 저장하고 끝나도록 태스크를 취소
+        task = asyncio.create_task(run_upbit_ws(symbols))
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graphs', '0002_alter_financialdata_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Candle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=20)),
+                ('interval', models.CharField(max_length=16)),
+                ('candle_start', models.DateTimeField()),
+                ('open', models.FloatField()),
+                ('high', models.FloatField()),
+                ('low', models.FloatField()),
+                ('close', models.FloatField()),
+                ('volume', models.FloatField()),
+                ('value', models.FloatField()),
+                ('timestamp', models.BigIntegerField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('symbol', 'interval', 'candle_start'), name='unique_candle')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CandleCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=20)),
+                ('interval', models.CharField(max_length=16)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['symbol', 'interval', 'start'], name='graphs_cand_symbol_c3669f_idx')],
+            },
+        ),
+    ]
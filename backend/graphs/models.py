@@ -41,3 +41,47 @@ class FinancialData(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['symbol', 'timestamp'], name='unique_symbol_timestamp'),
         ]
+
+
+class Candle(models.Model):
+    """
+    Upbit 에서 받아 온 마감된 캔들 (시장 × 간격 × 시작 시각당 1행)
+    차트 이동/확대 시 이미 받은 구간은 Upbit 를 다시 호출하지 않고 이 테이블에서 읽습니다.
+    """
+    symbol = models.CharField(max_length=20)  # 마켓 코드 (예: KRW-BTC)
+    interval = models.CharField(max_length=16)  # 캔들 간격 (seconds, minutes/5, days, weeks)
+    candle_start = models.DateTimeField()  # 캔들 시작 시각 (UTC)
+    open = models.FloatField()
+    high = models.FloatField()
+    low = models.FloatField()
+    close = models.FloatField()
+    volume = models.FloatField()  # 누적 거래량
+    value = models.FloatField()  # 누적 거래대금
+    timestamp = models.BigIntegerField()  # 마지막 틱 시각 (ms)
+
+    def __str__(self):
+        return f"{self.symbol} {self.interval} {self.candle_start}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['symbol', 'interval', 'candle_start'], name='unique_candle'),
+        ]
+
+
+class CandleCoverage(models.Model):
+    """
+    Upbit 에서 받아 Candle 에 저장을 마친 구간 [start, end)
+    구간 안에 캔들이 없는 시각은 거래가 없었던 것이므로 다시 요청하지 않습니다.
+    """
+    symbol = models.CharField(max_length=20)
+    interval = models.CharField(max_length=16)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.symbol} {self.interval} [{self.start}, {self.end})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['symbol', 'interval', 'start']),
+        ]
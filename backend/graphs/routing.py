@@ -5,5 +5,6 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/upbit/(?P<symbol>[\w-]+)/$', consumers.UpbitConsumer.as_asgi()),
+    re_path(r'ws/upbit/(?P<symbol>[\w-]+)/bars/(?P<interval>\w+)/$', consumers.UpbitBarConsumer.as_asgi()),
 
 ]
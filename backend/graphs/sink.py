@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import FinancialData
+
+logger = logging.getLogger(__name__)
+
+# 버퍼가 이 행 수에 도달하거나 마지막 저장 후 이 시간(ms)이 지나면 저장
+TICK_FLUSH_ROWS = getattr(settings, 'TICK_FLUSH_ROWS', 500)
+TICK_FLUSH_INTERVAL_MS = getattr(settings, 'TICK_FLUSH_INTERVAL_MS', 200)
+# 버퍼 최대 행 수 - DB 가 밀려 버퍼가 가득 차면 새 틱은 버리고 dropped 로 집계 (브로드캐스트는 멈추지 않음)
+TICK_BUFFER_MAX = getattr(settings, 'TICK_BUFFER_MAX', 50000)
+
+# 지표를 공유 캐시에 게시하는 간격 (초) - 틱 수집은 run_upbit_ws 프로세스에서, 지표 조회는 웹 워커에서 이루어짐
+TICK_STATS_INTERVAL = getattr(settings, 'TICK_STATS_INTERVAL', 1)
+TICK_STATS_CACHE_KEY = 'tick_sink:stats'
+
+TICK_UPDATE_FIELDS = ['open', 'high', 'low', 'close', 'volume', 'asset_type']
+
+
+def write_ticks(rows):
+    """
+    틱을 (symbol, timestamp) 유니크 제약 기준으로 한 번에 upsert 합니다. (INSERT ... ON CONFLICT DO UPDATE)
+    같은 배치 안에서 키가 겹치면 마지막 틱만 남깁니다. (한 문장에서 같은 행을 두 번 갱신할 수 없음)
+    """
+    latest = {(row['symbol'], row['timestamp']): row for row in rows}
+    FinancialData.objects.bulk_create(
+        [FinancialData(**row) for row in latest.values()],
+        update_conflicts=True,
+        unique_fields=['symbol', 'timestamp'],
+        update_fields=TICK_UPDATE_FIELDS,
+    )
+    return len(latest)
+
+
+class TickSink:
+    """
+    이벤트 루프를 막지 않는 틱 저장소
+    put() 은 메모리 버퍼에 추가만 하고, 백그라운드 태스크가 TICK_FLUSH_INTERVAL_MS 마다
+    (또는 TICK_FLUSH_ROWS 행이 쌓이면 바로) 버퍼 전체를 배치 upsert 한 번으로 저장합니다.
+    """
+
+    def __init__(self, flush_rows=TICK_FLUSH_ROWS, flush_interval_ms=TICK_FLUSH_INTERVAL_MS, max_rows=TICK_BUFFER_MAX):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_rows = max_rows
+        self.loop = asyncio.get_running_loop()
+        self.buffer = []
+        self.wakeup = asyncio.Event()
+        self.task = self.loop.create_task(self.run())
+
+        # 모니터링용 카운터
+        self.received = 0
+        self.written = 0
+        self.dropped = 0  # 버퍼가 가득 차서 버린 행 수
+        self.failed = 0  # 저장 실패로 잃은 행 수
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.published_at = 0.0
+
+    def put(self, row):
+        """틱 하나를 버퍼에 추가합니다. (await 없음 - 브로드캐스트 경로를 막지 않음)"""
+        self.received += 1
+        if len(self.buffer) >= self.max_rows:
+            self.dropped += 1
+            return
+        self.buffer.append(row)
+        if len(self.buffer) >= self.flush_rows:
+            self.wakeup.set()
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+            await self.publish_stats()
+
+    async def flush(self):
+        """버퍼를 비우고 배치 upsert 로 저장합니다."""
+        if not self.buffer:
+            return
+        rows, self.buffer = self.buffer, []
+        started_at = time.perf_counter()
+        try:
+            written = await sync_to_async(write_ticks)(rows)
+        except Exception as e:
+            self.failed += len(rows)
+            logger.error(f"❌ 틱 {len(rows)}건 저장 실패: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        self.written += written  # 같은 (symbol, timestamp) 중복을 제거하고 실제로 저장한 행 수
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+
+    async def publish_stats(self):
+        """TICK_STATS_INTERVAL 마다 지표를 공유 캐시에 기록합니다. (웹 워커의 tick_metrics 가 읽음)"""
+        now = time.monotonic()
+        if now - self.published_at < TICK_STATS_INTERVAL:
+            return
+        self.published_at = now
+        try:
+            await cache.aset(TICK_STATS_CACHE_KEY, self.stats(), TICK_STATS_INTERVAL * 10)
+        except Exception as e:
+            logger.warning(f"⚠️ 틱 저장소 지표 게시 실패: {e}")
+
+    def stats(self):
+        return {
+            "buffer_depth": len(self.buffer),
+            "received": self.received,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+
+_sink = None
+
+
+def get_sink():
+    """현재 이벤트 루프의 틱 저장소를 반환합니다. (프로세스당 하나, 루프가 바뀌면 새로 생성)"""
+    global _sink
+    if _sink is None or _sink.loop is not asyncio.get_running_loop():
+        _sink = TickSink()
+    return _sink
+
+
+async def sink_stats():
+    """
+    틱 저장소 지표 - 이 프로세스에 저장소가 있으면 그 값을, 없으면 run_upbit_ws 프로세스가 공유 캐시에 게시한 값을 반환합니다.
+    (둘 다 없으면 0)
+    """
+    if _sink is not None:
+        return _sink.stats()
+    stats = await cache.aget(TICK_STATS_CACHE_KEY)
+    if stats is None:
+        return {
+            "buffer_depth": 0, "received": 0, "written": 0, "dropped": 0, "failed": 0,
+            "flushes": 0, "last_flush_ms": 0.0, "max_flush_ms": 0.0,
+        }
+    return stats
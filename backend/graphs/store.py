@@ -0,0 +1,206 @@
+import datetime
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from .candles import CandleRequestError, UPBIT_PAGE_SIZE, candle_interval, get_proxy, parse_to
+from .models import Candle, CandleCoverage
+
+logger = logging.getLogger(__name__)
+
+# 캔들 마감 후 Upbit 집계가 확정될 때까지 기다리는 시간 (초) - 이 시간이 지난 캔들만 저장
+CANDLE_SETTLE_SECONDS = getattr(settings, 'CANDLE_SETTLE_SECONDS', 5)
+
+UTC = datetime.timezone.utc
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=UTC)
+KST_OFFSET = datetime.timedelta(hours=9)
+# 주봉은 월요일 00:00 (UTC) 시작 - 1970-01-01 은 목요일이므로 4일 밀어서 정렬
+WEEK_OFFSET = datetime.timedelta(days=4)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+CANDLE_FIELDS = ('candle_start', 'open', 'high', 'low', 'close', 'volume', 'value', 'timestamp')
+
+
+def interval_name(candle_type, unit=None):
+    """Candle.interval 값 (예: minutes/5, days)"""
+    return f"minutes/{unit}" if candle_type == 'minutes' else candle_type
+
+
+def floor_start(moment, candle_type, interval):
+    """moment 가 속한 캔들의 시작 시각"""
+    origin = EPOCH + WEEK_OFFSET if candle_type == 'weeks' else EPOCH
+    step = interval * 1_000_000
+    return origin + ((moment - origin) // MICROSECOND // step * step) * MICROSECOND
+
+
+def ceil_start(moment, candle_type, interval):
+    """moment 이상인 첫 캔들 시작 시각"""
+    start = floor_start(moment, candle_type, interval)
+    return start if start == moment else start + datetime.timedelta(seconds=interval)
+
+
+def parse_start(candle):
+    return datetime.datetime.fromisoformat(candle['candle_date_time_utc']).replace(tzinfo=UTC)
+
+
+def format_time(moment):
+    return moment.astimezone(UTC).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def missing_ranges(covered, start, end):
+    """[start, end) 에서 covered(시작 순 (start, end) 목록)가 덮지 않는 구간 목록"""
+    missing = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_start > cursor:
+            missing.append((cursor, min(covered_start, end)))
+        cursor = max(cursor, covered_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def to_upbit(row, symbol, candle_type, unit):
+    """저장된 캔들 → Upbit 캔들 API 응답 형식"""
+    candle_start, open, high, low, close, volume, value, timestamp = row
+    candle = {
+        "market": symbol,
+        "candle_date_time_utc": format_time(candle_start),
+        "candle_date_time_kst": format_time(candle_start + KST_OFFSET),
+        "opening_price": open,
+        "high_price": high,
+        "low_price": low,
+        "trade_price": close,
+        "timestamp": timestamp,
+        "candle_acc_trade_price": value,
+        "candle_acc_trade_volume": volume,
+    }
+    if candle_type == 'minutes':
+        candle["unit"] = unit
+    elif candle_type == 'weeks':
+        candle["first_day_of_period"] = candle_start.date().isoformat()
+    return candle
+
+
+########################################
+# DB 접근 (sync_to_async 로 호출)
+########################################
+def load_coverage(symbol, interval, start, end):
+    return list(
+        CandleCoverage.objects.filter(symbol=symbol, interval=interval, start__lt=end, end__gt=start)
+        .order_by('start')
+        .values_list('start', 'end')
+    )
+
+
+def load_candles(symbol, interval, start, end):
+    return list(
+        Candle.objects.filter(symbol=symbol, interval=interval, candle_start__gte=start, candle_start__lt=end)
+        .order_by('-candle_start')
+        .values_list(*CANDLE_FIELDS)
+    )
+
+
+def save_candles(symbol, interval, candles, start, end):
+    """
+    Upbit 캔들을 upsert 하고 [start, end) 를 저장 완료 구간으로 기록합니다.
+    겹치거나 맞닿은 기존 구간은 하나로 합칩니다.
+    같은 시작 시각의 캔들이 여러 번 들어오면 마지막 것만 남깁니다. (한 문장에서 같은 행을 두 번 갱신할 수 없음)
+    """
+    candles = {parse_start(c): c for c in candles}
+    with transaction.atomic():
+        Candle.objects.bulk_create(
+            [
+                Candle(
+                    symbol=symbol,
+                    interval=interval,
+                    candle_start=candle_start,
+                    open=c['opening_price'],
+                    high=c['high_price'],
+                    low=c['low_price'],
+                    close=c['trade_price'],
+                    volume=c['candle_acc_trade_volume'],
+                    value=c['candle_acc_trade_price'],
+                    timestamp=c['timestamp'],
+                )
+                for candle_start, c in candles.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['symbol', 'interval', 'candle_start'],
+            update_fields=['open', 'high', 'low', 'close', 'volume', 'value', 'timestamp'],
+        )
+        overlapping = CandleCoverage.objects.filter(
+            symbol=symbol, interval=interval, start__lte=end, end__gte=start,
+        )
+        bounds = list(overlapping.values_list('start', 'end'))
+        overlapping.delete()
+        CandleCoverage.objects.create(
+            symbol=symbol,
+            interval=interval,
+            start=min([start] + [s for s, _ in bounds]),
+            end=max([end] + [e for _, e in bounds]),
+        )
+
+
+########################################
+# 범위 조회
+########################################
+async def fill_range(candle_type, unit, symbol, start, end):
+    """
+    [start, end) 의 캔들을 Upbit 에서 UPBIT_PAGE_SIZE 단위로 뒤에서부터 받아 저장합니다.
+    거래가 없던 구간은 캔들이 없어 한 페이지가 count * 간격보다 더 과거까지 걸치므로,
+    다음 페이지는 받은 페이지의 가장 오래된 캔들 시각부터 요청합니다.
+    """
+    step = datetime.timedelta(seconds=candle_interval(candle_type, unit))
+    proxy = get_proxy()
+    candles = []
+    cursor = end
+    while cursor > start:
+        count = min(UPBIT_PAGE_SIZE, (cursor - start) // step)
+        page = await proxy.get(candle_type, unit, symbol, count, format_time(cursor) + 'Z')
+        starts = [parse_start(c) for c in page]
+        candles.extend(c for c, candle_start in zip(page, starts) if start <= candle_start < cursor)
+        if len(page) < count:
+            break  # 더 과거 캔들이 없음 (상장 이전)
+        cursor = min(min(starts), cursor - step)
+    await sync_to_async(save_candles)(symbol, interval_name(candle_type, unit), candles, start, end)
+    logger.info(f"🕯️ {symbol} {interval_name(candle_type, unit)} [{start}, {end}) 캔들 {len(candles)}개 저장")
+
+
+async def get_candles(candle_type, unit, symbol, count, to=None):
+    """
+    to 이전 count 개 캔들 구간을 Upbit 캔들 API 형식(최신순)으로 반환합니다.
+    - 마감된 캔들: 저장소에서 읽고, 저장 완료 구간(CandleCoverage)에 없는 부분만 Upbit 에서 받아 저장
+    - 아직 진행 중인(또는 막 마감된) 캔들: 저장하지 않고 프록시(짧은 TTL 캐시)로 받아 앞에 붙임
+    거래가 없던 시각에는 캔들이 없으므로 반환 개수가 count 보다 적을 수 있습니다.
+    """
+    interval = candle_interval(candle_type, unit)
+    step = datetime.timedelta(seconds=interval)
+    name = interval_name(candle_type, unit)
+    now = datetime.datetime.now(UTC)
+
+    end = parse_to(to) if to else now
+    if end is None:
+        raise CandleRequestError(f"to 형식이 올바르지 않습니다: '{to}' (예: 2025-01-01T00:00:00)")
+    range_end = min(ceil_start(end, candle_type, interval), floor_start(now, candle_type, interval) + step)
+    range_start = range_end - count * step
+    settled = floor_start(now - datetime.timedelta(seconds=CANDLE_SETTLE_SECONDS), candle_type, interval)
+    closed_end = max(min(range_end, settled), range_start)
+
+    rows = []
+    if closed_end > range_start:
+        covered = await sync_to_async(load_coverage)(symbol, name, range_start, closed_end)
+        for start, stop in missing_ranges(covered, range_start, closed_end):
+            await fill_range(candle_type, unit, symbol, start, stop)
+        rows = await sync_to_async(load_candles)(symbol, name, range_start, closed_end)
+
+    live = []
+    if range_end > closed_end:
+        latest = await get_proxy().get(candle_type, unit, symbol, (range_end - closed_end) // step, None)
+        live = [c for c in latest if closed_end <= parse_start(c) < range_end]
+
+    return live + [to_upbit(row, symbol, candle_type, unit) for row in rows]
@@ -7,4 +7,7 @@ urlpatterns = [
 
     # 나머지 캔들 데이터 (분봉, 일봉, 주봉, 월봉)
     path('candles/<str:candle_type>/<str:symbol>/', views.fetch_other_candles, name='fetch_other_candles'),
+
+    # 실시간 틱 저장 지표
+    path('ticks/metrics/', views.tick_metrics, name='tick_metrics'),
 ]
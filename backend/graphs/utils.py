@@ -1,70 +1,87 @@
 # your_app/utils.py
 
 import asyncio
+import datetime
 import websockets
 import json
+import logging
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+
+from .sink import get_sink
+
+logger = logging.getLogger(__name__)
 
 UPBIT_WS_URL = "wss://api.upbit.com/websocket/v1"
 
 
 async def upbit_ws_consumer(symbol):
-    async with websockets.connect(UPBIT_WS_URL) as websocket:
-        subscribe_format = [
-            {"ticket": "test"},
-            {"type": "ticker", "codes": [f"CRIX.UPBIT.KRW-{symbol}"]},
-            # 필요한 다른 타입 추가 가능 (예: trade, orderbook 등)
-        ]
-        await websocket.send(json.dumps(subscribe_format))
+    """
+    심볼 하나의 Upbit ticker 를 받아 FinancialData 로 저장하고 financial_data_{symbol} 그룹에 브로드캐스트합니다.
+    DB 저장은 TickSink 버퍼에 넣기만 하고(배치 upsert 는 백그라운드), 브로드캐스트는 틱마다 바로 보냅니다.
+    """
+    channel_layer = get_channel_layer()
+    group_name = f'financial_data_{symbol}'
+    sink = get_sink()
 
-        channel_layer = get_channel_layer()
-        group_name = f'financial_data_{symbol}'
+    while True:
+        try:
+            async with websockets.connect(UPBIT_WS_URL) as websocket:
+                subscribe_format = [
+                    {"ticket": "test"},
+                    {"type": "ticker", "codes": [f"KRW-{symbol}"]},
+                    # 필요한 다른 타입 추가 가능 (예: trade, orderbook 등)
+                ]
+                await websocket.send(json.dumps(subscribe_format))
 
-        while True:
-            try:
-                message = await websocket.recv()
-                data = json.loads(message)
+                async for message in websocket:
+                    data = json.loads(message)
 
-                # 필요한 데이터 추출 (예: 현재 가격, 시간 등)
-                trade_price = data.get('trade_price')
-                timestamp = data.get('timestamp')  # 밀리초 단위
-                datetime_obj = timezone.datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+                    # 필요한 데이터 추출 (예: 현재 가격, 시간 등)
+                    trade_price = data.get('trade_price')
+                    timestamp = data.get('timestamp')  # 밀리초 단위
+                    datetime_obj = datetime.datetime.fromtimestamp(timestamp / 1000, tz=datetime.timezone.utc)
 
-                # 데이터베이스에 저장
-                FinancialData.objects.update_or_create(
-                    symbol=f"KRW-{symbol}",
-                    timestamp=datetime_obj,
-                    defaults={
+                    # 데이터베이스 저장 (버퍼에 추가만 하고 바로 반환)
+                    sink.put({
+                        'symbol': f"KRW-{symbol}",
+                        'timestamp': datetime_obj,
                         'open': data.get('opening_price', trade_price),
                         'high': data.get('high_price', trade_price),
                         'low': data.get('low_price', trade_price),
                         'close': trade_price,
                         'volume': data.get('acc_trade_volume', 0),
                         'asset_type': 'CRYPTO',
-                    }
-                )
+                    })
 
-                # 실시간 데이터 브로드캐스트
-                await channel_layer.group_send(
-                    group_name,
-                    {
-                        'type': 'send_financial_data',
-                        'data': {
-                            'x': datetime_obj.isoformat(),
-                            'y': [data.get('opening_price', trade_price),
-                                  data.get('high_price', trade_price),
-                                  data.get('low_price', trade_price),
-                                  trade_price],
+                    # 실시간 데이터 브로드캐스트
+                    await channel_layer.group_send(
+                        group_name,
+                        {
+                            'type': 'send_financial_data',
+                            'data': {
+                                'x': datetime_obj.isoformat(),
+                                'y': [data.get('opening_price', trade_price),
+                                      data.get('high_price', trade_price),
+                                      data.get('low_price', trade_price),
+                                      trade_price],
+                            }
                         }
-                    }
-                )
-            except Exception as e:
-                print(f"Error in WebSocket connection: {e}")
-                await asyncio.sleep(5)  # 재연결 시도 전 대기
-                continue
+                    )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in WebSocket connection: {e}")
+            await asyncio.sleep(5)  # 재연결 시도 전 대기
 
 
-def start_upbit_ws(symbol):
-    loop = asyncio.get_event_loop()
-    loop.create_task(upbit_ws_consumer(symbol))
+async def run_upbit_ws(symbols):
+    """
+    심볼마다 upbit_ws_consumer 를 실행합니다. (manage.py run_upbit_ws 전용 프로세스에서 호출)
+    종료(취소) 시 버퍼에 남은 틱을 저장하고 끝냅니다.
+    """
+    sink = get_sink()
+    try:
+        await asyncio.gather(*(upbit_ws_consumer(symbol) for symbol in symbols))
+    finally:
+        await sink.flush()
+        await sink.publish_stats()
@@ -1,83 +1,109 @@
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
-import requests
-import time  # 지연을 추가하기 위해 time 모듈을 임포트
+from functools import wraps
 
-# 지연 시간 (초 단위)
-REQUEST_DELAY = 1  # 1초 지연
+import httpx
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.views import APIView
 
-@api_view(['GET'])
-def fetch_seconds_candles(request, symbol):
+from .candles import STORED_CANDLE_TYPES, CandleRequestError, get_proxy, validate_request
+from .sink import sink_stats
+from .store import get_candles
+
+# Upbit 캔들 API 프록시 뷰
+# 동기 뷰에서 요청마다 time.sleep 후 새 연결을 만들던 방식 대신,
+# 이벤트 루프당 하나인 CandleProxy (keep-alive 클라이언트 + TTL 캐시 + 동시 요청 합치기)를 사용합니다.
+# 간격이 고정된 캔들(초/분/일/주봉)은 로컬 캔들 저장소에서 읽고, 저장되지 않은 구간만 Upbit 에 요청합니다.
+# DRF 의 @api_view 는 async 뷰를 지원하지 않으므로, api_policy 로 같은 인증/권한/스로틀 검사를 먼저 수행합니다.
+
+
+def check_api_policy(request):
     """
-    초 단위 캔들 데이터를 반환하는 뷰
+    settings.REST_FRAMEWORK 의 인증/권한/스로틀/콘텐츠 협상 검사를 @api_view 와 같은 순서로 수행합니다.
+    통과하면 None, 거부되면 DRF 형식의 에러 응답을 반환합니다.
     """
+    view = APIView()
+    view.args, view.kwargs = (), {}
+    drf_request = view.initialize_request(request)
+    view.request = drf_request
+    view.headers = view.default_response_headers
+    try:
+        view.initial(drf_request)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+        return view.finalize_response(drf_request, response).render()
+    return None
+
+
+def api_policy(view_func):
+    """async 뷰 앞에서 check_api_policy 를 (DB 를 쓰는 인증이 있으므로 스레드에서) 실행합니다."""
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        denied = await sync_to_async(check_api_policy)(request)
+        if denied is not None:
+            return denied
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def error_response(message, status):
+    return JsonResponse({"error": message}, status=status, json_dumps_params={"ensure_ascii": False})
+
+
+async def proxy_candles(candle_type, symbol, count, unit, to):
     try:
-        # 요청 파라미터 가져오기
-        count = request.query_params.get("count")
-        unit = request.query_params.get("unit")
-        to = request.query_params.get("to")
-
-        # 필수 파라미터 검증
-        if not count or not unit:
-            return Response({"error": "count와 unit은 필수입니다."}, status=400)
-
-        # 지연 추가
-        time.sleep(REQUEST_DELAY)
-
-        # Upbit API 호출
-        url = "https://api.upbit.com/v1/candles/seconds"
-        params = {
-            "market": symbol,
-            "count": count,
-            "unit": unit,
-            "to": to
-        }
-        headers = {"accept": "application/json"}
-
-        upbit_response = requests.get(url, params=params, headers=headers, timeout=10)
-        upbit_response.raise_for_status()
-        data = upbit_response.json()
-
-        return Response({"status": "success", "data": data}, status=200)
-
-    except requests.exceptions.RequestException as e:
-        return Response({"error": f"Upbit API 요청 실패: {str(e)}"}, status=500)
+        unit, count = validate_request(candle_type, unit, count)
+    except CandleRequestError as e:
+        return error_response(str(e), status=400)
+
+    try:
+        if candle_type in STORED_CANDLE_TYPES:
+            data = await get_candles(candle_type, unit, symbol, count, to or None)
+        else:
+            data = await get_proxy().get(candle_type, unit, symbol, count, to or None)
+    except CandleRequestError as e:
+        return error_response(str(e), status=400)
+    except httpx.HTTPError as e:
+        return error_response(f"Upbit API 요청 실패: {str(e)}", status=500)
     except Exception as e:
-        return Response({"error": f"서버 오류: {str(e)}"}, status=500)
+        return error_response(f"서버 오류: {str(e)}", status=500)
+    return JsonResponse({"status": "success", "data": data}, json_dumps_params={"ensure_ascii": False})
+
 
-@api_view(['GET'])
-def fetch_other_candles(request, candle_type, symbol):
+@require_GET
+@api_policy
+async def fetch_seconds_candles(request, symbol):
+    """
+    초 단위 캔들 데이터를 반환하는 뷰 (Upbit 초봉은 1초 간격뿐이므로 unit 은 받지 않습니다)
+    """
+    count = request.GET.get("count")
+
+    # 필수 파라미터 검증
+    if not count:
+        return error_response("count는 필수입니다.", status=400)
+
+    return await proxy_candles('seconds', symbol, count, None, request.GET.get("to"))
+
+
+@require_GET
+@api_policy
+async def fetch_other_candles(request, candle_type, symbol):
     """
     분봉, 일봉, 주봉, 월봉 데이터를 반환하는 뷰
     """
-    try:
-        # 요청 파라미터 가져오기
-        count = request.query_params.get("count")
-        to = request.query_params.get("to")
-
-        # 필수 파라미터 검증
-        if not count:
-            return Response({"error": "count는 필수입니다."}, status=400)
-
-        # 지연 추가
-        time.sleep(REQUEST_DELAY)
-
-        # Upbit API 호출
-        url = f"https://api.upbit.com/v1/candles/{candle_type}"
-        params = {
-            "market": symbol,
-            "count": count,
-            "to": to
-        }
-        headers = {"accept": "application/json"}
-
-        upbit_response = requests.get(url, params=params, headers=headers, timeout=10)
-        upbit_response.raise_for_status()
-        data = upbit_response.json()
-
-        return Response({"status": "success", "data": data}, status=200)
-
-    except requests.exceptions.RequestException as e:
-        return Response({"error": f"Upbit API 요청 실패: {str(e)}"}, status=500)
-    except Exception as e:
-        return Response({"error": f"서버 오류: {str(e)}"}, status=500)
+    count = request.GET.get("count")
+
+    # 필수 파라미터 검증
+    if not count:
+        return error_response("count는 필수입니다.", status=400)
+
+    return await proxy_candles(candle_type, symbol, count, request.GET.get("unit"), request.GET.get("to"))
+
+
+@require_GET
+@api_policy
+async def tick_metrics(request):
+    """
+    틱 저장소(TickSink) 지표 - 버퍼 깊이, 저장/버림/실패 행 수, 배치 저장 지연 시간 (워커 프로세스 기준)
+    """
+    return JsonResponse(await sink_stats())